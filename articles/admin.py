@@ -1,2 +1,18 @@
+from django.contrib import admin
 
-# Register your models here.
+from articles.models import NotificationFanout, OutboxEmail
+
+
+@admin.register(NotificationFanout)
+class NotificationFanoutAdmin(admin.ModelAdmin):
+    list_display = ("id", "article_id", "author_id", "status", "sent_count", "created_at")
+    list_filter = ("status",)
+    readonly_fields = ("last_follow_id", "sent_count", "leased_until", "created_at", "updated_at")
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("id", "subject", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("subject",)
+    readonly_fields = ("attempts", "leased_until", "last_error", "created_at", "sent_at")
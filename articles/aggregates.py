@@ -0,0 +1,29 @@
+"""Aggregates behind the list endpoints, cached with stampede protection.
+
+Keys match the ``hot`` cache policies, FAQs and topics are dropped by the
+model signals, popular authors follow the leaderboard and only expire.
+"""
+from django.apps import apps
+from django.conf import settings
+
+from articles import leaderboards
+from core.computation import cached_computation
+
+TTL = settings.AGGREGATE_CACHE_TTL
+
+STALE = settings.AGGREGATE_CACHE_STALE
+
+
+@cached_computation("authors:popular:{limit}", ttl=TTL, stale=STALE)
+def popular_authors(limit=10):
+    return leaderboards.popular_authors(limit)
+
+
+@cached_computation("faqs", ttl=TTL, stale=STALE)
+def faqs():
+    return list(apps.get_model("articles.FAQ")._default_manager.all())
+
+
+@cached_computation("topics", ttl=TTL, stale=STALE)
+def topics():
+    return list(apps.get_model("articles.Topic")._default_manager.all())
@@ -1,6 +1,34 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ArticlesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "articles"
+
+    def ready(self):
+        # Drops cached user snapshots when a user changes.
+        from core import user_snapshot  # noqa
+
+        # Receivers reference the Article and Topic models lazily, only
+        # connect them once they exist.
+        if {"article", "topic"} <= self.models.keys():
+            from articles import signals  # noqa
+
+        interval = settings.ARTICLE_COUNTERS_FLUSH_INTERVAL
+        if interval:
+            from articles.claps import clap_bursts
+            from articles.counters import CounterFlusher, article_counters
+            from articles.reading_history import reading_history
+
+            buffers = [article_counters]
+            if settings.READING_HISTORY_BUFFERED:
+                buffers.append(reading_history)
+            if settings.CLAPS_COALESCE_WINDOW:
+                buffers.append(clap_bursts)
+
+            CounterFlusher(
+                buffers,
+                interval=interval,
+                batch_size=settings.ARTICLE_COUNTERS_BATCH_SIZE,
+            ).start()
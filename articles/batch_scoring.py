@@ -0,0 +1,177 @@
+"""Batch recommendation scoring with sparse matrix products.
+
+Users and published articles are both represented over topics: a sparse
+user x topic affinity matrix (reads, claps, followed topics, merged with
+the live affinities of the engine so "more" feedback is kept) and a binary
+article x topic matrix. Scores of a chunk of users are ``U[chunk] @ A.T``,
+articles sharing a topic the user marked "less" are masked out and the top
+N articles of every user are written to the candidate cache in bulk.
+"""
+import multiprocessing
+from collections import defaultdict
+
+import numpy as np
+from django.apps import apps
+from scipy import sparse
+
+from articles.recommendations import EVENT_WEIGHTS, recommendations
+
+# Set in forked workers, shared copy-on-write with the parent.
+_matrices = None
+
+
+class TopicMatrices:
+    def __init__(self, user_ids, article_ids, affinity, exclusions, articles):
+        self.user_ids = np.asarray(user_ids)
+        self.article_ids = np.asarray(article_ids)
+        self.affinity = affinity
+        self.exclusions = exclusions
+        self.articles_t = articles.T.tocsc()
+
+
+def load_matrices(engine=recommendations):
+    """Build the user x topic and article x topic matrices from the database."""
+    return build_matrices(*database_weights(), engine=engine)
+
+
+def database_weights():
+    """Return ``({article_id: [topic_id]}, {(user_id, topic_id): weight})`` of published articles."""
+    Article = apps.get_model("articles.Article")
+    ReadingHistory = apps.get_model("users.ReadingHistory")
+    Clap = apps.get_model("articles.Clap")
+    TopicFollow = apps.get_model("articles.TopicFollow")
+
+    article_topics = defaultdict(list)
+    published = Article.topics.through.objects.filter(article__status="publish")
+    for article_id, topic_id in published.values_list("article_id", "topic_id").iterator():
+        article_topics[article_id].append(topic_id)
+
+    weights = defaultdict(float)
+    for user_id, article_id in ReadingHistory.objects.values_list("user_id", "article_id").iterator():
+        for topic_id in article_topics.get(article_id, ()):
+            weights[user_id, topic_id] += EVENT_WEIGHTS["read"]
+    for user_id, article_id, count in Clap.objects.values_list("user_id", "article_id", "count").iterator():
+        for topic_id in article_topics.get(article_id, ()):
+            weights[user_id, topic_id] += EVENT_WEIGHTS["clap"] * count
+    for user_id, topic_id in TopicFollow.objects.values_list("user_id", "topic_id").iterator():
+        weights[user_id, topic_id] += EVENT_WEIGHTS["follow"]
+    return article_topics, weights
+
+
+def build_matrices(article_topics, weights, engine=recommendations):
+    """Build the matrices, merging the engine's affinities into ``weights``.
+
+    "more" feedback only lives in the engine's affinity hashes, which also
+    hold the same reads, claps and follows as events, so the larger of the
+    two weights is kept rather than their sum.
+    """
+    weights = dict(weights)
+    user_ids = sorted({user_id for user_id, _ in weights} | set(engine.affinity_user_ids()))
+    pipe = engine.client.pipeline(transaction=False)
+    for user_id in user_ids:
+        pipe.hgetall(engine._affinity_key(user_id))
+    for user_id, live in zip(user_ids, pipe.execute() if user_ids else []):
+        for topic_id, weight in live.items():
+            key = (user_id, int(topic_id))
+            weights[key] = max(weights.get(key, 0.0), float(weight))
+
+    article_ids = sorted(article_topics)
+    topic_ids = sorted({topic_id for topics in article_topics.values() for topic_id in topics})
+    user_index = {user_id: row for row, user_id in enumerate(user_ids)}
+    topic_index = {topic_id: column for column, topic_id in enumerate(topic_ids)}
+
+    # Topics no published article has cannot contribute to any score.
+    entries = [(user_index[u], topic_index[t], w) for (u, t), w in weights.items() if t in topic_index]
+    rows, columns, values = zip(*entries) if entries else ((), (), ())
+    affinity = sparse.csr_matrix((values, (rows, columns)), shape=(len(user_ids), len(topic_ids)), dtype=np.float32)
+
+    # "less" topics only exist as events, read them from the engine.
+    pipe = engine.client.pipeline(transaction=False)
+    for user_id in user_ids:
+        pipe.smembers(engine._excluded_key(user_id))
+    excluded_rows, excluded_columns = [], []
+    for row, excluded in enumerate(pipe.execute() if user_ids else []):
+        for topic_id in excluded:
+            if int(topic_id) in topic_index:
+                excluded_rows.append(row)
+                excluded_columns.append(topic_index[int(topic_id)])
+    exclusions = sparse.csr_matrix(
+        (np.ones(len(excluded_rows), dtype=np.float32), (excluded_rows, excluded_columns)),
+        shape=affinity.shape,
+    )
+
+    article_rows, article_columns = [], []
+    for row, article_id in enumerate(article_ids):
+        for topic_id in article_topics[article_id]:
+            article_rows.append(row)
+            article_columns.append(topic_index[topic_id])
+    articles = sparse.csr_matrix(
+        (np.ones(len(article_rows), dtype=np.float32), (article_rows, article_columns)),
+        shape=(len(article_ids), len(topic_ids)),
+    )
+    return TopicMatrices(user_ids, article_ids, affinity, exclusions, articles)
+
+
+def top_n_per_row(scores, n):
+    """Column indices of the ``n`` highest positive values of every CSR row, best first."""
+    result = []
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        data, columns = scores.data[start:end], scores.indices[start:end]
+        positive = data > 0
+        data, columns = data[positive], columns[positive]
+        if len(data) > n:
+            keep = np.argpartition(-data, n)[:n]
+            data, columns = data[keep], columns[keep]
+        result.append(columns[np.argsort(-data, kind="stable")])
+    return result
+
+
+def score_chunk(matrices, start, stop, n):
+    """Top ``n`` article ids of the users in rows ``start:stop``."""
+    scores = (matrices.affinity[start:stop] @ matrices.articles_t).tocsr()
+    masked = (matrices.exclusions[start:stop] @ matrices.articles_t).tocsr()
+    if masked.nnz:
+        scores = scores - scores.multiply(masked > 0)
+        scores.eliminate_zeros()
+
+    return {
+        int(matrices.user_ids[start + offset]): matrices.article_ids[columns].tolist()
+        for offset, columns in enumerate(top_n_per_row(scores.tocsr(), n))
+    }
+
+
+def chunk_rows(matrices, memory_mb):
+    """Users per chunk so that a dense chunk x articles float32 block fits the budget."""
+    per_user = max(1, len(matrices.article_ids)) * 4
+    return max(1, (memory_mb * 1024 * 1024) // per_user)
+
+
+def _score_worker(args):
+    return score_chunk(_matrices, *args)
+
+
+def score_all(matrices, n=100, memory_mb=256, processes=1, engine=recommendations):
+    """Score every user and store their candidates, returns the number of users."""
+    global _matrices
+
+    size = chunk_rows(matrices, memory_mb)
+    if processes > 1:
+        # Every worker holds one chunk at a time, split the budget between them.
+        size = max(1, size // processes)
+    total = len(matrices.user_ids)
+    chunks = [(start, min(start + size, total), n) for start in range(0, total, size)]
+
+    if processes > 1:
+        _matrices = matrices
+        try:
+            with multiprocessing.get_context("fork").Pool(processes) as pool:
+                for candidates in pool.imap_unordered(_score_worker, chunks):
+                    engine.store_candidates(candidates)
+        finally:
+            _matrices = None
+    else:
+        for chunk in chunks:
+            engine.store_candidates(score_chunk(matrices, *chunk))
+
+    return total
@@ -0,0 +1,326 @@
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from core.redis import get_redis_client
+
+MAX_CLAPS = 50
+
+
+class ClapStore:
+    """Per-user clap rows with a denormalized total on the article.
+
+    Claps are one ``INSERT ... ON CONFLICT DO UPDATE`` that creates the row
+    or raises its count up to ``limit``. The row is locked first, so the
+    article total moves by exactly the claps that were applied, in the
+    same transaction. ``ClapBursts`` merges many claps into one write with
+    ``apply``.
+    """
+
+    def __init__(self, clap_model="articles.Clap", article_model="articles.Article", total_field="claps_count",
+                 limit=MAX_CLAPS):
+        self.clap_label = clap_model
+        self.article_label = article_model
+        self.total_field = total_field
+        self.limit = limit
+
+    @property
+    def clap_model(self):
+        return apps.get_model(self.clap_label)
+
+    @property
+    def article_model(self):
+        return apps.get_model(self.article_label)
+
+    def _columns(self, connection):
+        opts = self.clap_model._meta
+        quote = connection.ops.quote_name
+        return (
+            quote(opts.db_table),
+            quote(opts.get_field("user").column),
+            quote(opts.get_field("article").column),
+            quote(opts.get_field("count").column),
+        )
+
+    def _insert_values(self, connection, user_id, article_id, count=1):
+        # Let the fields fill defaults and auto_now values the way save() does.
+        clap = self.clap_model(user_id=user_id, article_id=article_id, count=count)
+        fields = [field for field in clap._meta.concrete_fields if not field.primary_key]
+        columns = [connection.ops.quote_name(field.column) for field in fields]
+        values = [field.get_db_prep_save(field.pre_save(clap, True), connection) for field in fields]
+        return columns, values
+
+    def _adjust_total(self, article_id, amount, using):
+        self.article_model._default_manager.using(using).filter(pk=article_id).update(
+            **{self.total_field: F(self.total_field) + amount}
+        )
+
+    def count(self, user_id, article_id, using=DEFAULT_DB_ALIAS):
+        """Claps of the user on the article."""
+        counts = self.clap_model._default_manager.using(using).filter(user_id=user_id, article_id=article_id)
+        return counts.values_list("count", flat=True).first() or 0
+
+    @staticmethod
+    def _least(connection):
+        return "LEAST" if connection.vendor == "postgresql" else "MIN"
+
+    def _locked_counts(self, pairs, using):
+        """Stored counts of ``(user_id, article_id)`` pairs, their rows locked until the transaction ends."""
+        rows = self.clap_model._default_manager.using(using).select_for_update().filter(
+            user_id__in={user_id for user_id, _ in pairs}, article_id__in={article_id for _, article_id in pairs},
+        )
+        return {
+            (str(user_id), str(article_id)): count
+            for user_id, article_id, count in rows.values_list("user_id", "article_id", "count")
+        }
+
+    def add(self, user_id, article_id, claps=1, using=DEFAULT_DB_ALIAS):
+        """Clap ``claps`` times, returns ``(count, applied)``, nothing is applied at the limit."""
+        connection = connections[using]
+        table, user, article, count = self._columns(connection)
+        columns, values = self._insert_values(connection, user_id, article_id, min(claps, self.limit))
+        insert = (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(values))})"
+            f" ON CONFLICT ({user}, {article})"
+        )
+        pair = (str(user_id), str(article_id))
+
+        with transaction.atomic(using=using):
+            previous = self._locked_counts([pair], using).get(pair)
+            with connection.cursor() as cursor:
+                if previous is None:
+                    cursor.execute(f"{insert} DO NOTHING RETURNING {count}", values)
+                    row = cursor.fetchone()
+                    if row is None:
+                        # A concurrent first clap inserted the row meanwhile.
+                        previous = self._locked_counts([pair], using)[pair]
+                if previous is not None:
+                    if previous >= self.limit:
+                        return previous, 0
+                    cursor.execute(
+                        f"{insert} DO UPDATE SET {count} = {self._least(connection)}({table}.{count} + EXCLUDED.{count}, %s)"
+                        f" RETURNING {count}",
+                        [*values, self.limit],
+                    )
+                    row = cursor.fetchone()
+            current, applied = row[0], row[0] - (previous or 0)
+            self._adjust_total(article_id, applied, using)
+        return current, applied
+
+    def apply(self, claps, using=DEFAULT_DB_ALIAS):
+        """Write ``[(user_id, article_id, claps)]`` in one transaction, each pair up to the limit."""
+        if not claps:
+            return
+
+        connection = connections[using]
+        table, user, article, count = self._columns(connection)
+        rows, totals = [], defaultdict(int)
+        with transaction.atomic(using=using):
+            # Totals move by what the rows take, rows missing here are
+            # only inserted concurrently when claps bypass ClapBursts.
+            stored = self._locked_counts([(str(user_id), str(article_id)) for user_id, article_id, _ in claps], using)
+            for user_id, article_id, amount in claps:
+                applied = min(amount, self.limit - stored.get((str(user_id), str(article_id)), 0))
+                if applied > 0:
+                    columns, values = self._insert_values(connection, user_id, article_id, applied)
+                    rows.append([*values, self.limit])
+                    totals[article_id] += applied
+            if not rows:
+                return
+
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(values))})"
+                    f" ON CONFLICT ({user}, {article}) DO UPDATE"
+                    f" SET {count} = {self._least(connection)}({table}.{count} + EXCLUDED.{count}, %s)",
+                    rows,
+                )
+            total = Case(
+                *[When(pk=article_id, then=Value(amount)) for article_id, amount in totals.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+            self.article_model._default_manager.using(using).filter(pk__in=list(totals)).update(
+                **{self.total_field: F(self.total_field) + total}
+            )
+
+    def remove(self, user_id, article_id, using=DEFAULT_DB_ALIAS):
+        """Undo every clap of the user on the article, returns the removed count or ``None``."""
+        connection = connections[using]
+        table, user, article, count = self._columns(connection)
+
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {user} = %s AND {article} = %s RETURNING {count}",
+                    [user_id, article_id],
+                )
+                row = cursor.fetchone()
+            if row is None:
+                return None
+            self._adjust_total(article_id, -row[0], using)
+        return row[0]
+
+    def recount(self, using=DEFAULT_DB_ALIAS):
+        """Rebuild every article total from the clap rows, returns the number of articles."""
+        connection = connections[using]
+        table, _, article, count = self._columns(connection)
+        opts = self.article_model._meta
+        quote = connection.ops.quote_name
+        article_table = quote(opts.db_table)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {article_table} SET {quote(opts.get_field(self.total_field).column)} = ("
+                f"SELECT COALESCE(SUM({count}), 0) FROM {table}"
+                f" WHERE {table}.{article} = {article_table}.{quote(opts.pk.column)})"
+            )
+            return cursor.rowcount
+
+
+# KEYS[1] state hash of a (user, article) pair, KEYS[2] dirty sorted set.
+# ARGV: claps, limit, now, dirty member, TTL, count loaded from the
+# database or "" when the caller has not loaded it yet. Returns -1 when
+# the state is missing and has to be loaded, else {count, applied}.
+ADD_CLAPS = """
+if redis.call('exists', KEYS[1]) == 0 then
+    if ARGV[6] == '' then
+        return -1
+    end
+    redis.call('hset', KEYS[1], 'count', ARGV[6], 'pending', 0)
+    redis.call('expire', KEYS[1], ARGV[5])
+end
+local count = tonumber(redis.call('hget', KEYS[1], 'count'))
+local applied = math.max(0, math.min(tonumber(ARGV[1]), tonumber(ARGV[2]) - count))
+if applied > 0 then
+    redis.call('hincrby', KEYS[1], 'count', applied)
+    redis.call('hincrby', KEYS[1], 'pending', applied)
+    -- Pending claps must survive until they are written.
+    redis.call('persist', KEYS[1])
+    redis.call('zadd', KEYS[2], 'NX', ARGV[3], ARGV[4])
+end
+return {count + applied, applied}
+"""
+
+# KEYS[1] dirty sorted set, KEYS[2..] state hashes of ARGV[2..] members.
+# Takes the pending claps of every member, ARGV[1] is the TTL.
+DRAIN_CLAPS = """
+local drained = {}
+for index = 2, #KEYS do
+    local pending = tonumber(redis.call('hget', KEYS[index], 'pending') or 0)
+    if pending > 0 then
+        redis.call('hset', KEYS[index], 'pending', 0)
+        redis.call('expire', KEYS[index], ARGV[1])
+        table.insert(drained, pending)
+    else
+        table.insert(drained, 0)
+    end
+    redis.call('zrem', KEYS[1], ARGV[index])
+end
+return drained
+"""
+
+
+class ClapBursts:
+    """Coalesces clap bursts of a user on an article into one database write.
+
+    The user's clap count is kept in Redis, loaded from the database on
+    first use, and a script applies claps up to the limit atomically.
+    Applied claps stay pending for ``window`` seconds, ``flush`` writes the
+    pending claps of every older pair with a single ``ClapStore.apply``.
+    """
+
+    def __init__(self, store, window=2, ttl=3600, client=None, prefix="claps"):
+        self.store = store
+        self.window = window
+        self.ttl = ttl
+        self._client = client
+        self.prefix = prefix
+        self.dirty_key = f"{prefix}:dirty"
+        self.model_label = store.clap_label
+        self._scripts = {}
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def _script(self, source):
+        if source not in self._scripts:
+            self._scripts[source] = self.client.register_script(source)
+        return self._scripts[source]
+
+    def _key(self, member):
+        return f"{self.prefix}:{member}"
+
+    def add(self, user_id, article_id, claps=1, now=None):
+        """Clap ``claps`` times, returns ``(count, applied)`` as ``ClapStore.add`` does."""
+        member = f"{user_id}:{article_id}"
+        keys = [self._key(member), self.dirty_key]
+        args = [claps, self.store.limit, time.time() if now is None else now, member, self.ttl]
+
+        result = self._script(ADD_CLAPS)(keys=keys, args=[*args, ""])
+        if result == -1:
+            loaded = self.store.count(user_id, article_id)
+            result = self._script(ADD_CLAPS)(keys=keys, args=[*args, loaded])
+        count, applied = result
+        return count, applied
+
+    def remove(self, user_id, article_id):
+        """Drop the pending claps and the stored row, returns the removed count or ``None``."""
+        member = f"{user_id}:{article_id}"
+        pipe = self.client.pipeline()
+        pipe.hget(self._key(member), "pending")
+        pipe.delete(self._key(member))
+        pipe.zrem(self.dirty_key, member)
+        pending = int(pipe.execute()[0] or 0)
+
+        removed = (self.store.remove(user_id, article_id) or 0) + pending
+        return removed or None
+
+    def _restore(self, claps):
+        pipe = self.client.pipeline(transaction=False)
+        for user_id, article_id, amount in claps:
+            member = f"{user_id}:{article_id}"
+            pipe.hincrby(self._key(member), "pending", amount)
+            pipe.persist(self._key(member))
+            pipe.zadd(self.dirty_key, {member: 0})
+        pipe.execute()
+
+    def flush(self, batch_size=500, now=None):
+        """Write pending claps older than the window, returns the number of written pairs."""
+        cutoff = (time.time() if now is None else now) - self.window
+        flushed = 0
+        while True:
+            members = [
+                member.decode()
+                for member in self.client.zrangebyscore(self.dirty_key, "-inf", cutoff, start=0, num=batch_size)
+            ]
+            if not members:
+                return flushed
+
+            drained = self._script(DRAIN_CLAPS)(
+                keys=[self.dirty_key, *(self._key(member) for member in members)],
+                args=[self.ttl, *members],
+            )
+            claps = [
+                (*member.split(":"), amount)
+                for member, amount in zip(members, drained)
+                if amount
+            ]
+            try:
+                self.store.apply(claps)
+            except Exception:
+                # Put the claps back so the next flush retries them.
+                self._restore(claps)
+                raise
+
+            flushed += len(claps)
+
+
+claps = ClapStore()
+
+clap_bursts = ClapBursts(claps, window=settings.CLAPS_COALESCE_WINDOW)
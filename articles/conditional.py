@@ -0,0 +1,56 @@
+"""Conditional GET validators of the articles API, see ``core.conditional``."""
+from django.apps import apps
+
+from articles.detail_cache import article_detail_cache
+from core.conditional import collection_state, version_time, weak_etag
+from core.versions import collection_versions
+
+
+# Orders that depend on more than the articles, the leaderboard moves with
+# every view and recommendations differ per user.
+UNVALIDATED_LIST_PARAMS = ("get_top_articles", "is_recommend")
+
+
+def article_detail_state(request, pk, *args, **kwargs):
+    """From the detail cache versions, no database query.
+
+    No validators until the article's representation is cached, a missing
+    or unpublished article never answers 304.
+    """
+    versions = article_detail_cache.cached_versions(pk)
+    if versions is None:
+        return None, None
+    return weak_etag("article", pk, *versions), version_time(*versions)
+
+
+def article_list_state(request, *args, **kwargs):
+    """From the published articles' count and latest ``updated_at``.
+
+    Filters and pages are parts of the URL, every one of them changes when
+    the whole collection does. Topic renames and author edits do not touch
+    ``updated_at``, neither do topic changes of an article, their versions
+    are part of the validators. Leaderboard and recommended lists get none.
+    """
+    if any(param in request.GET for param in UNVALIDATED_LIST_PARAMS):
+        return None, None
+
+    Article = apps.get_model("articles.Article")
+    count, latest = collection_state(Article._default_manager.filter(status="publish"))
+    versions = collection_versions.get_many("articles", "topics", "authors")
+    last_modified = version_time(*versions)
+    if latest:
+        last_modified = max(latest, last_modified)
+    return weak_etag("articles", count, latest, *versions), last_modified
+
+
+def _collection_state(name):
+    version = collection_versions.get(name)
+    return weak_etag(name, version), version_time(version)
+
+
+def faq_list_state(request, *args, **kwargs):
+    return _collection_state("faqs")
+
+
+def topic_list_state(request, *args, **kwargs):
+    return _collection_state("topics")
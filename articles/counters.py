@@ -0,0 +1,163 @@
+import logging
+import threading
+
+from django.apps import apps
+from django.db import close_old_connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+from core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """Write-behind buffer for integer counter fields of a model.
+
+    Increments are accumulated in one Redis hash per object and the ids of
+    touched objects are tracked in a "dirty" set. ``flush`` drains the
+    hashes and applies the deltas with a single bulk UPDATE per batch.
+    """
+
+    def __init__(self, model, fields, client=None, prefix=None):
+        self.model_label = model
+        self.fields = tuple(fields)
+        self._client = client
+        self.prefix = prefix or f"counters:{model.lower()}"
+        self.dirty_key = f"{self.prefix}:dirty"
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    @property
+    def model(self):
+        # Resolved lazily so the buffer can be declared at import time.
+        return apps.get_model(self.model_label)
+
+    def _key(self, pk):
+        return f"{self.prefix}:{pk}"
+
+    @staticmethod
+    def _decode(raw):
+        return {field.decode(): int(value) for field, value in raw.items()}
+
+    def incr(self, pk, field, amount=1):
+        """Add ``amount`` to the pending delta of ``field`` for object ``pk``."""
+        if field not in self.fields:
+            raise ValueError(f"{field!r} is not a buffered field of {self.model_label}")
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(self._key(pk), field, amount)
+        pipe.sadd(self.dirty_key, pk)
+        pipe.execute()
+
+    def pending(self, pk):
+        """Return the not yet flushed deltas for object ``pk``."""
+        return self._decode(self.client.hgetall(self._key(pk)))
+
+    def pending_all(self):
+        """Return the not yet flushed deltas of every touched object, ``{pk: {field: delta}}``."""
+        pks = [pk.decode() for pk in self.client.smembers(self.dirty_key)]
+        pipe = self.client.pipeline(transaction=False)
+        for pk in pks:
+            pipe.hgetall(self._key(pk))
+        return {pk: self._decode(raw) for pk, raw in zip(pks, pipe.execute()) if raw}
+
+    def merge(self, *instances):
+        """Add pending deltas to the counter attributes of ``instances``.
+
+        Lets the API return read-your-writes counts before a flush.
+        """
+        if not instances:
+            return
+
+        pipe = self.client.pipeline(transaction=False)
+        for instance in instances:
+            pipe.hgetall(self._key(instance.pk))
+
+        for instance, raw in zip(instances, pipe.execute()):
+            for field, delta in self._decode(raw).items():
+                setattr(instance, field, getattr(instance, field) + delta)
+
+    def _drain(self, pks):
+        pipe = self.client.pipeline()
+        for pk in pks:
+            pipe.hgetall(self._key(pk))
+            pipe.delete(self._key(pk))
+        results = pipe.execute()
+
+        return {
+            pk: self._decode(raw)
+            for pk, raw in zip(pks, results[::2])
+            if raw
+        }
+
+    def _restore(self, deltas):
+        pipe = self.client.pipeline(transaction=False)
+        for pk, fields in deltas.items():
+            for field, delta in fields.items():
+                pipe.hincrby(self._key(pk), field, delta)
+            pipe.sadd(self.dirty_key, pk)
+        pipe.execute()
+
+    def _apply(self, deltas):
+        updates = {}
+        for field in self.fields:
+            whens = [
+                When(pk=pk, then=Value(fields[field]))
+                for pk, fields in deltas.items()
+                if fields.get(field)
+            ]
+            if whens:
+                updates[field] = F(field) + Case(*whens, default=Value(0), output_field=IntegerField())
+
+        if updates:
+            self.model._default_manager.filter(pk__in=list(deltas)).update(**updates)
+
+    def flush(self, batch_size=500):
+        """Apply all pending deltas to the database, returns the number of flushed objects."""
+        flushed = 0
+        while True:
+            pks = [pk.decode() for pk in self.client.spop(self.dirty_key, batch_size) or []]
+            if not pks:
+                return flushed
+
+            deltas = self._drain(pks)
+            if not deltas:
+                continue
+
+            try:
+                self._apply(deltas)
+            except Exception:
+                # Put the deltas back so the next flush retries them.
+                self._restore(deltas)
+                raise
+
+            flushed += len(deltas)
+
+
+class CounterFlusher(threading.Thread):
+    """Daemon thread that flushes counter buffers every ``interval`` seconds."""
+
+    def __init__(self, buffers, interval, batch_size=500):
+        super().__init__(name="counter-flusher", daemon=True)
+        self.buffers = buffers
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            for buffer in self.buffers:
+                try:
+                    buffer.flush(self.batch_size)
+                except Exception:
+                    logger.exception("Failed to flush %s buffer", buffer.model_label)
+                finally:
+                    close_old_connections()
+
+    def stop(self):
+        self._stopped.set()
+
+
+article_counters = CounterBuffer("articles.Article", fields=("views_count", "reads_count"))
@@ -0,0 +1,175 @@
+"""Cached ``GET /api/articles/{id}/`` representations.
+
+The serialized article, without its counters, is stored in a Django cache
+under a key holding the article's version and the topics generation.
+Saving the article, its topics or its author bumps a version, so stale
+entries are never read again and simply expire. Counters change with every
+view, they are read from the database and the write-behind buffer on each
+request instead of invalidating the entry.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import redis
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from articles.counters import article_counters
+from core.redis import get_redis_client
+from core.versions import CacheVersions
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("views_count", "reads_count", "claps_count")
+
+
+class ArticleDetailCache:
+    def __init__(self, model="articles.Article", serializer="articles.serializers.ArticleDetailSerializer",
+                 alias="default", timeout=3600, prefix="article:detail", counter_fields=COUNTER_FIELDS,
+                 counters=article_counters, client=None, metrics_interval=10, clock=time.monotonic):
+        self.model_label = model
+        self._serializer = serializer
+        self.alias = alias
+        # Versions are started for any requested pk, they expire with the data.
+        self._versions = CacheVersions(alias, prefix=f"{prefix}:version", timeout=timeout)
+        self.timeout = timeout
+        self.prefix = prefix
+        self.counter_fields = tuple(counter_fields)
+        self.counters = counters
+        self._client = client
+        self.metrics_key = f"{prefix}:metrics"
+        self.metrics_interval = metrics_interval
+        self.clock = clock
+        self._metrics = Counter()
+        self._metrics_flushed_at = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def serializer(self):
+        # A dotted path, the serializers import DRF and the models.
+        if isinstance(self._serializer, str):
+            self._serializer = import_string(self._serializer)
+        return self._serializer
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def versions(self, pk):
+        """``(article version, topics generation)`` of article ``pk``, the latest is its Last-Modified time."""
+        return self._versions.get_many(pk, "topics")
+
+    def _data_key(self, pk, versions=None):
+        version, topics = versions or self.versions(pk)
+        return f"{self.prefix}:{pk}:{version}:{topics}"
+
+    def cached_versions(self, pk):
+        """``versions(pk)`` while a representation of article ``pk`` is cached, ``None`` otherwise.
+
+        Only published articles are cached, so validators built from these
+        never match for a missing or unpublished article.
+        """
+        versions = self.versions(pk)
+        return versions if self.cache.has_key(self._data_key(pk, versions)) else None
+
+    def bump(self, *pks):
+        """Expire the cached representations of articles ``pks``."""
+        self._versions.bump(*pks)
+
+    def bump_topics(self):
+        """Expire every cached representation, topic names are part of all of them."""
+        self._versions.bump("topics")
+
+    def bump_author(self, author_id):
+        pks = list(self.model._default_manager.filter(author_id=author_id).values_list("pk", flat=True))
+        if pks:
+            self.bump(*pks)
+
+    def _load(self, pk):
+        return (
+            self.model._default_manager.select_related("author")
+            .prefetch_related("topics")
+            .filter(pk=pk, status="publish")
+            .first()
+        )
+
+    def _live_counters(self, pk, article=None):
+        if article is None:
+            row = self.model._default_manager.filter(pk=pk, status="publish").values(*self.counter_fields).first()
+            if row is None:
+                return None
+            article = SimpleNamespace(pk=pk, **row)
+        else:
+            article = SimpleNamespace(pk=pk, **{field: getattr(article, field) for field in self.counter_fields})
+        self.counters.merge(article)
+        return {field: getattr(article, field) for field in self.counter_fields}
+
+    def get(self, pk):
+        """The representation of published article ``pk`` with live counters, ``None`` if there is none."""
+        key = self._data_key(pk)
+        data = self.cache.get(key)
+        if data is not None:
+            self._record("hits")
+            counters = self._live_counters(pk)
+            if counters is None:
+                return None
+            return {**data, **counters}
+
+        self._record("misses")
+        article = self._load(pk)
+        if article is None:
+            return None
+        data = dict(self.serializer(article).data)
+        for field in self.counter_fields:
+            data.pop(field, None)
+        self.cache.set(key, data, self.timeout)
+        return {**data, **self._live_counters(pk, article)}
+
+    def _record(self, outcome):
+        with self._lock:
+            self._metrics[outcome] += 1
+            now = self.clock()
+            if now - self._metrics_flushed_at < self.metrics_interval:
+                return
+            metrics, self._metrics = self._metrics, Counter()
+            self._metrics_flushed_at = now
+        self.flush_metrics(metrics)
+
+    def flush_metrics(self, metrics=None):
+        """Add the hit and miss counts of this process to the shared ones in Redis."""
+        if metrics is None:
+            with self._lock:
+                metrics, self._metrics = self._metrics, Counter()
+                self._metrics_flushed_at = self.clock()
+        if not metrics:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for outcome, count in metrics.items():
+                pipe.hincrby(self.metrics_key, outcome, count)
+            pipe.execute()
+        except redis.RedisError:
+            logger.warning("Failed to record article detail cache metrics", exc_info=True)
+
+    def stats(self):
+        """Hits, misses and hit rate of all processes, as flushed so far."""
+        raw = self.client.hgetall(self.metrics_key)
+        hits, misses = int(raw.get(b"hits", 0)), int(raw.get(b"misses", 0))
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
+
+
+article_detail_cache = ArticleDetailCache(timeout=settings.ARTICLE_DETAIL_CACHE_TIMEOUT)
@@ -0,0 +1,237 @@
+import time
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+
+from articles.counters import article_counters
+from articles.utils import filter_by_ranked_ids
+from core.redis import get_redis_client
+
+
+class Leaderboard:
+    """Redis sorted set of integer ids ranked by score."""
+
+    def __init__(self, key, client=None):
+        self.key = key
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def incr(self, member, amount=1):
+        self.client.zincrby(self.key, amount, member)
+
+    def remove(self, *members):
+        if members:
+            self.client.zrem(self.key, *members)
+
+    def top(self, count, offset=0):
+        """Return ``(member, score)`` pairs ranked ``offset`` to ``offset + count``."""
+        rows = self.client.zrevrange(self.key, offset, offset + count - 1, withscores=True)
+        return [(int(member), int(score)) for member, score in rows]
+
+    def scores(self):
+        return {int(member): int(score) for member, score in self.client.zrange(self.key, 0, -1, withscores=True)}
+
+    def rebuild(self, scores, chunk_size=1000):
+        """Replace the leaderboard with ``scores`` atomically for readers."""
+        scores = {member: score for member, score in scores.items() if score}
+        staging = f"{self.key}:rebuild"
+        self.client.delete(staging)
+        items = list(scores.items())
+        for start in range(0, len(items), chunk_size):
+            self.client.zadd(staging, dict(items[start:start + chunk_size]))
+
+        if items:
+            self.client.rename(staging, self.key)
+        else:
+            self.client.delete(self.key)
+
+    def diff(self, scores):
+        """Members whose stored score differs from ``scores``, as ``{member: (stored, expected)}``."""
+        stored = self.scores()
+        return {
+            member: (stored.get(member, 0), scores.get(member, 0))
+            for member in stored.keys() | scores.keys()
+            if stored.get(member, 0) != scores.get(member, 0)
+        }
+
+
+class WindowedLeaderboard:
+    """Time windowed leaderboard built from bucketed sorted sets.
+
+    Every increment lands in the current hour and day bucket, buckets expire
+    once they fall out of the longest window. A window is read by merging
+    its buckets with ``ZUNIONSTORE``, older buckets weighted down by an
+    exponential decay, and the merged set is cached for ``cache_ttl``.
+    """
+
+    HOUR = 3600
+    DAY = 86400
+
+    # window: (bucket size, number of buckets, decay half-life in buckets)
+    WINDOWS = {
+        "24h": (HOUR, 24, 12),
+        "7d": (DAY, 7, 3),
+        "30d": (DAY, 30, 10),
+    }
+
+    def __init__(self, key, cache_ttl=60, client=None):
+        self.key = key
+        self.cache_ttl = cache_ttl
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def _bucket_key(self, size, bucket):
+        return f"{self.key}:{size}:{bucket}"
+
+    def incr(self, member, amount=1, now=None):
+        now = now or time.time()
+        # Windows share buckets of the same size, kept for the longest one.
+        retention = {}
+        for size, count, _ in self.WINDOWS.values():
+            retention[size] = max(retention.get(size, 0), count)
+
+        pipe = self.client.pipeline(transaction=False)
+        for size, count in retention.items():
+            key = self._bucket_key(size, int(now // size))
+            pipe.zincrby(key, amount, member)
+            pipe.expire(key, size * (count + 1))
+        pipe.execute()
+
+    def top(self, window, count, offset=0, now=None):
+        """Return ``(member, score)`` pairs of ``window``, scores rounded after decay."""
+        size, buckets, half_life = self.WINDOWS[window]
+        current = int((now or time.time()) // size)
+        merged = f"{self.key}:{window}:{current}"
+
+        if not self.client.exists(merged):
+            weights = {
+                self._bucket_key(size, current - age): 0.5 ** (age / half_life)
+                for age in range(buckets)
+            }
+            pipe = self.client.pipeline()
+            pipe.zunionstore(merged, weights)
+            pipe.expire(merged, self.cache_ttl)
+            pipe.execute()
+
+        rows = self.client.zrevrange(merged, offset, offset + count - 1, withscores=True)
+        return [(int(member), round(score)) for member, score in rows]
+
+
+author_reads = Leaderboard("leaderboard:authors:reads")
+
+article_views = Leaderboard("leaderboard:articles:views")
+
+article_views_windowed = WindowedLeaderboard("leaderboard:articles:views:window")
+
+
+def _pending(field):
+    """Buffered ``field`` deltas not yet in the database, the leaderboards already count them."""
+    return {
+        int(pk): deltas[field]
+        for pk, deltas in article_counters.pending_all().items()
+        if deltas.get(field)
+    }
+
+
+def live_author_reads():
+    """Sum of ``reads_count`` of published articles per author, from the database.
+
+    Inactive authors are included like in ``author_reads``, readers skip
+    them. Reads landing between this query and a rebuild are lost until
+    the next check.
+    """
+    Article = apps.get_model("articles.Article")
+    published = Article.objects.filter(status="publish")
+    totals = dict(published.values("author_id").annotate(total=Sum("reads_count")).values_list("author_id", "total"))
+
+    pending = _pending("reads_count")
+    for pk, author_id in published.filter(pk__in=list(pending)).values_list("pk", "author_id"):
+        totals[author_id] = (totals.get(author_id) or 0) + pending[pk]
+    return {author_id: total for author_id, total in totals.items() if total}
+
+
+def live_article_views():
+    """``views_count`` of published articles, from the database."""
+    Article = apps.get_model("articles.Article")
+    published = Article.objects.filter(status="publish")
+    views = dict(published.filter(views_count__gt=0).values_list("pk", "views_count"))
+
+    pending = _pending("views_count")
+    for pk in published.filter(pk__in=list(pending)).values_list("pk", flat=True):
+        views[pk] = views.get(pk, 0) + pending[pk]
+    return views
+
+
+def publication_changed(article, published, reads_count, views_count):
+    """Add or take out the counts of ``article`` when it is published, unpublished or deleted."""
+    pending = article_counters.pending(article.pk)
+    reads = reads_count + pending.get("reads_count", 0)
+    views = views_count + pending.get("views_count", 0)
+    if reads:
+        author_reads.incr(article.author_id, reads if published else -reads)
+    if published and views:
+        article_views.incr(article.pk, views)
+    elif not published:
+        article_views.remove(article.pk)
+
+
+def top_articles(queryset, limit, window=None):
+    """The ``limit`` most viewed articles of ``queryset``, all-time or in ``window``.
+
+    Meant to back ``get_top_articles`` of ``ArticleFilter``. Ids are read
+    from the leaderboard and only the matching rows are fetched.
+    """
+    if window is not None and window not in WindowedLeaderboard.WINDOWS:
+        raise ValueError(f"Unknown window {window!r}")
+
+    ids, offset = [], 0
+    while len(ids) < limit:
+        if window is None:
+            ranked = article_views.top(limit * 2, offset)
+        else:
+            ranked = article_views_windowed.top(window, limit * 2, offset)
+        if not ranked:
+            break
+
+        # Unpublished or filtered out articles are skipped.
+        members = [member for member, _ in ranked]
+        allowed = set(queryset.filter(pk__in=members).values_list("pk", flat=True))
+        ids += [member for member in members if member in allowed]
+        offset += len(ranked)
+
+    return filter_by_ranked_ids(queryset, ids[:limit])
+
+
+def popular_authors(limit=10):
+    """Active authors with the most reads, best first, served from ``author_reads``."""
+    User = get_user_model()
+    authors, offset = [], 0
+    while len(authors) < limit:
+        ranked = author_reads.top(limit * 2, offset)
+        if not ranked:
+            break
+
+        users = User.objects.in_bulk([member for member, _ in ranked])
+        for member, score in ranked:
+            user = users.get(member)
+            if user is not None and user.is_active:
+                user.reads_count = score
+                authors.append(user)
+        offset += len(ranked)
+
+    return authors[:limit]
+
+
+# Leaderboards with the database aggregate they mirror, used by the
+# rebuild_leaderboards and check_leaderboards commands.
+LEADERBOARDS = {
+    "authors": (author_reads, live_author_reads),
+    "articles": (article_views, live_article_views),
+}
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from articles.counters import article_counters
+from articles.leaderboards import LEADERBOARDS
+
+
+class Command(BaseCommand):
+    help = "Compare Redis leaderboards with the live database aggregates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help="Leaderboards to check, all by default.")
+        parser.add_argument("--fix", action="store_true", help="Rebuild leaderboards that drifted.")
+
+    def handle(self, *args, **options):
+        unknown = set(options["names"]) - LEADERBOARDS.keys()
+        if unknown:
+            raise CommandError(f"Unknown leaderboards: {', '.join(sorted(unknown))}")
+
+        # Pending counter deltas are already in the leaderboards.
+        article_counters.flush()
+
+        drifted = []
+        for name in options["names"] or LEADERBOARDS:
+            leaderboard, live_scores = LEADERBOARDS[name]
+            scores = live_scores()
+            diff = leaderboard.diff(scores)
+            if not diff:
+                self.stdout.write(self.style.SUCCESS(f"{name}: consistent ({len(scores)} entries)."))
+                continue
+
+            drifted.append(name)
+            self.stdout.write(self.style.WARNING(f"{name}: {len(diff)} entries differ."))
+            for member, (stored, expected) in sorted(diff.items())[:20]:
+                self.stdout.write(f"  {member}: stored={stored} expected={expected}")
+
+            if options["fix"]:
+                leaderboard.rebuild(scores)
+                self.stdout.write(self.style.SUCCESS(f"{name}: rebuilt."))
+
+        if drifted and not options["fix"]:
+            raise CommandError(f"Inconsistent leaderboards: {', '.join(drifted)}")
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from articles.counters import article_counters
+
+
+class Command(BaseCommand):
+    help = "Apply buffered views_count/reads_count deltas to the article table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.ARTICLE_COUNTERS_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        flushed = article_counters.flush(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Flushed counters of {flushed} articles."))
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from articles.claps import clap_bursts
+
+
+class Command(BaseCommand):
+    help = "Write coalesced claps older than the coalescing window to the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.ARTICLE_COUNTERS_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        written = clap_bursts.flush(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Written claps of {written} users."))
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from articles.reading_history import reading_history
+
+
+class Command(BaseCommand):
+    help = "Write queued reading history events to the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.ARTICLE_COUNTERS_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        written = reading_history.flush(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Written {written} reading history rows."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from articles.counters import article_counters
+from articles.leaderboards import LEADERBOARDS
+
+
+class Command(BaseCommand):
+    help = "Rebuild Redis leaderboards from the database aggregates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help="Leaderboards to rebuild, all by default.")
+
+    def handle(self, *args, **options):
+        unknown = set(options["names"]) - LEADERBOARDS.keys()
+        if unknown:
+            raise CommandError(f"Unknown leaderboards: {', '.join(sorted(unknown))}")
+
+        # Pending counter deltas are already in the leaderboards.
+        article_counters.flush()
+
+        for name in options["names"] or LEADERBOARDS:
+            leaderboard, live_scores = LEADERBOARDS[name]
+            scores = live_scores()
+            leaderboard.rebuild(scores)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {name} leaderboard with {len(scores)} entries."))
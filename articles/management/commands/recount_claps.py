@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from articles.claps import claps
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized clap totals of articles from the clap rows."
+
+    def handle(self, *args, **options):
+        updated = claps.recount()
+        self.stdout.write(self.style.SUCCESS(f"Recounted claps of {updated} articles."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from articles.recommendations import recommendations
+
+
+class Command(BaseCommand):
+    help = "Recompute cached recommendation candidates of users with new events."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        refreshed = recommendations.refresh_stale(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed recommendations of {refreshed} users."))
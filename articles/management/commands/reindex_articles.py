@@ -0,0 +1,41 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from articles import search, suggest
+
+
+class Command(BaseCommand):
+    help = "Rebuild the article full-text search and suggestion tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--drop", action="store_true", help="Drop and recreate the tables first.")
+
+    def handle(self, *args, **options):
+        Article = apps.get_model("articles.Article")
+        Topic = apps.get_model("articles.Topic")
+
+        with connection.cursor() as cursor:
+            for backend in (search.get_backend(connection), suggest.get_backend(connection)):
+                if options["drop"]:
+                    backend.drop_schema(cursor)
+                backend.ensure_schema(cursor)
+
+        suggest.index_terms(suggest.TOPIC, Topic.objects.values_list("pk", "name").iterator())
+
+        batch_size = options["batch_size"]
+        queryset = Article.objects.order_by("pk").prefetch_related("topics")
+        indexed, last_pk = 0, None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch[:batch_size])
+            if not batch:
+                break
+
+            search.index_articles(batch)
+            suggest.index_terms(suggest.ARTICLE, [(article.pk, article.title) for article in batch])
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} articles."))
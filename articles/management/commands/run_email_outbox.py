@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from articles.outbox import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Deliver due emails once and exit.")
+        parser.add_argument("--poll-interval", type=float, default=2.0)
+        parser.add_argument("--batch-size", type=int)
+
+    def handle(self, *args, **options):
+        worker = OutboxWorker(batch_size=options["batch_size"])
+        while True:
+            sent = worker.run_pending()
+            if options["once"]:
+                self.stdout.write(self.style.SUCCESS(f"Sent {sent} emails."))
+                return
+            if not sent:
+                time.sleep(options["poll_interval"])
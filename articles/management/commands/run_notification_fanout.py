@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from articles.notifications import FanoutWorker
+
+
+class Command(BaseCommand):
+    help = "Deliver queued new article notifications to followers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process pending jobs once and exit.")
+        parser.add_argument("--poll-interval", type=float, default=5.0)
+        parser.add_argument("--chunk-size", type=int)
+        parser.add_argument("--duty-cycle", type=float)
+
+    def handle(self, *args, **options):
+        worker = FanoutWorker(chunk_size=options["chunk_size"], duty_cycle=options["duty_cycle"])
+        while True:
+            processed = worker.run_pending()
+            if options["once"]:
+                self.stdout.write(self.style.SUCCESS(f"Processed {processed} fan-out jobs."))
+                return
+            if not processed:
+                time.sleep(options["poll_interval"])
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from articles.batch_scoring import load_matrices, score_all
+
+
+class Command(BaseCommand):
+    help = "Recompute recommendation candidates of every user with sparse matrix products."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-n", type=int, default=100)
+        parser.add_argument("--memory-mb", type=int, default=256, help="Memory budget of the score chunks.")
+        parser.add_argument("--processes", type=int, default=1)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        matrices = load_matrices()
+        loaded = time.monotonic()
+
+        users = score_all(
+            matrices,
+            n=options["top_n"],
+            memory_mb=options["memory_mb"],
+            processes=options["processes"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {users} users against {len(matrices.article_ids)} articles "
+            f"(load {loaded - started:.1f}s, score {time.monotonic() - loaded:.1f}s)."
+        ))
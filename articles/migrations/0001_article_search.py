@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    from articles.search import get_backend
+
+    with schema_editor.connection.cursor() as cursor:
+        get_backend(schema_editor.connection).ensure_schema(cursor)
+
+
+def drop_search_table(apps, schema_editor):
+    from articles.search import get_backend
+
+    with schema_editor.connection.cursor() as cursor:
+        get_backend(schema_editor.connection).drop_schema(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = []
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
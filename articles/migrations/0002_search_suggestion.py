@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def create_suggestion_table(apps, schema_editor):
+    from articles.suggest import get_backend
+
+    with schema_editor.connection.cursor() as cursor:
+        get_backend(schema_editor.connection).ensure_schema(cursor)
+
+
+def drop_suggestion_table(apps, schema_editor):
+    from articles.suggest import get_backend
+
+    with schema_editor.connection.cursor() as cursor:
+        get_backend(schema_editor.connection).drop_schema(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0001_article_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_suggestion_table, drop_suggestion_table),
+    ]
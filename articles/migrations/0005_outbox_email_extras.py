@@ -0,0 +1,28 @@
+# Generated by Django 4.2.14 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='attachments',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='outboxemail',
+            name='headers',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='outboxemail',
+            name='reply_to',
+            field=models.JSONField(default=list),
+        ),
+    ]
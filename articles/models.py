@@ -1,2 +1,75 @@
+from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class NotificationFanout(models.Model):
+    """Background delivery of a new article notification to the author's followers.
+
+    ``last_follow_id`` is advanced in the same transaction as every chunk of
+    notifications, so a job resumes exactly where it stopped after a crash.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        DONE = "done", "Done"
+
+    author_id = models.BigIntegerField()
+    article_id = models.BigIntegerField()
+    message = models.TextField()
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING, db_index=True)
+    last_follow_id = models.BigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    leased_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "notification_fanout"
+        verbose_name = "Notification Fanout"
+        verbose_name_plural = "Notification Fanouts"
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"Article {self.article_id} to followers of {self.author_id} ({self.status})"
+
+
+class OutboxEmail(models.Model):
+    """An email waiting for delivery by ``run_email_outbox``.
+
+    Failed deliveries are retried with exponential backoff from
+    ``next_attempt_at`` until ``EMAIL_OUTBOX_MAX_ATTEMPTS``.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    subject = models.TextField()
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    # [{"filename": ..., "content": base64, "mimetype": ...}]
+    attachments = models.JSONField(default=list)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    leased_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "email_outbox"
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="email_outbox_due_idx")]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
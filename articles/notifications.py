@@ -0,0 +1,235 @@
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from articles.models import NotificationFanout
+from core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Adds ARGV[1] to every existing key, missing keys are left for the next
+# read to load from the database. Values never drop below zero.
+INCR_EXISTING = """
+for _, key in ipairs(KEYS) do
+    if redis.call('exists', key) == 1 then
+        if redis.call('incrby', key, ARGV[1]) < 0 then
+            redis.call('set', key, 0, 'KEEPTTL')
+        end
+    end
+end
+return #KEYS
+"""
+
+# Sets KEYS[1] to the counted ARGV[1] unless a concurrent read seeded it
+# first, returns the stored value so increments since then are kept.
+SEED = """
+local current = redis.call('get', KEYS[1])
+if current then
+    return tonumber(current)
+end
+redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return tonumber(ARGV[1])
+"""
+
+
+class UnreadCounter:
+    """Unread notification count per user, cached in Redis.
+
+    A missing key is loaded from the database on read, writes only adjust
+    existing keys, so a lost update heals once the key expires.
+    """
+
+    def __init__(self, ttl=3600, client=None, prefix="notifications:unread"):
+        self.ttl = ttl
+        self._client = client
+        self.prefix = prefix
+        self._incr_existing = None
+        self._seed = None
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def _key(self, user_id):
+        return f"{self.prefix}:{user_id}"
+
+    def get(self, user_id):
+        cached = self.client.get(self._key(user_id))
+        if cached is not None:
+            return int(cached)
+
+        Notification = apps.get_model("users.Notification")
+        count = Notification.objects.filter(user_id=user_id, read_at__isnull=True).count()
+        if self._seed is None:
+            self._seed = self.client.register_script(SEED)
+        return self._seed(keys=[self._key(user_id)], args=[count, self.ttl])
+
+    def incr(self, user_ids, amount=1):
+        keys = [self._key(user_id) for user_id in user_ids]
+        if keys:
+            if self._incr_existing is None:
+                self._incr_existing = self.client.register_script(INCR_EXISTING)
+            self._incr_existing(keys=keys, args=[amount])
+
+    def reset(self, user_id):
+        self.client.set(self._key(user_id), 0, ex=self.ttl)
+
+
+unread_notifications = UnreadCounter()
+
+
+def notification_channel(user_id):
+    return f"notifications:user:{user_id}"
+
+
+def publish_notifications(notifications, client=None):
+    """Push new notifications to their users' stream channels in one round trip."""
+    pipe = (client or get_redis_client()).pipeline(transaction=False)
+    for notification in notifications:
+        pipe.publish(
+            notification_channel(notification.user_id),
+            json.dumps({"id": notification.pk, "message": notification.message}),
+        )
+    pipe.execute()
+
+
+def mark_read(user_id, notification_ids):
+    """Mark notifications of the user as read, returns the number of changed rows."""
+    Notification = apps.get_model("users.Notification")
+    updated = Notification.objects.filter(
+        user_id=user_id, pk__in=notification_ids, read_at__isnull=True,
+    ).update(read_at=timezone.now())
+    if updated:
+        unread_notifications.incr([user_id], -updated)
+    return updated
+
+
+def mark_all_read(user_id):
+    """Mark every unread notification of the user as read with a single UPDATE."""
+    Notification = apps.get_model("users.Notification")
+    updated = Notification.objects.filter(user_id=user_id, read_at__isnull=True).update(read_at=timezone.now())
+    # Notifications created meanwhile stay counted, unlike with reset().
+    if updated:
+        unread_notifications.incr([user_id], -updated)
+    return updated
+
+
+def schedule_publish_notifications(article):
+    """Queue notifications of ``article`` to the author's followers.
+
+    Only inserts the fan-out job, the publish request returns right away and
+    ``run_notification_fanout`` delivers the notifications.
+    """
+    return NotificationFanout.objects.create(
+        author_id=article.author_id,
+        article_id=article.pk,
+        message=f"{article.author.username} yangi maqola e'lon qildi: {article.title}",
+    )
+
+
+class FanoutWorker:
+    """Delivers fan-out jobs in chunks of ``bulk_create``.
+
+    Jobs are claimed with a lease that is renewed with every chunk, a job
+    whose worker died is picked up again once its lease expires. Progress
+    is only saved while the lease is still the worker's own. After each
+    chunk the worker sleeps so that it spends at most ``duty_cycle`` of its
+    time in the database.
+    """
+
+    def __init__(self, chunk_size=None, duty_cycle=None, lease=None, sleep=time.sleep):
+        self.chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+        self.duty_cycle = duty_cycle or settings.NOTIFICATION_FANOUT_DUTY_CYCLE
+        self.lease = timedelta(seconds=lease or settings.NOTIFICATION_FANOUT_LEASE)
+        self.sleep = sleep
+
+    def claim(self, job_id):
+        """Lease the pending job ``job_id``, returns it as stored or ``None`` when it is taken."""
+        now = timezone.now()
+        leased_until = now + self.lease
+        free = Q(leased_until__isnull=True) | Q(leased_until__lt=now)
+        with transaction.atomic():
+            pending = (
+                NotificationFanout.objects.select_for_update(skip_locked=True)
+                .filter(free, pk=job_id, status=NotificationFanout.Status.PENDING)
+                .values_list("pk", flat=True)
+            )
+            # The lease condition again, for databases without row locks.
+            NotificationFanout.objects.filter(free, pk__in=list(pending)).update(leased_until=leased_until)
+        return NotificationFanout.objects.filter(pk=job_id, leased_until=leased_until).first()
+
+    def _advance(self, job, **fields):
+        """Save progress of ``job`` and renew its lease, as long as this worker still holds it."""
+        updated = NotificationFanout.objects.filter(pk=job.pk, leased_until=job.leased_until).update(
+            updated_at=timezone.now(), **fields,
+        )
+        if not updated:
+            raise RuntimeError(f"Notification fan-out {job.pk} was leased by another worker")
+        for name, value in fields.items():
+            setattr(job, name, value)
+
+    def process(self, job):
+        """Deliver the remaining notifications of a claimed ``job``, returns the number sent."""
+        Follow = apps.get_model("users.Follow")
+        Notification = apps.get_model("users.Notification")
+
+        sent = 0
+        while True:
+            started = time.monotonic()
+            with transaction.atomic():
+                follows = list(
+                    Follow.objects.filter(followee_id=job.author_id, pk__gt=job.last_follow_id)
+                    .order_by("pk")
+                    .values_list("pk", "follower_id")[:self.chunk_size]
+                )
+                if not follows:
+                    self._advance(job, status=NotificationFanout.Status.DONE, leased_until=None)
+                    return sent
+
+                # Progress first, a worker that lost the lease rolls back before creating anything.
+                self._advance(
+                    job,
+                    last_follow_id=follows[-1][0],
+                    sent_count=job.sent_count + len(follows),
+                    leased_until=timezone.now() + self.lease,
+                )
+                created = Notification.objects.bulk_create(
+                    [Notification(user_id=follower_id, message=job.message) for _, follower_id in follows]
+                )
+                transaction.on_commit(lambda created=created: self._announce(created))
+
+            sent += len(follows)
+            self._throttle(time.monotonic() - started)
+
+    @staticmethod
+    def _announce(notifications):
+        unread_notifications.incr([notification.user_id for notification in notifications])
+        publish_notifications(notifications)
+
+    def _throttle(self, elapsed):
+        if self.duty_cycle < 1:
+            self.sleep(elapsed * (1 - self.duty_cycle) / self.duty_cycle)
+
+    def run_pending(self):
+        """Process every claimable pending job, returns the number of processed jobs."""
+        processed = 0
+        pending = NotificationFanout.objects.filter(status=NotificationFanout.Status.PENDING).values_list("pk", flat=True)
+        for job_id in list(pending):
+            job = self.claim(job_id)
+            if job is None:
+                continue
+            try:
+                sent = self.process(job)
+            except Exception:
+                logger.exception("Notification fan-out %s failed, it resumes once its lease expires", job_id)
+                continue
+            logger.info("Notification fan-out %s sent %s notifications", job_id, sent)
+            processed += 1
+        return processed
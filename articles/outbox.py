@@ -0,0 +1,226 @@
+import base64
+import logging
+import smtplib
+from datetime import timedelta
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from articles.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# The connection is gone, the remaining emails of the batch wait for a new one.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError)
+
+# No connection could be opened, no email is to blame.
+OPEN_ERRORS = (smtplib.SMTPException, OSError)
+
+# Longest pause (seconds) after connections keep failing to open.
+MAX_CONNECTION_PAUSE = 600
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """Email backend that stores messages in the outbox instead of sending them.
+
+    Attachments given as ``(filename, content, mimetype)`` are stored with
+    the message. MIME attachments and alternatives other than HTML cannot
+    be stored and raise ``ValueError``.
+    """
+
+    def send_messages(self, email_messages):
+        rows = []
+        for message in email_messages:
+            alternatives = getattr(message, "alternatives", [])
+            if any(mimetype != "text/html" for _, mimetype in alternatives):
+                raise ValueError("Only text/html alternatives can be stored in the outbox")
+            html_body = next(
+                (content for content, mimetype in alternatives if mimetype == "text/html"),
+                message.body if message.content_subtype == "html" else "",
+            )
+            rows.append(OutboxEmail(
+                from_email=message.from_email,
+                to=list(message.to),
+                cc=list(message.cc),
+                bcc=list(message.bcc),
+                subject=message.subject,
+                body=message.body,
+                html_body=html_body,
+                reply_to=list(message.reply_to),
+                headers=dict(message.extra_headers),
+                attachments=[stored_attachment(attachment) for attachment in message.attachments],
+            ))
+        OutboxEmail.objects.bulk_create(rows)
+        return len(rows)
+
+
+def stored_attachment(attachment):
+    if isinstance(attachment, MIMEBase):
+        raise ValueError("MIME attachments cannot be stored in the outbox")
+    filename, content, mimetype = attachment
+    if isinstance(content, str):
+        content = content.encode()
+    return {"filename": filename, "content": base64.b64encode(content).decode(), "mimetype": mimetype}
+
+
+def outbox_message(email):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, email.to, cc=email.cc, bcc=email.bcc,
+        reply_to=email.reply_to, headers=email.headers,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    for attachment in email.attachments:
+        message.attach(attachment["filename"], base64.b64decode(attachment["content"]), attachment["mimetype"])
+    return message
+
+
+class OutboxWorker:
+    """Delivers outbox emails in batches over one persistent connection.
+
+    Batches are claimed with a lease that is renewed while the batch is
+    sent, an email whose worker died is picked up again once its lease
+    expires. The connection stays open while there
+    is work and is recycled every ``messages_per_connection`` messages.
+    When it cannot be opened the claimed emails are released without an
+    attempt and the worker pauses, ``backoff`` seconds doubled with every
+    failure in a row.
+    """
+
+    def __init__(self, batch_size=None, max_attempts=None, backoff=None, lease=60,
+                 messages_per_connection=None, backend=None):
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        self.backoff = backoff or settings.EMAIL_OUTBOX_BACKOFF
+        self.lease = timedelta(seconds=lease)
+        self.messages_per_connection = messages_per_connection or settings.EMAIL_OUTBOX_MESSAGES_PER_CONNECTION
+        self.backend = backend or settings.EMAIL_OUTBOX_BACKEND
+        self.connection = None
+        self._sent_on_connection = 0
+        self._open_failures = 0
+        self.paused_until = None
+
+    def paused(self):
+        return self.paused_until is not None and timezone.now() < self.paused_until
+
+    def claim(self):
+        """Lease a batch of due emails, returns them."""
+        now = timezone.now()
+        leased_until = now + self.lease
+        free = Q(leased_until__isnull=True) | Q(leased_until__lt=now)
+        with transaction.atomic():
+            due = (
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(free, status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now)
+                .order_by("next_attempt_at", "pk")
+                .values_list("pk", flat=True)[:self.batch_size]
+            )
+            pks = list(due)
+            # The lease condition again, for databases without row locks.
+            OutboxEmail.objects.filter(free, pk__in=pks).update(leased_until=leased_until)
+        return list(OutboxEmail.objects.filter(pk__in=pks, leased_until=leased_until).order_by("pk"))
+
+    def _connection(self):
+        if self.connection is None:
+            connection = get_connection(self.backend)
+            connection.open()
+            self.connection = connection
+            self._sent_on_connection = 0
+            self._open_failures = 0
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                logger.warning("Failed to close the email connection", exc_info=True)
+            self.connection = None
+
+    def _release(self, emails):
+        """Give ``emails`` back to the next claim without counting an attempt."""
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(leased_until=None)
+
+    def _pause(self, exc):
+        self._open_failures += 1
+        delay = min(self.backoff * 2 ** (self._open_failures - 1), MAX_CONNECTION_PAUSE)
+        self.paused_until = timezone.now() + timedelta(seconds=delay)
+        logger.warning("Failed to open the email connection, pausing for %s seconds: %s", delay, exc)
+
+    def _renew(self, emails):
+        """Extend the lease of ``emails`` that is still this worker's."""
+        leased_until = timezone.now() + self.lease
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in emails], leased_until=emails[0].leased_until).update(
+            leased_until=leased_until,
+        )
+        for email in emails:
+            email.leased_until = leased_until
+
+    def deliver(self, emails):
+        """Send ``emails`` and record the outcome, returns the number sent."""
+        sent, failed = [], []
+        renew_at = timezone.now() + self.lease / 2
+        for index, email in enumerate(emails):
+            if timezone.now() >= renew_at:
+                self._renew(emails[index:])
+                renew_at = timezone.now() + self.lease / 2
+            try:
+                connection = self._connection()
+            except OPEN_ERRORS as exc:
+                self._release(emails[index:])
+                self._pause(exc)
+                break
+            try:
+                connection.send_messages([outbox_message(email)])
+            except CONNECTION_ERRORS as exc:
+                self.close()
+                failed.append((email, exc))
+                # Not tried, they wait for the next claim without an attempt.
+                self._release(emails[index + 1:])
+                break
+            except Exception as exc:
+                failed.append((email, exc))
+            else:
+                sent.append(email.pk)
+                self._sent_on_connection += 1
+                if self._sent_on_connection >= self.messages_per_connection:
+                    self.close()
+
+        now = timezone.now()
+        if sent:
+            OutboxEmail.objects.filter(pk__in=sent).update(
+                status=OutboxEmail.Status.SENT, sent_at=now, attempts=F("attempts") + 1, leased_until=None,
+            )
+        for email, exc in failed:
+            email.attempts += 1
+            email.last_error = f"{type(exc).__name__}: {exc}"
+            email.leased_until = None
+            if email.attempts >= self.max_attempts:
+                email.status = OutboxEmail.Status.FAILED
+                logger.error("Giving up on outbox email %s: %s", email.pk, email.last_error)
+            else:
+                email.next_attempt_at = now + timedelta(seconds=self.backoff * 2 ** (email.attempts - 1))
+        OutboxEmail.objects.bulk_update(
+            [email for email, _ in failed],
+            ["attempts", "last_error", "leased_until", "status", "next_attempt_at"],
+        )
+        return len(sent)
+
+    def run_pending(self):
+        """Deliver every due email unless paused, returns the number sent."""
+        sent = 0
+        try:
+            while not self.paused():
+                emails = self.claim()
+                if not emails:
+                    break
+                sent += self.deliver(emails)
+            return sent
+        finally:
+            # Servers drop idle connections, reconnect with the next work.
+            self.close()
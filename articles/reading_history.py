@@ -0,0 +1,69 @@
+from django.apps import apps
+from django.conf import settings
+
+from core.redis import get_redis_client
+
+
+class ReadingHistoryBuffer:
+    """Buffered ingestion of reading history rows.
+
+    Repeat views of the same (user, article) pair within ``window`` seconds
+    are collapsed with a ``SET NX`` marker, the remaining events are queued
+    in a Redis list and written by ``flush`` with ``bulk_create``.
+    """
+
+    def __init__(self, model, window=600, client=None, prefix=None):
+        self.model_label = model
+        self.window = window
+        self._client = client
+        self.prefix = prefix or f"history:{model.lower()}"
+        self.queue_key = f"{self.prefix}:queue"
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def record(self, user_id, article_id, buffered=None):
+        """Record that ``user_id`` viewed ``article_id``.
+
+        Writes synchronously unless buffering is enabled, either with
+        ``buffered`` or the READING_HISTORY_BUFFERED setting.
+        """
+        if buffered is None:
+            buffered = settings.READING_HISTORY_BUFFERED
+
+        if not buffered:
+            self.model._default_manager.create(user_id=user_id, article_id=article_id)
+            return
+
+        event = f"{user_id}:{article_id}"
+        if self.client.set(f"{self.prefix}:seen:{event}", 1, nx=True, ex=self.window):
+            self.client.rpush(self.queue_key, event)
+
+    def flush(self, batch_size=500):
+        """Write queued events to the database, returns the number of written events."""
+        written = 0
+        while True:
+            events = self.client.lpop(self.queue_key, batch_size)
+            if not events:
+                return written
+
+            rows = []
+            for event in events:
+                user_id, article_id = event.decode().split(":")
+                rows.append(self.model(user_id=user_id, article_id=article_id))
+
+            try:
+                self.model._default_manager.bulk_create(rows, ignore_conflicts=True)
+            except Exception:
+                self.client.lpush(self.queue_key, *reversed(events))
+                raise
+
+            written += len(rows)
+
+
+reading_history = ReadingHistoryBuffer("users.ReadingHistory", window=settings.READING_HISTORY_WINDOW)
@@ -0,0 +1,207 @@
+import json
+from collections import defaultdict
+
+from django.apps import apps
+from django.db.models import Case, FloatField, Sum, Value, When
+
+from articles.utils import filter_by_ranked_ids
+from core.redis import get_redis_client
+
+# Affinity added to every topic of the article (or the topic itself) per event.
+EVENT_WEIGHTS = {
+    "more": 5.0,
+    "follow": 3.0,
+    "clap": 1.0,
+    "read": 0.5,
+}
+
+
+class RecommendationEngine:
+    """Per-user topic affinities with precomputed candidate articles.
+
+    Events add weights to the user's affinity hash in Redis and mark the
+    user stale. Candidates, the ``candidates`` best scored published
+    articles over the ``topics`` strongest affinities, are cached as a list
+    of ids so the feed is a single ``id__in`` query. "less" topics are kept
+    in an excluded set and never recommended.
+    """
+
+    def __init__(self, candidates=100, topics=20, ttl=86400, client=None, prefix="reco"):
+        self.candidates = candidates
+        self.topics = topics
+        self.ttl = ttl
+        self._client = client
+        self.prefix = prefix
+        self.stale_key = f"{prefix}:stale"
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def _affinity_key(self, user_id):
+        return f"{self.prefix}:affinity:{user_id}"
+
+    def _excluded_key(self, user_id):
+        return f"{self.prefix}:excluded:{user_id}"
+
+    def _candidates_key(self, user_id):
+        return f"{self.prefix}:candidates:{user_id}"
+
+    def record(self, user_id, topic_ids, event, amount=1):
+        """Add the ``event`` weight times ``amount`` to the affinity of ``topic_ids``."""
+        topic_ids = list(topic_ids)
+        if not topic_ids:
+            return
+
+        weight = EVENT_WEIGHTS[event] * amount
+        pipe = self.client.pipeline(transaction=False)
+        for topic_id in topic_ids:
+            pipe.hincrbyfloat(self._affinity_key(user_id), topic_id, weight)
+        if event == "more":
+            # Explicit feedback shows up on the next feed request, other
+            # events wait for the stale refresh.
+            pipe.srem(self._excluded_key(user_id), *topic_ids)
+            pipe.delete(self._candidates_key(user_id))
+        pipe.sadd(self.stale_key, user_id)
+        pipe.execute()
+
+    def exclude(self, user_id, topic_ids):
+        """Never recommend ``topic_ids`` to the user, until marked "more" again."""
+        topic_ids = list(topic_ids)
+        if not topic_ids:
+            return
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.sadd(self._excluded_key(user_id), *topic_ids)
+        pipe.hdel(self._affinity_key(user_id), *topic_ids)
+        pipe.delete(self._candidates_key(user_id))
+        pipe.sadd(self.stale_key, user_id)
+        pipe.execute()
+
+    def affinity(self, user_id):
+        """Return the ``({topic_id: weight}, excluded topic ids)`` of the user."""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._affinity_key(user_id))
+        pipe.smembers(self._excluded_key(user_id))
+        weights, excluded = pipe.execute()
+        return (
+            {int(topic_id): float(weight) for topic_id, weight in weights.items()},
+            {int(topic_id) for topic_id in excluded},
+        )
+
+    def affinity_user_ids(self):
+        """Yield the ids of users with an affinity hash."""
+        prefix = self._affinity_key("")
+        for key in self.client.scan_iter(match=f"{prefix}*", count=1000):
+            if isinstance(key, bytes):
+                key = key.decode()
+            yield int(key[len(prefix):])
+
+    def compute_candidates(self, user_id, affinity=None, excluded=None):
+        """Score published articles against the user's affinity in the database."""
+        if affinity is None:
+            affinity, excluded = self.affinity(user_id)
+
+        strongest = sorted(
+            ((weight, topic_id) for topic_id, weight in affinity.items() if weight > 0),
+            reverse=True,
+        )[:self.topics]
+        if not strongest:
+            return []
+
+        Article = apps.get_model("articles.Article")
+        score = Sum(Case(
+            *[When(topics__id=topic_id, then=Value(weight)) for weight, topic_id in strongest],
+            default=Value(0.0),
+            output_field=FloatField(),
+        ))
+        queryset = Article.objects.filter(status="publish", topics__in=[topic_id for _, topic_id in strongest])
+        if excluded:
+            queryset = queryset.exclude(topics__in=excluded)
+
+        return list(
+            queryset.annotate(score=score)
+            .order_by("-score", "-created_at")
+            .values_list("pk", flat=True)[:self.candidates]
+        )
+
+    def refresh(self, user_id):
+        affinity, excluded = self.affinity(user_id)
+        ids = self.compute_candidates(user_id, affinity=affinity, excluded=excluded)
+        # Users without affinity are not cached so their first event counts.
+        if affinity:
+            self.client.set(self._candidates_key(user_id), json.dumps(ids), ex=self.ttl)
+        return ids
+
+    def refresh_stale(self, batch_size=500):
+        """Recompute candidates of users with new events, returns their number."""
+        refreshed = 0
+        while True:
+            user_ids = self.client.spop(self.stale_key, batch_size)
+            if not user_ids:
+                return refreshed
+
+            for user_id in user_ids:
+                self.refresh(int(user_id))
+            refreshed += len(user_ids)
+
+    def store_candidates(self, candidates):
+        """Cache precomputed ``{user_id: [article ids]}`` in one round trip."""
+        pipe = self.client.pipeline(transaction=False)
+        for user_id, ids in candidates.items():
+            pipe.set(self._candidates_key(user_id), json.dumps(ids), ex=self.ttl)
+        pipe.execute()
+
+    def candidate_ids(self, user_id):
+        """Cached candidate ids of the user, computed on a miss."""
+        cached = self.client.get(self._candidates_key(user_id))
+        if cached is not None:
+            return json.loads(cached)
+        return self.refresh(user_id)
+
+    def recommended_articles(self, queryset, user_id):
+        """Narrow ``queryset`` to the user's candidates, best first.
+
+        Meant to back ``is_recommend`` of ``ArticleFilter``. Users without any
+        affinity yet get ``queryset`` minus their excluded topics.
+        """
+        ids = self.candidate_ids(user_id)
+        if ids:
+            return filter_by_ranked_ids(queryset, ids)
+
+        affinity, excluded = self.affinity(user_id)
+        if affinity:
+            return queryset.none()
+        return queryset.exclude(topics__in=excluded) if excluded else queryset
+
+
+def affinity_from_db(user_id, exclude_article_ids=()):
+    """Rebuild a user's affinity from reads, claps and followed topics.
+
+    Used for offline evaluation and to backfill Redis. "more"/"less"
+    recommendations only exist as events and are not included.
+    """
+    Article = apps.get_model("articles.Article")
+    ReadingHistory = apps.get_model("users.ReadingHistory")
+    Clap = apps.get_model("articles.Clap")
+    TopicFollow = apps.get_model("articles.TopicFollow")
+
+    article_weights = defaultdict(float)
+    read_ids = ReadingHistory.objects.filter(user_id=user_id).values_list("article_id", flat=True)
+    for article_id in read_ids:
+        article_weights[article_id] += EVENT_WEIGHTS["read"]
+    for article_id, count in Clap.objects.filter(user_id=user_id).values_list("article_id", "count"):
+        article_weights[article_id] += EVENT_WEIGHTS["clap"] * count
+    for article_id in exclude_article_ids:
+        article_weights.pop(article_id, None)
+
+    affinity = defaultdict(float)
+    article_topics = Article.topics.through.objects.filter(article_id__in=list(article_weights))
+    for article_id, topic_id in article_topics.values_list("article_id", "topic_id"):
+        affinity[topic_id] += article_weights[article_id]
+    for topic_id in TopicFollow.objects.filter(user_id=user_id).values_list("topic_id", flat=True):
+        affinity[topic_id] += EVENT_WEIGHTS["follow"]
+    return dict(affinity)
+
+
+recommendations = RecommendationEngine()
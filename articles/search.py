@@ -0,0 +1,174 @@
+import re
+
+from django.db import connection, connections
+from django.db.models.expressions import RawSQL
+
+TABLE = "article_search"
+
+
+def _terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def article_document(article):
+    """Return the indexed fields of an article, topics prefetched if possible."""
+    return (
+        article.pk,
+        article.title or "",
+        article.summary or "",
+        article.content or "",
+        " ".join(topic.name for topic in article.topics.all()),
+    )
+
+
+class PostgresSearchBackend:
+    """tsvector shadow table with a GIN index, ranked with ``ts_rank``."""
+
+    def ensure_schema(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            " article_id bigint PRIMARY KEY,"
+            " document tsvector NOT NULL)"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_document_gin ON {TABLE} USING GIN (document)")
+
+    def drop_schema(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def index(self, cursor, documents):
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (article_id, document) VALUES (%s,"
+            " setweight(to_tsvector('simple', %s), 'A')"
+            " || setweight(to_tsvector('simple', %s), 'B')"
+            " || setweight(to_tsvector('simple', %s), 'C')"
+            " || setweight(to_tsvector('simple', %s), 'A'))"
+            " ON CONFLICT (article_id) DO UPDATE SET document = EXCLUDED.document",
+            documents,
+        )
+
+    def remove(self, cursor, pks):
+        cursor.execute(f"DELETE FROM {TABLE} WHERE article_id = ANY(%s)", [list(pks)])
+
+    @staticmethod
+    def _query(terms):
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def search(self, cursor, terms, limit):
+        cursor.execute(
+            f"SELECT article_id FROM {TABLE}, to_tsquery('simple', %s) query"
+            " WHERE document @@ query ORDER BY ts_rank(document, query) DESC LIMIT %s",
+            [self._query(terms), limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def matches(self, terms):
+        """``(sql, params)`` selecting the ids of matching articles."""
+        return f"SELECT article_id FROM {TABLE} WHERE document @@ to_tsquery('simple', %s)", [self._query(terms)]
+
+    def rank(self, terms, column):
+        """``(sql, params)`` of the rank of the article in ``column``, higher is better."""
+        return (
+            f"SELECT ts_rank(document, to_tsquery('simple', %s)) FROM {TABLE} WHERE article_id = {column}",
+            [self._query(terms)],
+        )
+
+
+class SQLiteSearchBackend:
+    """FTS5 shadow table keyed by the article id, ranked with ``bm25``."""
+
+    def ensure_schema(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE}"
+            " USING fts5(title, summary, content, topics, tokenize='unicode61')"
+        )
+
+    def drop_schema(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def index(self, cursor, documents):
+        documents = list(documents)
+        cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [[doc[0]] for doc in documents])
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (rowid, title, summary, content, topics) VALUES (%s, %s, %s, %s, %s)",
+            documents,
+        )
+
+    def remove(self, cursor, pks):
+        cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [[pk] for pk in pks])
+
+    # Column weights of bm25, in the order of the table's columns.
+    WEIGHTS = "10.0, 5.0, 1.0, 10.0"
+
+    @staticmethod
+    def _query(terms):
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(self, cursor, terms, limit):
+        cursor.execute(
+            f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s"
+            f" ORDER BY bm25({TABLE}, {self.WEIGHTS}) LIMIT %s",
+            [self._query(terms), limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def matches(self, terms):
+        return f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s", [self._query(terms)]
+
+    def rank(self, terms, column):
+        # bm25 is lower for better matches.
+        return (
+            f"SELECT -bm25({TABLE}, {self.WEIGHTS}) FROM {TABLE} WHERE {TABLE} MATCH %s AND rowid = {column}",
+            [self._query(terms)],
+        )
+
+
+def get_backend(using=connection):
+    if using.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return SQLiteSearchBackend()
+
+
+def index_articles(articles, using=connection):
+    backend = get_backend(using)
+    with using.cursor() as cursor:
+        backend.index(cursor, [article_document(article) for article in articles])
+
+
+def remove_articles(pks, using=connection):
+    backend = get_backend(using)
+    with using.cursor() as cursor:
+        backend.remove(cursor, pks)
+
+
+def search_article_ids(query, limit=1000, using=connection):
+    """Return ids of the ``limit`` best articles matching every term of ``query``."""
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    backend = get_backend(using)
+    with using.cursor() as cursor:
+        return backend.search(cursor, terms, limit)
+
+
+def search_articles(queryset, query):
+    """Narrow ``queryset`` to the articles matching ``query``, best match first.
+
+    Meant to back the ``search`` parameter of ``ArticleFilter``. Matching
+    and ranking run in the database against the shadow table, so every
+    match is kept and paginated counts are exact.
+    """
+    terms = _terms(query)
+    if not terms:
+        return queryset.none()
+
+    using = connections[queryset.db]
+    backend = get_backend(using)
+    quote = using.ops.quote_name
+    opts = queryset.model._meta
+    column = f"{quote(opts.db_table)}.{quote(opts.pk.column)}"
+    return (
+        queryset.filter(pk__in=RawSQL(*backend.matches(terms)))
+        .annotate(search_rank=RawSQL(*backend.rank(terms, column)))
+        .order_by("-search_rank", "-pk")
+    )
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+from articles.claps import MAX_CLAPS
+
+CLAP_COUNT_ERROR = f"Qarsaklar soni 1 dan {MAX_CLAPS} gacha bo'lishi kerak."
+
+
+class ClapSerializer(serializers.Serializer):
+    """Body of a clap, ``count`` sends a whole burst at once."""
+
+    count = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_CLAPS,
+        default=1,
+        error_messages={key: CLAP_COUNT_ERROR for key in ("invalid", "null", "min_value", "max_value", "max_string_length")},
+    )
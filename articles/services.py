@@ -0,0 +1,54 @@
+from django.conf import settings
+
+from articles.claps import clap_bursts, claps
+from articles.counters import article_counters
+from articles.leaderboards import article_views, article_views_windowed, author_reads
+from articles.recommendations import recommendations
+
+
+def _topic_ids(article):
+    return list(article.topics.values_list("pk", flat=True))
+
+
+def count_article_view(article):
+    article_counters.incr(article.pk, "views_count")
+    if article.status == "publish":
+        article_views.incr(article.pk)
+        article_views_windowed.incr(article.pk)
+
+
+def count_article_read(article, user=None):
+    article_counters.incr(article.pk, "reads_count")
+    if article.status == "publish":
+        author_reads.incr(article.author_id)
+    if user is not None and user.is_authenticated:
+        recommendations.record(user.pk, _topic_ids(article), "read")
+
+
+def _clap_writer():
+    return clap_bursts if settings.CLAPS_COALESCE_WINDOW else claps
+
+
+def record_clap(user, article, count=1):
+    """Clap ``article`` ``count`` times as ``user``, returns the user's clap count."""
+    total, applied = _clap_writer().add(user.pk, article.pk, count)
+    if applied:
+        recommendations.record(user.pk, _topic_ids(article), "clap", amount=applied)
+    return total
+
+
+def undo_clap(user, article):
+    """Remove the user's claps, returns the removed count or ``None`` if there were none."""
+    return _clap_writer().remove(user.pk, article.pk)
+
+
+def record_topic_follow(user, topic):
+    recommendations.record(user.pk, [topic.pk], "follow")
+
+
+def record_recommendation(user, more_article=None, less_article=None):
+    """Apply a "more"/"less" feedback of ``POST /api/users/recommend/``."""
+    if more_article is not None:
+        recommendations.record(user.pk, _topic_ids(more_article), "more")
+    if less_article is not None:
+        recommendations.exclude(user.pk, _topic_ids(less_article))
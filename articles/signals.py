@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from articles import aggregates, leaderboards
+from articles.detail_cache import article_detail_cache
+from articles.search import index_articles, remove_articles
+from articles.suggest import ARTICLE, TOPIC, index_terms, remove_terms
+from core.versions import collection_versions
+
+
+@receiver(post_save, sender="articles.Article")
+def reindex_saved_article(sender, instance, **kwargs):
+    index_articles([instance])
+    index_terms(ARTICLE, [(instance.pk, instance.title)])
+
+
+@receiver(post_delete, sender="articles.Article")
+def unindex_deleted_article(sender, instance, **kwargs):
+    remove_articles([instance.pk])
+    remove_terms(ARTICLE, [instance.pk])
+
+
+@receiver(m2m_changed)
+def reindex_article_topics(sender, instance, action, **kwargs):
+    if instance._meta.label == "articles.Article" and action in ("post_add", "post_remove", "post_clear"):
+        index_articles([instance])
+
+
+@receiver(post_save, sender="articles.Topic")
+def reindex_saved_topic(sender, instance, **kwargs):
+    index_terms(TOPIC, [(instance.pk, instance.name)])
+
+
+@receiver(post_delete, sender="articles.Topic")
+def unindex_deleted_topic(sender, instance, **kwargs):
+    remove_terms(TOPIC, [instance.pk])
+
+
+@receiver(post_save, sender="articles.Article")
+def expire_saved_article_detail(sender, instance, update_fields=None, **kwargs):
+    # Counter updates are merged into the cached representation on read.
+    if update_fields and set(update_fields) <= set(article_detail_cache.counter_fields):
+        return
+    transaction.on_commit(lambda: article_detail_cache.bump(instance.pk))
+
+
+@receiver(post_delete, sender="articles.Article")
+def expire_deleted_article_detail(sender, instance, **kwargs):
+    transaction.on_commit(lambda: article_detail_cache.bump(instance.pk))
+
+
+@receiver(m2m_changed)
+def expire_article_detail_topics(sender, instance, action, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if instance._meta.label == "articles.Article":
+        pks = [instance.pk]
+    elif model._meta.label == "articles.Article" and pk_set:
+        pks = list(pk_set)
+    else:
+        return
+
+    def bump():
+        article_detail_cache.bump(*pks)
+        # Relations do not touch updated_at, which list ETags are made of.
+        collection_versions.bump("articles")
+
+    transaction.on_commit(bump)
+
+
+def _bump_topics():
+    article_detail_cache.bump_topics()
+    collection_versions.bump("topics")
+    aggregates.topics.invalidate()
+
+
+@receiver([post_save, post_delete], sender="articles.Topic")
+def expire_topic_article_details(sender, **kwargs):
+    transaction.on_commit(_bump_topics)
+
+
+@receiver([post_save, post_delete], sender="articles.FAQ")
+def expire_faqs(sender, **kwargs):
+    def bump():
+        collection_versions.bump("faqs")
+        aggregates.faqs.invalidate()
+
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def expire_user(sender, instance, **kwargs):
+    transaction.on_commit(lambda: collection_versions.bump(f"user:{instance.pk}"))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def expire_author_article_details(sender, instance, update_fields=None, **kwargs):
+    # Logins and password changes do not show in article representations.
+    if update_fields and set(update_fields) <= {"last_login", "password"}:
+        return
+
+    def bump():
+        article_detail_cache.bump_author(instance.pk)
+        collection_versions.bump("authors")
+
+    transaction.on_commit(bump)
+
+
+@receiver(pre_save, sender="articles.Article")
+def remember_article_publication(sender, instance, **kwargs):
+    # Leaderboards only count published articles, see adjust_article_leaderboards.
+    instance._published_counts = None
+    if instance.pk is not None:
+        instance._published_counts = (
+            sender._default_manager.filter(pk=instance.pk, status="publish")
+            .values_list("reads_count", "views_count")
+            .first()
+        )
+
+
+@receiver(post_save, sender="articles.Article")
+def adjust_article_leaderboards(sender, instance, **kwargs):
+    counts = getattr(instance, "_published_counts", None)
+    published = instance.status == "publish"
+    if published and counts is None:
+        counts = (instance.reads_count, instance.views_count)
+    elif published or counts is None:
+        return
+    transaction.on_commit(lambda: leaderboards.publication_changed(instance, published, *counts))
+
+
+@receiver(post_delete, sender="articles.Article")
+def remove_deleted_article_from_leaderboards(sender, instance, **kwargs):
+    if instance.status == "publish":
+        counts = (instance.reads_count, instance.views_count)
+        transaction.on_commit(lambda: leaderboards.publication_changed(instance, False, *counts))
@@ -0,0 +1,264 @@
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Q
+
+TABLE = "search_suggestion"
+
+ARTICLE = "article"
+TOPIC = "topic"
+
+SIMILARITY_THRESHOLD = 0.6
+
+
+def _words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def trigrams(text):
+    """Trigrams of ``text`` the way pg_trgm builds them, each word padded."""
+    grams = set()
+    for word in _words(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """In-process trigram index over the distinct words of the indexed terms.
+
+    A query word scores against a vocabulary word as the share of its
+    trigrams found in it, close to ``pg_trgm.word_similarity``, and a term
+    scores as the mean of its best matches for every query word. Matching
+    runs over the vocabulary, which stays small compared to the terms.
+    """
+
+    def __init__(self):
+        self._terms = {}
+        self._keys_by_word = defaultdict(set)
+        self._word_grams = {}
+        self._postings = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._terms)
+
+    def add(self, key, term):
+        with self._lock:
+            self._discard(key)
+            words = set(_words(term))
+            self._terms[key] = (term, words)
+            for word in words:
+                if word not in self._word_grams:
+                    grams = self._word_grams[word] = trigrams(word)
+                    for gram in grams:
+                        self._postings[gram].add(word)
+                self._keys_by_word[word].add(key)
+
+    def remove(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key):
+        _, words = self._terms.pop(key, (None, ()))
+        for word in words:
+            keys = self._keys_by_word[word]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_word[word]
+                for gram in self._word_grams.pop(word):
+                    self._postings[gram].discard(word)
+
+    def _match(self, query_word, threshold):
+        grams = trigrams(query_word)
+        # A word reaching the threshold shares at least ``needed`` trigrams
+        # with the query, so it must contain one of the ``len - needed + 1``
+        # rarest ones. Only their postings are scanned for candidates.
+        needed = math.ceil(threshold * len(grams))
+        rarest = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+        candidates = set()
+        for gram in rarest[:len(grams) - needed + 1]:
+            candidates.update(self._postings.get(gram, ()))
+
+        matches = []
+        for word in candidates:
+            score = len(grams & self._word_grams[word]) / len(grams)
+            if score >= threshold:
+                matches.append((score, word))
+        return sorted(matches, reverse=True)
+
+    def search(self, query, limit=10, threshold=SIMILARITY_THRESHOLD, kinds=None):
+        query_words = _words(query)
+        if not query_words or limit < 1:
+            return []
+
+        per_word = []
+        for query_word in query_words:
+            matches = self._match(query_word, threshold)
+            if not matches:
+                return []
+            per_word.append(matches)
+
+        scores = None
+        for matches in per_word:
+            best, lowest = {}, None
+            for score, word in matches:
+                # With a single query word the best ``limit`` keys are known
+                # once a lower scoring word is reached.
+                if len(per_word) == 1 and len(best) >= limit and score < lowest:
+                    break
+                lowest = score
+                for key in self._keys_by_word[word]:
+                    if not kinds or key[0] in kinds:
+                        best.setdefault(key, score)
+
+            if scores is None:
+                scores = best
+            else:
+                scores = {key: scores[key] + score for key, score in best.items() if key in scores}
+
+        results = sorted(
+            (-score / len(per_word), len(self._terms[key][0]), self._terms[key][0], key)
+            for key, score in scores.items()
+        )
+        return [(key[0], key[1], term) for _, _, term, key in results[:limit]]
+
+
+class PostgresSuggestBackend:
+    """Suggestion table with a ``gin_trgm_ops`` index, queried with ``<%``.
+
+    ``<%`` uses ``pg_trgm.word_similarity_threshold`` which defaults to 0.6,
+    the same as ``SIMILARITY_THRESHOLD``.
+    """
+
+    def ensure_schema(self, cursor):
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            " kind varchar(16) NOT NULL,"
+            " object_id bigint NOT NULL,"
+            " term text NOT NULL,"
+            " PRIMARY KEY (kind, object_id))"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_term_trgm ON {TABLE} USING GIN (term gin_trgm_ops)")
+
+    def drop_schema(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def index(self, cursor, kind, entries):
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (kind, object_id, term) VALUES (%s, %s, %s)"
+            " ON CONFLICT (kind, object_id) DO UPDATE SET term = EXCLUDED.term",
+            [(kind, object_id, term) for object_id, term in entries],
+        )
+
+    def remove(self, cursor, kind, object_ids):
+        cursor.execute(f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = ANY(%s)", [kind, list(object_ids)])
+
+    def search(self, cursor, query, limit, kinds):
+        cursor.execute(
+            f"SELECT kind, object_id, term FROM {TABLE}"
+            " WHERE %s <%% term AND kind = ANY(%s)"
+            " ORDER BY word_similarity(%s, term) DESC, length(term), term LIMIT %s",
+            [query, list(kinds), query, limit],
+        )
+        return cursor.fetchall()
+
+
+class SQLiteSuggestBackend:
+    """Plain suggestion table mirrored into a per-process ``TrigramIndex``."""
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+
+    def ensure_schema(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            " kind varchar(16) NOT NULL,"
+            " object_id bigint NOT NULL,"
+            " term text NOT NULL,"
+            " PRIMARY KEY (kind, object_id))"
+        )
+        self._index = None
+
+    def drop_schema(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        self._index = None
+
+    def _get_index(self, cursor):
+        with self._lock:
+            if self._index is None:
+                index = TrigramIndex()
+                cursor.execute(f"SELECT kind, object_id, term FROM {TABLE}")
+                for kind, object_id, term in cursor.fetchall():
+                    index.add((kind, object_id), term)
+                self._index = index
+            return self._index
+
+    def index(self, cursor, kind, entries):
+        entries = list(entries)
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {TABLE} (kind, object_id, term) VALUES (%s, %s, %s)",
+            [(kind, object_id, term) for object_id, term in entries],
+        )
+        if self._index is not None:
+            for object_id, term in entries:
+                self._index.add((kind, object_id), term)
+
+    def remove(self, cursor, kind, object_ids):
+        object_ids = list(object_ids)
+        cursor.executemany(f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s", [(kind, pk) for pk in object_ids])
+        if self._index is not None:
+            for object_id in object_ids:
+                self._index.remove((kind, object_id))
+
+    def search(self, cursor, query, limit, kinds):
+        return self._get_index(cursor).search(query, limit=limit, kinds=kinds)
+
+
+_sqlite_backend = SQLiteSuggestBackend()
+
+
+def get_backend(using=connection):
+    if using.vendor == "postgresql":
+        return PostgresSuggestBackend()
+    return _sqlite_backend
+
+
+def index_terms(kind, entries, using=connection):
+    """Index ``(object_id, term)`` pairs of ``kind``."""
+    with using.cursor() as cursor:
+        get_backend(using).index(cursor, kind, entries)
+
+
+def remove_terms(kind, object_ids, using=connection):
+    with using.cursor() as cursor:
+        get_backend(using).remove(cursor, kind, object_ids)
+
+
+def suggest(query, limit=10, kinds=(ARTICLE, TOPIC), using=connection):
+    """Return ``(kind, object_id, term)`` tuples similar to ``query``, best first."""
+    query = query.strip()
+    if not query or limit < 1:
+        return []
+
+    with using.cursor() as cursor:
+        return [tuple(row) for row in get_backend(using).search(cursor, query, limit, kinds)]
+
+
+def fuzzy_search_articles(queryset, query, limit=100):
+    """Articles whose title or one of whose topics is similar to ``query``.
+
+    Meant to back ``search_mode=fuzzy`` of ``ArticleFilter``.
+    """
+    article_ids, topic_ids = [], []
+    for kind, object_id, _ in suggest(query, limit=limit):
+        (article_ids if kind == ARTICLE else topic_ids).append(object_id)
+
+    if not article_ids and not topic_ids:
+        return queryset.none()
+    return queryset.filter(Q(pk__in=article_ids) | Q(topics__in=topic_ids)).distinct()
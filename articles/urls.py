@@ -0,0 +1,9 @@
+from django.urls import path
+
+from articles import views
+
+urlpatterns = [
+    path("<int:pk>/", views.article_detail, name="article-detail"),
+    path("<int:pk>/clap/", views.ClapView.as_view(), name="article-clap"),
+    path("search/suggest/", views.search_suggest, name="article-search-suggest"),
+]
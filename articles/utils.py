@@ -0,0 +1,13 @@
+from django.db.models import Case, IntegerField, Value, When
+
+
+def filter_by_ranked_ids(queryset, ids):
+    """Narrow ``queryset`` to ``ids`` keeping their order."""
+    if not ids:
+        return queryset.none()
+
+    ranking = Case(
+        *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(pk__in=ids).order_by(ranking)
@@ -1,2 +1,210 @@
+import asyncio
+import json
+import math
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from articles.conditional import article_detail_state
+from articles.detail_cache import article_detail_cache
+from articles.notifications import notification_channel
+from articles.serializers import ClapSerializer
+from articles.services import count_article_view, record_clap, undo_clap
+from articles.suggest import suggest
+from core.authentication import SnapshotJWTAuthentication
+from core.conditional import conditional
+from core.redis import get_async_redis_client
+from core.throttling import RedisRateThrottle
+
+
+@require_GET
+def search_suggest(request):
+    """Typeahead suggestions of article titles and topic names for ``?q=``."""
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 10)), 50))
+    except ValueError:
+        limit = 10
+
+    results = [
+        {"type": kind, "id": object_id, "text": term}
+        for kind, object_id, term in suggest(request.GET.get("q", ""), limit=limit)
+    ]
+    return JsonResponse({"results": results})
+
+
+def _count_view(request, pk):
+    # Counting only reads pk and status, no need to load the whole article.
+    article = article_detail_cache.model._default_manager.filter(pk=pk).only("status").first()
+    if article is not None:
+        count_article_view(article)
+
+
+@require_GET
+@conditional(article_detail_state, on_not_modified=_count_view)
+def article_detail(request, pk):
+    """A published article, served from ``article_detail_cache`` with live counters."""
+    data = article_detail_cache.get(pk)
+    if data is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    _count_view(request, pk)
+    return JsonResponse(data)
+
+
+def _unauthorized():
+    return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+
+class ClapView(APIView):
+    """Clap an article, ``{"count": n}`` sends a whole burst at once. DELETE undoes the claps."""
+
+    authentication_classes = [SnapshotJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [RedisRateThrottle]
+    throttle_scope = "clap"
+    article_model = "articles.Article"
+
+    def get_article(self, pk):
+        return get_object_or_404(apps.get_model(self.article_model), pk=pk, status="publish")
+
+    def post(self, request, pk):
+        article = self.get_article(pk)
+        serializer = ClapSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        count = record_clap(request.user, article, serializer.validated_data["count"])
+        return Response({"count": count}, status=status.HTTP_201_CREATED)
+
+    def delete(self, request, pk):
+        if undo_clap(request.user, self.get_article(pk)) is None:
+            raise NotFound()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def _request_user(request):
+    if request.user.is_authenticated:
+        return request.user
+    # API clients send a Bearer token rather than a session cookie.
+    try:
+        authenticated = SnapshotJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return authenticated[0] if authenticated else None
+
+
+async def _authenticated_user(request):
+    return await sync_to_async(_request_user)(request)
+
+
+async def _subscribe(user_id):
+    client = get_async_redis_client()
+    pubsub = client.pubsub()
+    await pubsub.subscribe(notification_channel(user_id))
+    return client, pubsub
+
+
+async def _unsubscribe(client, pubsub):
+    await pubsub.unsubscribe()
+    await pubsub.aclose()
+    await client.aclose()
+
+
+async def _next_message(pubsub, timeout):
+    """Data of the next published message, ``None`` after ``timeout`` seconds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        # Skipped subscribe confirmations come back as None too.
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=max(0, deadline - loop.time()))
+        if message is not None:
+            return message["data"].decode()
+        if loop.time() >= deadline:
+            return None
+
+
+async def _notification_events(user_id):
+    client, pubsub = await _subscribe(user_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            data = await _next_message(pubsub, settings.NOTIFICATION_STREAM_HEARTBEAT)
+            if data is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"id: {json.loads(data)['id']}\nevent: notification\ndata: {data}\n\n"
+    finally:
+        await _unsubscribe(client, pubsub)
+
+
+async def notification_stream(request):
+    """Server-Sent Events stream of the user's new notifications."""
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    user = await _authenticated_user(request)
+    if user is None:
+        return _unauthorized()
+
+    response = StreamingHttpResponse(_notification_events(user.pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _unread_since(user_id, since):
+    Notification = apps.get_model("users.Notification")
+    return list(
+        Notification.objects.filter(user_id=user_id, pk__gt=since, read_at__isnull=True)
+        .order_by("pk")
+        .values("id", "message")[:50]
+    )
+
+
+async def notification_poll(request):
+    """Long-poll for new notifications, blocks up to ``?timeout=`` seconds.
+
+    ``?since=`` is the last notification id the client has, newer unread
+    ones are returned right away.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    user = await _authenticated_user(request)
+    if user is None:
+        return _unauthorized()
+
+    timeout = settings.NOTIFICATION_LONG_POLL_TIMEOUT
+    try:
+        requested = float(request.GET.get("timeout", timeout))
+    except ValueError:
+        requested = timeout
+    if math.isfinite(requested):
+        timeout = max(0, min(requested, timeout))
+
+    # Subscribe before looking at the database so nothing created in
+    # between is missed.
+    client, pubsub = await _subscribe(user.pk)
+    try:
+        since = request.GET.get("since")
+        if since and since.isdigit():
+            results = await sync_to_async(_unread_since)(user.pk, int(since))
+            if results:
+                return JsonResponse({"results": results})
+
+        results = []
+        data = await _next_message(pubsub, timeout)
+        while data is not None:
+            results.append(json.loads(data))
+            # Once something arrived, only collect what is already queued.
+            data = await _next_message(pubsub, 0)
+        return JsonResponse({"results": results})
+    finally:
+        await _unsubscribe(client, pubsub)
@@ -0,0 +1,51 @@
+"""Micro benchmarks, run as ``python -m benchmarks.<name>``."""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    django.setup()
+
+
+@contextmanager
+def throwaway_database():
+    """Point the default connection at a new test database, destroyed on exit.
+
+    Benchmarks that fill or drop tables run inside it, never against the
+    configured database.
+    """
+    from django.db import connection
+
+    name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+
+
+def measure(func, repeat):
+    """Call ``func`` ``repeat`` times and return the latencies in seconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    total = sum(samples)
+    print(
+        f"{name:<32} n={len(samples):<7} "
+        f"p50={statistics.median(samples) * 1000:.3f}ms "
+        f"p95={p95 * 1000:.3f}ms "
+        f"ops/s={len(samples) / total if total else float('inf'):.0f}"
+    )
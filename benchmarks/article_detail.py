@@ -0,0 +1,52 @@
+"""Article detail: serializing on every request vs the versioned cache.
+
+Runs in a throwaway test database with a cache and counter buffer of its
+own prefix, live versions, entries and metrics are not touched. Needs the
+Redis server from settings.
+
+    python -m benchmarks.article_detail --requests 5000
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django, throwaway_database
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.apps import apps
+    from django.contrib.auth import get_user_model
+
+    from articles.counters import CounterBuffer
+    from articles.detail_cache import ArticleDetailCache
+
+    with throwaway_database():
+        Article = apps.get_model("articles.Article")
+        author = get_user_model().objects.create(username="bench-author")
+        article = Article.objects.create(author=author, title="Benchmark", status="publish")
+        counters = CounterBuffer("articles.Article", fields=("views_count", "reads_count"), prefix="bench:counters")
+        detail_cache = ArticleDetailCache(prefix="bench:article:detail", counters=counters)
+
+        def uncached():
+            loaded = detail_cache._load(article.pk)
+            detail_cache.counters.merge(loaded)
+            return detail_cache.serializer(loaded).data
+
+        def miss():
+            detail_cache.bump(article.pk)
+            return detail_cache.get(article.pk)
+
+        report("uncached serialize", measure(uncached, args.requests))
+        report("cache miss", measure(miss, args.requests))
+        report("cache hit", measure(lambda: detail_cache.get(article.pk), args.requests))
+
+        detail_cache.flush_metrics()
+        print(detail_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Per-request token revocation overhead.
+
+Compares the ``user:{id}:access`` set lookup of the logout contract with
+the jti denylist, with and without the in-process bloom filter. Needs the
+Redis server from settings.
+
+    python -m benchmarks.auth --requests 20000 --revoked 10000
+"""
+import argparse
+import time
+import uuid
+
+from benchmarks import measure, report, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--revoked", type=int, default=10_000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from core.redis import get_redis_client
+    from core.revocation import RevocationList
+
+    client = get_redis_client()
+    prefix = f"bench:revoked:{time.time_ns()}"
+    expires_at = time.time() + 3600
+    plain = RevocationList(client=client, prefix=prefix)
+    bloom = RevocationList(bloom=True, sync_interval=60, client=client, prefix=prefix)
+
+    revoked = [uuid.uuid4().hex for _ in range(args.revoked)]
+    for jti in revoked:
+        plain.revoke(jti, expires_at)
+    access_key = f"{prefix}:user:1:access"
+    client.sadd(access_key, "header.payload.signature")
+    bloom.sync()
+
+    valid = uuid.uuid4().hex
+    report("set lookup (SISMEMBER)", measure(lambda: client.sismember(access_key, "header.payload.signature"),
+                                             args.requests))
+    report("denylist (EXISTS)", measure(lambda: plain.is_revoked(valid), args.requests))
+    report("denylist, access+refresh", measure(lambda: plain.revoked([valid, revoked[0]]), args.requests))
+    report("bloom, not revoked", measure(lambda: bloom.is_revoked(valid), args.requests))
+    report("bloom, revoked", measure(lambda: bloom.is_revoked(revoked[0]), args.requests))
+    report("bloom sync", measure(bloom.sync, 10))
+
+    false_positives = sum(bloom._candidates([uuid.uuid4().hex]) != [] for _ in range(args.requests))
+    print(f"bloom false positives: {false_positives}/{args.requests}")
+
+    client.delete(access_key, plain.log_key, *(plain._key(jti) for jti in revoked))
+
+
+if __name__ == "__main__":
+    main()
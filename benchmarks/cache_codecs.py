@@ -0,0 +1,107 @@
+"""Cache value size and encode/decode latency: pickle vs orjson, with and without zstd.
+
+Payloads are article representations built with ``ArticleFactory`` and
+recommendation candidate id lists.
+
+    python -m benchmarks.cache_codecs --articles 200 --content-chars 3000
+"""
+import argparse
+import itertools
+import random
+import statistics
+
+from benchmarks import measure, report, setup_django
+
+
+def article_payload(article, topics):
+    """The shape of an ``ArticleDetailSerializer`` representation."""
+    author = article.author
+    return {
+        "id": article.id,
+        "title": article.title,
+        "summary": article.summary,
+        "content": article.content,
+        "thumbnail": str(article.thumbnail),
+        "status": article.status,
+        "author": {
+            "id": author.id,
+            "username": author.username,
+            "first_name": author.first_name,
+            "last_name": author.last_name,
+            "avatar": str(author.avatar),
+        },
+        "topics": [{"id": topic.id, "name": topic.name} for topic in topics],
+        "created_at": "2024-05-01T12:00:00.000000Z",
+        "updated_at": "2024-05-01T12:00:00.000000Z",
+        "views_count": random.randint(0, 100_000),
+        "reads_count": random.randint(0, 10_000),
+        "claps_count": random.randint(0, 5_000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--content-chars", type=int, default=3000)
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django_redis.compressors.identity import IdentityCompressor
+    from django_redis.exceptions import CompressorError
+    from django_redis.serializers.pickle import PickleSerializer
+    from faker import Faker
+
+    from core.cache_codecs import CompactSerializer, ZstdCompressor
+    from tests.factories.article_factory import ArticleFactory
+    from tests.factories.topic_factory import TopicFactory
+    from tests.factories.user_factory import UserFactory
+
+    fake = Faker()
+    options = {"COMPRESS_MIN_LENGTH": 1024}
+    topics = TopicFactory.build_batch(10)
+    # One author, building one hashes its password.
+    author = UserFactory.build()
+    payloads = {
+        "article": [
+            article_payload(
+                ArticleFactory.build(author=author, content=fake.text(max_nb_chars=args.content_chars)),
+                random.sample(topics, 3),
+            )
+            for _ in range(args.articles)
+        ],
+        "candidates": [
+            random.sample(range(1, 1_000_000), args.candidates)
+            for _ in range(args.articles)
+        ],
+    }
+    codecs = {
+        "pickle": (PickleSerializer(options), IdentityCompressor(options)),
+        "pickle+zstd": (PickleSerializer(options), ZstdCompressor(options)),
+        "orjson": (CompactSerializer(options), IdentityCompressor(options)),
+        "orjson+zstd": (CompactSerializer(options), ZstdCompressor(options)),
+    }
+
+    for kind, values in payloads.items():
+        for name, (serializer, compressor) in codecs.items():
+            def encode(value):
+                return compressor.compress(serializer.dumps(value))
+
+            def decode(raw):
+                try:
+                    raw = compressor.decompress(raw)
+                except CompressorError:
+                    pass
+                return serializer.loads(raw)
+
+            encoded = [encode(value) for value in values]
+            print(f"{kind} {name:<20} bytes/entry={statistics.mean(map(len, encoded)):.0f}")
+            to_encode, to_decode = itertools.cycle(values), itertools.cycle(encoded)
+            report(f"{kind} {name} encode", measure(lambda: encode(next(to_encode)), args.repeat))
+            report(f"{kind} {name} decode", measure(lambda: decode(next(to_decode)), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Direct UPDATE vs write-behind buffer for article counters.
+
+Runs in a throwaway test database with a buffer of its own, the live
+counter buffer is not touched.
+
+    python -m benchmarks.counters --requests 5000
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django, throwaway_database
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.apps import apps
+    from django.contrib.auth import get_user_model
+    from django.db.models import F
+
+    from articles.counters import CounterBuffer
+
+    with throwaway_database():
+        Article = apps.get_model("articles.Article")
+        author = get_user_model().objects.create(username="bench-author")
+        article = Article.objects.create(author=author, title="Benchmark", status="publish")
+        queryset = Article.objects.filter(pk=article.pk)
+        counters = CounterBuffer("articles.Article", fields=("views_count", "reads_count"), prefix="bench:counters")
+
+        report("direct UPDATE", measure(lambda: queryset.update(views_count=F("views_count") + 1), args.requests))
+        report("buffered incr", measure(lambda: counters.incr(article.pk, "views_count"), args.requests))
+        report("buffered flush", measure(counters.flush, 1))
+
+
+if __name__ == "__main__":
+    main()
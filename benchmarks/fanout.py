@@ -0,0 +1,56 @@
+"""Publish latency and notification fan-out throughput.
+
+Creates an author with ``--followers`` followers, schedules a fan-out the
+way the publish endpoint does and delivers it with ``FanoutWorker``, in a
+throwaway test database.
+
+    python -m benchmarks.fanout --followers 100000
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+from benchmarks import measure, report, setup_django, throwaway_database
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--followers", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--duty-cycle", type=float, default=1.0)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+
+    from articles.notifications import FanoutWorker, schedule_publish_notifications
+    from users.models import Follow
+
+    with throwaway_database():
+        User = get_user_model()
+        author = User.objects.create(username="bench-author")
+        followers = User.objects.bulk_create(
+            [User(username=f"{author.username}-{index}") for index in range(args.followers)],
+            batch_size=10_000,
+        )
+        Follow.objects.bulk_create(
+            [Follow(follower=follower, followee=author) for follower in followers],
+            batch_size=10_000,
+        )
+
+        article = SimpleNamespace(pk=1, author=author, author_id=author.pk, title="Benchmark")
+        jobs = []
+        report("publish (schedule fan-out)", measure(lambda: jobs.append(schedule_publish_notifications(article)), 1))
+
+        worker = FanoutWorker(chunk_size=args.chunk_size, duty_cycle=args.duty_cycle)
+        for job in jobs:
+            job = worker.claim(job.pk)
+            started = time.perf_counter()
+            sent = worker.process(job)
+            elapsed = time.perf_counter() - started
+            print(f"fan-out: {sent} notifications in {elapsed:.2f}s ({sent / elapsed:.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Logins per second per core under each password hasher.
+
+Each hasher is timed in this process (one core), then through the
+hashing pool with ``--workers`` processes.
+
+    python -m benchmarks.hashers --logins 50 --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks import measure, report, setup_django
+
+HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "core.passwords.TunedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+
+def _init():
+    setup_django()
+
+
+def _check(encoded):
+    from django.contrib.auth.hashers import check_password
+
+    return check_password("benchmark-password", encoded)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth.hashers import make_password
+    from django.utils.module_loading import import_string
+
+    with ProcessPoolExecutor(args.workers, initializer=_init) as pool:
+        for path in HASHERS:
+            name = path.rsplit(".", 1)[1]
+            encoded = make_password("benchmark-password", hasher=import_string(path).algorithm)
+            report(f"{name} (1 core)", measure(lambda: _check(encoded), args.logins))
+
+            list(pool.map(_check, [encoded] * args.workers))
+            started = time.perf_counter()
+            list(pool.map(_check, [encoded] * args.logins * args.workers))
+            elapsed = time.perf_counter() - started
+            rate = args.logins * args.workers / elapsed
+            print(f"{name} pool of {args.workers}: {rate:.1f} logins/s, {rate / args.workers:.1f} per core")
+
+
+if __name__ == "__main__":
+    main()
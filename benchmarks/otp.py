@@ -0,0 +1,75 @@
+"""OTP generation and verification, one script call vs separate commands.
+
+The multi-call variant mirrors the ``{email}:otp`` layout: the secret maps
+to the email, the code and an attempt counter are separate keys. Needs
+the Redis server from settings.
+
+    python -m benchmarks.otp --requests 5000
+"""
+import argparse
+import hashlib
+import secrets
+
+from benchmarks import measure, report, setup_django
+
+
+class MultiCallOTP:
+    def __init__(self, client, ttl=300, prefix="bench:otp:multi"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def generate(self, email):
+        code = f"{secrets.randbelow(10 ** 6):06d}"
+        secret = secrets.token_urlsafe(32)
+        self.client.set(f"{self.prefix}:{email}:otp", hashlib.sha256(code.encode()).hexdigest(), ex=self.ttl)
+        self.client.set(f"{self.prefix}:{secret}", email, ex=self.ttl)
+        return code, secret
+
+    def verify(self, secret, code):
+        email = self.client.get(f"{self.prefix}:{secret}")
+        if email is None:
+            return None
+        email = email.decode()
+        attempts_key = f"{self.prefix}:{email}:otp:attempts"
+        attempts = self.client.incr(attempts_key)
+        self.client.expire(attempts_key, self.ttl)
+        if attempts > 5:
+            return None
+        if self.client.get(f"{self.prefix}:{email}:otp") != hashlib.sha256(code.encode()).hexdigest().encode():
+            return None
+        self.client.delete(f"{self.prefix}:{email}:otp", f"{self.prefix}:{secret}", attempts_key)
+        return email
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from core.otp import OTPStore
+    from core.redis import get_redis_client
+
+    client = get_redis_client()
+    stores = {
+        "multi-call": MultiCallOTP(client),
+        "hash + script": OTPStore(cooldown=0, client=client, prefix="bench:otp:"),
+    }
+    for name, store in stores.items():
+        issued = []
+        emails = iter(range(args.requests))
+        report(f"{name} generate", measure(lambda: issued.append(store.generate(f"{next(emails)}@example.com")),
+                                           args.requests))
+        codes = iter(issued)
+
+        def verify():
+            code, secret = next(codes)
+            store.verify(secret, code)
+
+        report(f"{name} verify", measure(verify, args.requests))
+
+
+if __name__ == "__main__":
+    main()
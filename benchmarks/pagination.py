@@ -0,0 +1,57 @@
+"""Offset vs keyset pagination latency by page depth.
+
+Runs against ``auth.User`` ordered by ``(-date_joined, id)`` unless another
+model and ordering are given, in a throwaway test database.
+
+    python -m benchmarks.pagination --rows 200000
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django, throwaway_database
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="auth.User")
+    parser.add_argument("--ordering", default="-date_joined,id")
+    parser.add_argument("--rows", type=int, default=200_000, help="Users to create, other models must be filled by hand.")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.apps import apps
+    from django.core.paginator import Paginator
+
+    from core.pagination import KeysetPaginator
+
+    with throwaway_database() as connection:
+        model = apps.get_model(args.model)
+        ordering = args.ordering.split(",")
+        queryset = model._default_manager.all()
+
+        if args.model == "auth.User":
+            model.objects.bulk_create(
+                [model(username=f"bench{index}") for index in range(args.rows)],
+                batch_size=10_000,
+            )
+            # Keyset pagination relies on an index matching the ordering, like
+            # the article table's (created_at DESC, id).
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE INDEX bench_user_joined_id ON auth_user (date_joined DESC, id)")
+
+        offset_paginator = Paginator(queryset.order_by(*ordering), args.page_size)
+        keyset_paginator = KeysetPaginator(queryset, ordering=ordering, page_size=args.page_size)
+        pages = offset_paginator.num_pages
+
+        for number in sorted({1, pages // 100 or 1, pages // 10 or 1, pages // 2 or 1, pages}):
+            report(f"offset page {number}", measure(lambda: list(offset_paginator.page(number)), args.repeat))
+
+            anchor = queryset.order_by(*ordering)[(number - 1) * args.page_size - 1] if number > 1 else None
+            cursor = keyset_paginator.encode_cursor(anchor, False) if anchor else None
+            report(f"keyset page {number}", measure(lambda: list(keyset_paginator.page(cursor)), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
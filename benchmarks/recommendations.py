@@ -0,0 +1,69 @@
+"""Offline evaluation and latency of article recommendations.
+
+``eval`` holds out the latest read of every sampled user, rebuilds the
+affinity from the rest of their history and reports how often the held out
+article is among the candidates (hit rate) and its mean reciprocal rank.
+``bench`` compares computing candidates with reading them from the cache.
+
+    python -m benchmarks.recommendations eval --users 500
+    python -m benchmarks.recommendations bench --users 100
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django
+
+
+def evaluate(engine, user_ids):
+    from articles.recommendations import affinity_from_db
+    from users.models import ReadingHistory
+
+    hits, reciprocal_ranks, evaluated = 0, 0.0, 0
+    for user_id in user_ids:
+        latest = ReadingHistory.objects.filter(user_id=user_id).order_by("-pk").values_list("article_id", flat=True)
+        held_out = latest.first()
+        if held_out is None:
+            continue
+
+        affinity = affinity_from_db(user_id, exclude_article_ids=[held_out])
+        ids = engine.compute_candidates(user_id, affinity=affinity, excluded=set())
+        evaluated += 1
+        if held_out in ids:
+            hits += 1
+            reciprocal_ranks += 1 / (ids.index(held_out) + 1)
+
+    if not evaluated:
+        print("No users with reading history.")
+        return
+    print(f"users={evaluated} hit@{engine.candidates}={hits / evaluated:.3f} mrr={reciprocal_ranks / evaluated:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["eval", "bench"])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from articles.recommendations import RecommendationEngine
+    from users.models import ReadingHistory
+
+    engine = RecommendationEngine(candidates=args.candidates)
+    user_ids = list(
+        ReadingHistory.objects.values_list("user_id", flat=True).distinct().order_by("user_id")[:args.users]
+    )
+
+    if args.mode == "eval":
+        evaluate(engine, user_ids)
+        return
+
+    for user_id in user_ids:
+        engine.refresh(user_id)
+    report("compute candidates", measure(lambda: [engine.compute_candidates(u) for u in user_ids], args.repeat))
+    report("cached candidates", measure(lambda: [engine.candidate_ids(u) for u in user_ids], args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Latency of the article full-text search table.
+
+Synthetic documents use the same Faker providers as ``ArticleFactory``
+(sentence title, text summary/content, word topics). Runs in a throwaway
+test database.
+
+    python -m benchmarks.search --articles 1000000
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django, throwaway_database
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from faker import Faker
+
+    from articles.search import get_backend, search_article_ids
+
+    fake = Faker()
+    with throwaway_database() as connection:
+        backend = get_backend(connection)
+        with connection.cursor() as cursor:
+            backend.ensure_schema(cursor)
+
+            for start in range(1, args.articles + 1, args.batch_size):
+                stop = min(start + args.batch_size, args.articles + 1)
+                backend.index(cursor, [
+                    (pk, fake.sentence(), fake.text(), fake.text(), " ".join(fake.words(3)))
+                    for pk in range(start, stop)
+                ])
+
+        for query in ("python", "data science", fake.word()[:3]):
+            report(f"search {query!r}", measure(lambda: search_article_ids(query, limit=20), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Typeahead latency of the trigram suggestion index, target p95 < 10ms.
+
+Runs in a throwaway test database.
+
+    python -m benchmarks.suggest --articles 100000 --topics 2000
+"""
+import argparse
+import random
+
+from benchmarks import measure, report, setup_django, throwaway_database
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--topics", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from faker import Faker
+
+    from articles.suggest import ARTICLE, TOPIC, get_backend, index_terms, suggest
+
+    fake = Faker()
+    with throwaway_database() as connection:
+        with connection.cursor() as cursor:
+            get_backend(connection).ensure_schema(cursor)
+
+        topics = [fake.word() for _ in range(args.topics)]
+        index_terms(TOPIC, enumerate(topics, start=1))
+        index_terms(ARTICLE, [(pk, fake.sentence()) for pk in range(1, args.articles + 1)])
+
+        def misspelled():
+            word = random.choice(topics)
+            position = random.randrange(len(word))
+            return word[:position] + word[position + 1:] or word
+
+        suggest("warm up")
+        report("suggest (misspelled topic)", measure(lambda: suggest(misspelled()), args.repeat))
+        report("suggest (title prefix)", measure(lambda: suggest(fake.word()[:4]), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
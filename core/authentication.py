@@ -0,0 +1,52 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.revocation import revocations
+from core.user_snapshot import snapshot_claims, snapshot_from_claims, user_snapshots
+
+
+class SnapshotRefreshToken(RefreshToken):
+    """Refresh token carrying the user snapshot claims, its access tokens inherit them."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in snapshot_claims(user).items():
+            token[claim] = value
+        return token
+
+
+class SnapshotJWTAuthentication(JWTAuthentication):
+    """JWT authentication that authenticates with a user snapshot.
+
+    The snapshot comes from the token claims when
+    ``AUTH_USER_SNAPSHOT_FROM_TOKEN`` is set, otherwise from the Redis
+    cache, so the user table is only read on a cache miss.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revocations.is_revoked(token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken({"detail": "Token is revoked", "code": "token_not_valid"})
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = None
+        if settings.AUTH_USER_SNAPSHOT_FROM_TOKEN:
+            user = snapshot_from_claims(user_id, validated_token)
+        if user is None:
+            user = user_snapshots.get(user_id)
+
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
@@ -0,0 +1,294 @@
+"""Two-tier cache: a per-process LRU in front of another cache.
+
+Keys matching a prefix of ``POLICIES`` are kept in process memory for that
+many seconds after they were read from the wrapped cache, so hot keys are
+served without a round trip or unpickling. Writes go to the wrapped cache
+and are broadcast over Redis pub/sub, every process drops its copy.
+
+Local values are shared by all callers of a process, treat them as read-only.
+Backends with the same ``CHANNEL`` share one local tier and listener per
+process.
+
+    CACHES["hot"] = {
+        "BACKEND": "core.cache.TwoTierCache",
+        "OPTIONS": {
+            "CACHE": "default",
+            "MAX_ENTRIES": 1000,
+            "POLICIES": {"faqs": 60, "topics": 60},
+        },
+    }
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+CLEAR = "*"
+
+_missing = object()
+
+
+class LocalLRU:
+    """Bounded mapping of keys to values with an expiry time."""
+
+    def __init__(self, max_entries, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _missing
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return _missing
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (self.clock() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LocalTier:
+    """Local values of an invalidation channel and the listener keeping them fresh.
+
+    One per process and channel, see ``local_tier``: Django builds a cache
+    backend per thread, they all share it.
+    """
+
+    def __init__(self, channel, max_entries, client=None):
+        self.channel = channel
+        self.local = LocalLRU(max_entries)
+        self._client = client
+        self.generation = 0
+        self.subscribed = threading.Event()
+        self._listener = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def ensure_listener(self):
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            # The listener died, entries may have missed invalidations.
+            self.local.clear()
+            self.subscribed.clear()
+            self._listener = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self.subscribed.set()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.invalidate(json.loads(message["data"]))
+            except redis.RedisError:
+                logger.warning("Cache invalidation subscription failed, resubscribing", exc_info=True)
+            # Invalidations sent while unsubscribed are lost.
+            self.subscribed.clear()
+            self.invalidate(CLEAR)
+            time.sleep(1)
+
+    def invalidate(self, keys):
+        with self._lock:
+            self.generation += 1
+        if keys == CLEAR:
+            self.local.clear()
+        else:
+            self.local.delete(*keys)
+
+    def broadcast(self, keys):
+        self.invalidate(keys)
+        try:
+            self.client.publish(self.channel, json.dumps(keys))
+        except redis.RedisError:
+            logger.warning("Failed to broadcast cache invalidation of %s", keys, exc_info=True)
+
+
+_tiers = {}
+
+_tiers_lock = threading.Lock()
+
+
+def local_tier(channel, max_entries):
+    """The ``LocalTier`` of ``channel`` in this process, the first caller sizes it."""
+    pid = os.getpid()
+    tier = _tiers.get((pid, channel))
+    if tier is None:
+        with _tiers_lock:
+            # Tiers of the parent process are stale after a fork, the child builds its own.
+            for key in [key for key in _tiers if key[0] != pid]:
+                del _tiers[key]
+            tier = _tiers.setdefault((pid, channel), LocalTier(channel, max_entries))
+    return tier
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.alias = options.get("CACHE", "default")
+        self.channel = options.get("CHANNEL", "cache:invalidate")
+        self.max_entries = options.get("MAX_ENTRIES", 1000)
+        # Longest prefixes first, the most specific policy wins.
+        self.policies = sorted(options.get("POLICIES", {}).items(), key=lambda item: -len(item[0]))
+        self._tier = None
+
+    @property
+    def tier(self):
+        return self._tier or local_tier(self.channel, self.max_entries)
+
+    @property
+    def local(self):
+        return self.tier.local
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _local_timeout(self, key):
+        for prefix, timeout in self.policies:
+            if key.startswith(prefix):
+                return timeout
+        return 0
+
+    def _key(self, key, version):
+        return self.cache.make_key(key, version=version)
+
+    def _broadcast(self, keys):
+        self.tier.broadcast(keys)
+
+    # Reads
+
+    def get(self, key, default=None, version=None):
+        timeout = self._local_timeout(key)
+        if not timeout:
+            return self.cache.get(key, default, version=version)
+
+        tier = self.tier
+        tier.ensure_listener()
+        made = self._key(key, version)
+        value = tier.local.get(made)
+        if value is not _missing:
+            return value
+
+        generation = tier.generation
+        value = self.cache.get(key, _missing, version=version)
+        if value is _missing:
+            return default
+        # An invalidation may have arrived while reading, the value could be the
+        # old one. Until subscribed, invalidations are not seen at all.
+        if generation == tier.generation and tier.subscribed.is_set():
+            tier.local.set(made, value, timeout)
+        return value
+
+    def get_many(self, keys, version=None):
+        tier = self.tier
+        found, remote = {}, []
+        for key in keys:
+            if self._local_timeout(key):
+                tier.ensure_listener()
+                value = tier.local.get(self._key(key, version))
+                if value is not _missing:
+                    found[key] = value
+                    continue
+            remote.append(key)
+        if remote:
+            generation = tier.generation
+            values = self.cache.get_many(remote, version=version)
+            found.update(values)
+            if generation == tier.generation and tier.subscribed.is_set():
+                for key, value in values.items():
+                    timeout = self._local_timeout(key)
+                    if timeout:
+                        tier.local.set(self._key(key, version), value, timeout)
+        return found
+
+    def has_key(self, key, version=None):
+        return self.get(key, _missing, version=version) is not _missing
+
+    # Writes, every one broadcasts the keys it touches.
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.cache.add(key, value, timeout, version=version)
+        if added:
+            self._broadcast([self._key(key, version)])
+        return added
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.cache.set(key, value, timeout, version=version)
+        self._broadcast([self._key(key, version)])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.cache.set_many(data, timeout, version=version)
+        self._broadcast([self._key(key, version) for key in data])
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.cache.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        deleted = self.cache.delete(key, version=version)
+        self._broadcast([self._key(key, version)])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.cache.delete_many(keys, version=version)
+        self._broadcast([self._key(key, version) for key in keys])
+
+    def incr(self, key, delta=1, version=None):
+        value = self.cache.incr(key, delta, version=version)
+        self._broadcast([self._key(key, version)])
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def delete_pattern(self, pattern, version=None):
+        deleted = self.cache.delete_pattern(pattern, version=version)
+        self._broadcast(CLEAR)
+        return deleted
+
+    def clear(self):
+        self.cache.clear()
+        self._broadcast(CLEAR)
@@ -0,0 +1,91 @@
+"""Compact serialization and compression of django-redis cache values.
+
+Dicts and lists made of JSON types are stored as orjson, everything else
+still as a pickle; the first byte tells them apart, so values written
+before keep loading. Values of ``COMPRESS_MIN_LENGTH`` bytes or more are
+zstd compressed when that makes them smaller.
+"""
+import math
+
+import orjson
+import zstandard
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.pickle import PickleSerializer
+
+# A pickle starts with the PROTO opcode, never with one of these.
+JSON_STARTS = (b"{", b"[")
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Exact types, str and int subclasses like SafeString would not survive JSON.
+_SCALARS = {str, int, bool, type(None)}
+
+
+def json_native(value):
+    """Whether ``value`` is a dict or list that round-trips through JSON unchanged."""
+    if not isinstance(value, (dict, list)):
+        return False
+
+    stack, seen = [value], set()
+    while stack:
+        item = stack.pop()
+        kind = type(item)
+        if kind in _SCALARS:
+            continue
+        if kind is float:
+            # orjson writes NaN and infinities as null.
+            if not math.isfinite(item):
+                return False
+            continue
+        if id(item) in seen:
+            return False
+        if isinstance(item, dict):
+            # Exact type on purpose, a str subclass key would come back as str.
+            if any(type(key) is not str for key in item):  # noqa: E721
+                return False
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        else:
+            return False
+        seen.add(id(item))
+    return True
+
+
+class CompactSerializer(PickleSerializer):
+    def dumps(self, value):
+        if json_native(value):
+            try:
+                return orjson.dumps(value)
+            except orjson.JSONEncodeError:
+                # Integers beyond 64 bits.
+                pass
+        return super().dumps(value)
+
+    def loads(self, value):
+        if value[:1] in JSON_STARTS:
+            return orjson.loads(value)
+        return super().loads(value)
+
+
+class ZstdCompressor(BaseCompressor):
+    def __init__(self, options):
+        super().__init__(options)
+        self.min_length = options.get("COMPRESS_MIN_LENGTH", 1024)
+        self.level = options.get("COMPRESS_LEVEL", 3)
+
+    def compress(self, value):
+        if len(value) < self.min_length:
+            return value
+        compressed = zstandard.compress(value, self.level)
+        return compressed if len(compressed) < len(value) else value
+
+    def decompress(self, value):
+        if not value.startswith(ZSTD_MAGIC):
+            # django-redis reads the value as stored.
+            raise CompressorError("not compressed")
+        try:
+            return zstandard.decompress(value)
+        except zstandard.ZstdError as exc:
+            raise CompressorError(exc)
@@ -0,0 +1,177 @@
+"""Cached results of expensive computations, without stampedes.
+
+A result is fresh for ``ttl`` seconds and served stale for ``stale`` more
+while one caller refreshes it. Callers refresh early with a probability
+growing as expiry nears and with the time the computation took (XFetch),
+so a hot result is usually recomputed before it expires at all. Only the
+holder of a Redis lock recomputes, concurrent misses of a process share
+one call. A result computed across an ``invalidate`` is returned but not
+cached.
+"""
+import inspect
+import logging
+import math
+import random
+import threading
+import time
+from functools import wraps
+
+import redis
+from django.core.cache import caches
+
+from core.redis import get_redis_client
+from core.versions import CacheVersions
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def result(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class CachedComputation:
+    def __init__(self, key, compute, ttl, stale=None, beta=1.0, alias="hot", lock_timeout=30, wait=5,
+                 client=None, clock=time.time):
+        self.key = key
+        self.compute = compute
+        self._signature = inspect.signature(compute)
+        self.ttl = ttl
+        self.stale = ttl if stale is None else stale
+        self.beta = beta
+        self.alias = alias
+        self.lock_timeout = lock_timeout
+        self.wait = wait
+        self._client = client
+        self.clock = clock
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._generations = CacheVersions(alias, prefix="computation:generation", timeout=self.ttl + self.stale)
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, args, kwargs):
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return self.key.format(**bound.arguments)
+
+    def _due(self, entry):
+        _, delta, expires = entry
+        # XFetch, -log(u) is exponentially distributed with mean 1.
+        return self.clock() - delta * self.beta * math.log(1 - random.random()) >= expires
+
+    def __call__(self, *args, **kwargs):
+        key = self._key(args, kwargs)
+        entry = self.cache.get(key)
+        if entry is not None and not self._due(entry):
+            return entry[0]
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            # Refreshing in this process already, serve stale while it runs.
+            if entry is not None:
+                return entry[0]
+            if call.done.wait(self.wait):
+                return call.result()
+            # The leader is slow, compute rather than fail the request.
+            return self._compute(key, args, kwargs)
+
+        try:
+            call.value = self._refresh(key, entry, args, kwargs)
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+    def _refresh(self, key, entry, args, kwargs):
+        lock = self._acquire(key)
+        if lock is None:
+            if entry is not None:
+                return entry[0]
+            entry = self._wait_for(key)
+            if entry is not None:
+                return entry[0]
+            # The holder is slow or gone, compute rather than fail the request.
+        try:
+            return self._compute(key, args, kwargs)
+        finally:
+            if lock:
+                self._release(lock)
+
+    def _acquire(self, key):
+        """The refresh lock of ``key``, ``None`` if another process holds it, ``False`` without Redis."""
+        lock = self.client.lock(f"computation:lock:{key}", timeout=self.lock_timeout)
+        try:
+            return lock if lock.acquire(blocking=False) else None
+        except redis.RedisError:
+            logger.warning("Failed to lock %s, computing without the lock", key, exc_info=True)
+            return False
+
+    @staticmethod
+    def _release(lock):
+        try:
+            lock.release()
+        except redis.RedisError:
+            # Expired while computing, another caller may hold it now.
+            logger.warning("Failed to release %s", lock.name, exc_info=True)
+
+    def _wait_for(self, key):
+        deadline = time.monotonic() + self.wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def _compute(self, key, args, kwargs):
+        generation = self._generations.get(key)
+        start = self.clock()
+        value = self.compute(*args, **kwargs)
+        now = self.clock()
+        # Invalidated while computing, the value may predate the change.
+        if self._generations.get(key) == generation:
+            self.cache.set(key, (value, now - start, now + self.ttl), self.ttl + self.stale)
+        return value
+
+    def invalidate(self, *args, **kwargs):
+        """Drop the result for these arguments, the next call recomputes it."""
+        key = self._key(args, kwargs)
+        self._generations.bump(key)
+        self.cache.delete(key)
+
+
+def cached_computation(key, ttl, **options):
+    """Decorator form of ``CachedComputation``, ``key`` is formatted with the call's arguments.
+
+        @cached_computation("authors:popular:{limit}", ttl=60)
+        def popular_authors(limit=10):
+            ...
+    """
+
+    def decorator(compute):
+        return wraps(compute)(CachedComputation(key, compute, ttl, **options))
+
+    return decorator
@@ -0,0 +1,79 @@
+"""Conditional GET for API views.
+
+Validators come from version stamps and at most one aggregate query, the
+body is never rendered to compute them. ETags are weak: counters like
+``views_count`` change with every view and are left out, a revalidated
+body may show slightly old counts.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from core.versions import collection_versions
+
+
+def weak_etag(*parts):
+    digest = hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def version_time(*versions):
+    """The Last-Modified time of ``core.versions`` stamps."""
+    return datetime.fromtimestamp(max(versions) / 1e9, tz=timezone.utc)
+
+
+def collection_state(queryset, field="updated_at"):
+    """``(count, latest)`` of ``queryset`` in one aggregate query."""
+    state = queryset.order_by().aggregate(count=Count("pk"), latest=Max(field))
+    return state["count"], state["latest"]
+
+
+def conditional(state_func, on_not_modified=None):
+    """Answer GET and HEAD with 304 Not Modified while the client's copy is current.
+
+    ``state_func(request, *args, **kwargs)`` returns ``(etag, last_modified)``,
+    either may be ``None``, both ``None`` are asked again after a 200. ``on_not_modified(request, *args, **kwargs)`` runs
+    the side effects of the view that a 304 skips, like counting a view.
+    Works on DRF view methods with ``method_decorator``.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = state_func(request, *args, **kwargs)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if etag is None and last_modified is None and response.status_code == 200:
+                    # Rendering may have created the state, like a cache entry.
+                    etag, last_modified = state_func(request, *args, **kwargs)
+                    timestamp = int(last_modified.timestamp()) if last_modified else None
+            elif response.status_code == 304 and on_not_modified is not None:
+                on_not_modified(request, *args, **kwargs)
+
+            if response.status_code in (200, 304):
+                if etag and not response.has_header("ETag"):
+                    response.headers["ETag"] = etag
+                if timestamp and not response.has_header("Last-Modified"):
+                    response.headers["Last-Modified"] = http_date(timestamp)
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def current_user_state(request, *args, **kwargs):
+    """Validators of ``/api/users/me/``, from the user's version."""
+    if not request.user.is_authenticated:
+        return None, None
+    version = collection_versions.get(f"user:{request.user.pk}")
+    return weak_etag("user", request.user.pk, version), version_time(version)
@@ -0,0 +1,193 @@
+"""One-time password state, one Redis hash per secret.
+
+``otp:{secret}`` holds the email, a hash of the code and the failed
+attempts. ``otp:email:{email}`` points to the email's live secret, so a
+new code replaces the old one, and ``otp:locked:{email}`` blocks new
+codes after too many failed attempts. Generation, verification and
+invalidation are one script call each, after a GET resolving the keys the
+script touches.
+"""
+import hashlib
+import secrets
+
+from django.conf import settings
+
+from core.redis import get_redis_client
+
+# Scripts only touch keys passed in KEYS. Keys read beforehand with a
+# separate GET are checked again inside the script, which returns -2 when
+# they changed meanwhile and the call is retried.
+
+# KEYS[1] email index, KEYS[2] new secret hash, KEYS[3] email lock,
+# KEYS[4] hash of the previous secret. ARGV: prefix, email, code hash,
+# TTL, resend cooldown, previous secret or "". Returns 1, or 0 during the
+# cooldown and -1 while the email is locked.
+GENERATE = """
+if redis.call('exists', KEYS[3]) == 1 then
+    return -1
+end
+local previous = redis.call('get', KEYS[1]) or ''
+if previous ~= ARGV[6] then
+    return -2
+end
+if previous ~= '' then
+    if redis.call('ttl', KEYS[1]) > tonumber(ARGV[4]) - tonumber(ARGV[5]) then
+        return 0
+    end
+    redis.call('del', KEYS[4])
+end
+redis.call('hset', KEYS[2], 'email', ARGV[2], 'code', ARGV[3], 'attempts', 0)
+redis.call('expire', KEYS[2], ARGV[4])
+redis.call('set', KEYS[1], string.sub(KEYS[2], #ARGV[1] + 1), 'EX', ARGV[4])
+return 1
+"""
+
+# KEYS[1] secret hash, KEYS[2] email index, KEYS[3] email lock of the
+# email the secret was issued for. ARGV: prefix, code hash, max attempts,
+# lockout, that email. Returns {1}, {0, 'invalid', attempts left} or
+# {0, 'locked'}.
+VERIFY = """
+local state = redis.call('hmget', KEYS[1], 'email', 'code')
+local email, code = state[1], state[2]
+if email ~= ARGV[5] then
+    return {0, 'invalid', 0}
+end
+if code == ARGV[2] then
+    redis.call('del', KEYS[1])
+    if redis.call('get', KEYS[2]) == string.sub(KEYS[1], #ARGV[1] + 1) then
+        redis.call('del', KEYS[2])
+    end
+    return {1}
+end
+local left = tonumber(ARGV[3]) - redis.call('hincrby', KEYS[1], 'attempts', 1)
+if left > 0 then
+    return {0, 'invalid', left}
+end
+redis.call('del', KEYS[1], KEYS[2])
+redis.call('set', KEYS[3], 1, 'EX', ARGV[4])
+return {0, 'locked'}
+"""
+
+# KEYS[1] email index, KEYS[2] hash of the secret it pointed to. ARGV:
+# that secret. Returns whether a code was live.
+INVALIDATE = """
+local secret = redis.call('get', KEYS[1])
+if not secret then
+    return 0
+end
+if secret ~= ARGV[1] then
+    return -2
+end
+redis.call('del', KEYS[1], KEYS[2])
+return 1
+"""
+
+# The index changed between the GET and the script, read it again.
+CHANGED = -2
+
+
+class InvalidOTP(ValueError):
+    def __init__(self, message, attempts_left=0):
+        super().__init__(message)
+        self.attempts_left = attempts_left
+
+
+class OTPLocked(InvalidOTP):
+    pass
+
+
+class OTPThrottled(ValueError):
+    pass
+
+
+class OTPStore:
+    def __init__(self, ttl=300, max_attempts=5, lockout=900, cooldown=60, client=None, prefix="otp:"):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.lockout = lockout
+        self.cooldown = cooldown
+        self._client = client
+        self.prefix = prefix
+        self._scripts = {}
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def _script(self, source):
+        if source not in self._scripts:
+            self._scripts[source] = self.client.register_script(source)
+        return self._scripts[source]
+
+    def _index_key(self, email):
+        return f"{self.prefix}email:{email}"
+
+    def _secret_key(self, secret):
+        return f"{self.prefix}{secret}"
+
+    def _lock_key(self, email):
+        return f"{self.prefix}locked:{email}"
+
+    def _live_secret(self, email):
+        secret = self.client.get(self._index_key(email))
+        return secret.decode() if secret is not None else ""
+
+    @staticmethod
+    def _hash(code, secret):
+        # Bound to the secret so a leaked hash is useless for other codes.
+        return hashlib.sha256(f"{secret}:{code}".encode()).hexdigest()
+
+    def generate(self, email):
+        """Create a code for ``email`` replacing any previous one, returns ``(code, secret)``."""
+        code = f"{secrets.randbelow(10 ** 6):06d}"
+        secret = secrets.token_urlsafe(32)
+        created = CHANGED
+        while created == CHANGED:
+            previous = self._live_secret(email)
+            created = self._script(GENERATE)(
+                keys=[self._index_key(email), self._secret_key(secret), self._lock_key(email),
+                      self._secret_key(previous)],
+                args=[self.prefix, email, self._hash(code, secret), self.ttl, self.cooldown, previous],
+            )
+        if created == -1:
+            raise OTPLocked("Too many failed attempts.")
+        if created == 0:
+            raise OTPThrottled("A code was sent recently.")
+        return code, secret
+
+    def verify(self, secret, code):
+        """Check ``code`` and consume the secret, returns the email."""
+        email = self.client.hget(self._secret_key(secret), "email")
+        if email is None:
+            raise InvalidOTP("Invalid OTP code.")
+        email = email.decode()
+
+        result = self._script(VERIFY)(
+            keys=[self._secret_key(secret), self._index_key(email), self._lock_key(email)],
+            args=[self.prefix, self._hash(code, secret), self.max_attempts, self.lockout, email],
+        )
+        if result[0] == 1:
+            return email
+        if result[1] == b"locked":
+            raise OTPLocked("Too many failed attempts.")
+        raise InvalidOTP("Invalid OTP code.", attempts_left=result[2])
+
+    def invalidate(self, email):
+        """Drop the live code of ``email``, e.g. when sending it failed."""
+        invalidated = CHANGED
+        while invalidated == CHANGED:
+            secret = self._live_secret(email)
+            if not secret:
+                return False
+            invalidated = self._script(INVALIDATE)(
+                keys=[self._index_key(email), self._secret_key(secret)], args=[secret],
+            )
+        return bool(invalidated)
+
+
+otp_store = OTPStore(
+    ttl=settings.OTP_TTL,
+    max_attempts=settings.OTP_MAX_ATTEMPTS,
+    lockout=settings.OTP_LOCKOUT,
+    cooldown=settings.OTP_RESEND_COOLDOWN,
+)
@@ -0,0 +1,164 @@
+import base64
+import json
+
+from django.db import connections
+from django.db.models import Q
+
+CURSOR_PARAM = "cursor"
+MODE_PARAM = "pagination"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    # Full precision isoformat, DjangoJSONEncoder truncates microseconds.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def wants_cursor_pagination(request, default=False):
+    """Whether the request opts into (or a view defaults to) cursor pagination."""
+    mode = request.GET.get(MODE_PARAM)
+    if mode is None:
+        return default or CURSOR_PARAM in request.GET
+    return mode == "cursor"
+
+
+def estimated_count(queryset):
+    """Row count estimate without a ``COUNT(*)`` on PostgreSQL.
+
+    Unfiltered querysets read ``pg_class.reltuples``, filtered ones the
+    planner's row estimate. Other databases fall back to an exact count.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 until the table is vacuumed or analyzed.
+            if row and row[0] >= 0:
+                return row[0]
+            return queryset.count()
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]["Plan Rows"]
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, previous_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def links(self, request):
+        """Absolute ``next``/``previous`` urls keeping the other query parameters."""
+        def build(cursor):
+            if cursor is None:
+                return None
+            query = request.GET.copy()
+            query[CURSOR_PARAM] = cursor
+            return request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+        return build(self.next_cursor), build(self.previous_cursor)
+
+
+class KeysetPaginator:
+    """Keyset (cursor) pagination over a unique ordering.
+
+    Pages are fetched with a ``WHERE (ordering) after (last row)`` condition
+    instead of ``OFFSET``, so deep pages cost the same as the first one and
+    no ``COUNT(*)`` is needed. The last ordering field has to be unique.
+    """
+
+    def __init__(self, queryset, ordering=("-created_at", "id"), page_size=20):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        self.fields = [name.lstrip("-") for name in self.ordering]
+
+    def encode_cursor(self, obj, reverse):
+        values = [getattr(obj, name) for name in self.fields]
+        payload = json.dumps({"v": values, "r": reverse}, default=_encode_value, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            values, reverse = payload["v"], bool(payload["r"])
+            if len(values) != len(self.fields):
+                raise InvalidCursor("Cursor does not match the ordering.")
+            opts = self.queryset.model._meta
+            values = [opts.get_field(name).to_python(value) for name, value in zip(self.fields, values)]
+        except InvalidCursor:
+            raise
+        except Exception as exc:
+            raise InvalidCursor("Invalid cursor.") from exc
+        return values, reverse
+
+    def _after(self, values, reverse):
+        condition = Q()
+        lookups = []
+        for position, name in enumerate(self.ordering):
+            descending = name.startswith("-") != reverse
+            lookups.append("lt" if descending else "gt")
+            equal = {field: value for field, value in zip(self.fields[:position], values)}
+            condition |= Q(**equal, **{f"{self.fields[position]}__{lookups[-1]}": values[position]})
+
+        # The redundant bound on the leading field lets the database range
+        # scan the index instead of evaluating the OR for every row.
+        return Q(**{f"{self.fields[0]}__{lookups[0]}e": values[0]}) & condition
+
+    def page(self, cursor=None):
+        """Return the page following (or preceding) ``cursor``.
+
+        Raises ``InvalidCursor`` for cursors that were not issued by this
+        paginator.
+        """
+        values, reverse = self.decode_cursor(cursor) if cursor else (None, False)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [name[1:] if name.startswith("-") else f"-{name}" for name in ordering]
+
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse))
+
+        items = list(queryset[:self.page_size + 1])
+        has_more = len(items) > self.page_size
+        items = items[:self.page_size]
+        if reverse:
+            items.reverse()
+
+        if not items:
+            return KeysetPage(items, None, None)
+
+        if reverse:
+            next_cursor = self.encode_cursor(items[-1], False)
+            previous_cursor = self.encode_cursor(items[0], True) if has_more else None
+        else:
+            next_cursor = self.encode_cursor(items[-1], False) if has_more else None
+            previous_cursor = self.encode_cursor(items[0], True) if values is not None else None
+        return KeysetPage(items, next_cursor, previous_cursor)
+
+    def paginate_request(self, request):
+        return self.page(request.GET.get(CURSOR_PARAM))
@@ -0,0 +1,119 @@
+"""Password hashing off the request thread.
+
+With ``PASSWORD_HASHING_WORKERS`` set, hashes are computed in a process
+pool so that login storms queue for the pool instead of pinning every
+web worker's CPU. Hashes made with another hasher or older parameters
+than the preferred one are replaced on a successful check, the same way
+``AbstractBaseUser.check_password`` migrates them.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_executor = None
+_lock = threading.Lock()
+
+
+class TunedArgon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with the costs of the ``PASSWORD_ARGON2_*`` settings."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+def _setup_worker():
+    import django
+
+    django.setup()
+
+
+def get_executor():
+    """The hashing process pool, ``None`` when hashing runs in the caller."""
+    global _executor
+
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return None
+    with _lock:
+        if _executor is None:
+            # Spawned, forking a threaded web worker is unsafe.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_setup_worker,
+            )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+def _run(func, *args):
+    executor = get_executor()
+    if executor is None:
+        return func(*args)
+    return executor.submit(func, *args).result()
+
+
+async def _arun(func, *args):
+    executor = get_executor()
+    if executor is None:
+        return await sync_to_async(func, thread_sensitive=False)(*args)
+    return await asyncio.wrap_future(executor.submit(func, *args))
+
+
+def needs_rehash(encoded):
+    """Whether ``encoded`` was made by another hasher or with other parameters than the preferred one."""
+    preferred = hashers.get_hasher("default")
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def set_password(user, raw_password):
+    user.password = _run(hashers.make_password, raw_password)
+    user._password = raw_password
+
+
+def check_password(user, raw_password):
+    """``user.check_password`` with the hashing in the pool."""
+    valid = _run(hashers.check_password, raw_password, user.password)
+    if valid and needs_rehash(user.password):
+        set_password(user, raw_password)
+        user.save(update_fields=["password"])
+    return valid
+
+
+async def aset_password(user, raw_password):
+    user.password = await _arun(hashers.make_password, raw_password)
+    user._password = raw_password
+
+
+async def acheck_password(user, raw_password):
+    """Async ``check_password`` for async views, the event loop never hashes."""
+    valid = await _arun(hashers.check_password, raw_password, user.password)
+    if valid and needs_rehash(user.password):
+        await aset_password(user, raw_password)
+        await user.asave(update_fields=["password"])
+    return valid
@@ -0,0 +1,165 @@
+"""Request rate limiting with GCRA in Redis and local token buckets.
+
+Every scope has a rate like ``"5/min"`` in ``THROTTLE_RATES``, requests
+are limited per user, or per client IP when anonymous. A check is one
+script call in Redis. An in-process token bucket with the same rate sits in
+front of it: a process never sees more requests of a client than Redis
+does, so a request its bucket rejects would be rejected by Redis too, and
+floods are answered without a round trip.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import redis
+from django.conf import settings
+from django.http import JsonResponse
+
+from core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Generic cell rate algorithm. KEYS[1] holds the theoretical arrival time,
+# ARGV: now, emission interval and burst, all in seconds. Returns the
+# seconds to wait, "0" when the request is allowed. Strings keep the
+# fractions Redis would truncate.
+GCRA = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call('get', KEYS[1]) or now), now)
+local wait = tat - now - (burst - 1) * interval
+if wait > 0 then
+    return tostring(wait)
+end
+redis.call('set', KEYS[1], tostring(tat + interval), 'PX', math.ceil((tat + interval - now) * 1000))
+return '0'
+"""
+
+
+def parse_rate(rate):
+    """``"100/hour"`` to ``(100, 3600)``, ``None`` stays unlimited."""
+    if rate is None:
+        return None
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+class TokenBucket:
+    def __init__(self, capacity, refill, now):
+        self.capacity = capacity
+        self.refill = refill
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now):
+        """Take a token, returns the seconds until one is available if there is none."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill)
+        self.updated = now
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.refill
+        self.tokens -= 1
+        return 0.0
+
+
+class RateLimiter:
+    def __init__(self, rates=None, client=None, prefix="throttle", local_size=10_000, clock=time.time):
+        self._rates = rates
+        self._client = client
+        self.prefix = prefix
+        self.local_size = local_size
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._gcra = None
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def rate(self, scope):
+        rates = settings.THROTTLE_RATES if self._rates is None else self._rates
+        return parse_rate(rates.get(scope))
+
+    def _take_local(self, key, num, period, now):
+        if not self.local_size:
+            return 0.0
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(num, num / period, now)
+                if len(self._buckets) > self.local_size:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take(now)
+
+    def hit(self, scope, ident):
+        """Count a request of ``ident`` in ``scope``, returns the seconds to wait, 0 if allowed."""
+        rate = self.rate(scope)
+        if rate is None:
+            return 0.0
+
+        num, period = rate
+        key = f"{self.prefix}:{scope}:{ident}"
+        now = self.clock()
+        wait = self._take_local(key, num, period, now)
+        if wait:
+            return wait
+
+        if self._gcra is None:
+            self._gcra = self.client.register_script(GCRA)
+        try:
+            return float(self._gcra(keys=[key], args=[now, period / num, num]))
+        except redis.RedisError:
+            # Fail open, the local buckets still limit every process.
+            logger.warning("Rate limit check of %s failed", key, exc_info=True)
+            return 0.0
+
+
+rate_limiter = RateLimiter()
+
+
+def request_ident(request):
+    """The user id, or the client IP for anonymous requests."""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    proxies = settings.THROTTLE_NUM_PROXIES
+    if forwarded and proxies:
+        addresses = [address.strip() for address in forwarded.split(",")]
+        return f"ip:{addresses[-min(proxies, len(addresses))]}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def throttled_response(wait):
+    seconds = math.ceil(wait)
+    response = JsonResponse(
+        {"detail": f"So'rovlar soni cheklangan, {seconds} soniyadan keyin qayta urinib ko'ring."},
+        status=429,
+    )
+    response["Retry-After"] = str(seconds)
+    return response
+
+
+def ratelimit(scope, limiter=None):
+    """Limit a view to the ``scope`` rate of ``THROTTLE_RATES``."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            wait = (limiter or rate_limiter).hit(scope, request_ident(request))
+            if wait:
+                return throttled_response(wait)
+            return view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
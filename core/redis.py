@@ -0,0 +1,24 @@
+from functools import lru_cache
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis_client():
+    """Return the process-wide Redis client built from settings."""
+    return redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+    )
+
+
+def get_async_redis_client():
+    """Return a new asyncio Redis client, bound to the running event loop."""
+    return redis.asyncio.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+    )
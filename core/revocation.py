@@ -0,0 +1,113 @@
+"""Denylist of revoked JWTs keyed by their ``jti`` claim.
+
+A revoked id is kept in Redis only until the token would expire anyway.
+With the bloom filter enabled every process holds the live revoked ids in
+memory and asks Redis only about ids the filter may contain, so checking
+a token that was never revoked costs no round trip. Revocations made by
+other processes are picked up within ``sync_interval`` seconds.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+
+from core.redis import get_redis_client
+
+
+class BloomFilter:
+    """Set membership without false negatives, false positives at ``error_rate``."""
+
+    def __init__(self, capacity=100_000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing over one digest, Kirsch-Mitzenmacher.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    def __init__(self, bloom=False, capacity=100_000, sync_interval=5, client=None, prefix="revoked:jti",
+                 clock=time.time):
+        self.bloom = bloom
+        self.capacity = capacity
+        self.sync_interval = sync_interval
+        self._client = client
+        self.prefix = prefix
+        self.log_key = f"{prefix}:log"
+        self.clock = clock
+        self._filter = None
+        self._synced_at = None
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def _key(self, jti):
+        return f"{self.prefix}:{jti}"
+
+    def revoke(self, jti, expires_at):
+        """Deny ``jti`` until ``expires_at`` (the ``exp`` claim), returns False if already expired."""
+        now = self.clock()
+        ttl = math.ceil(expires_at - now)
+        if ttl <= 0:
+            return False
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(self._key(jti), 1, ex=ttl)
+        # Scored by expiry so filters are rebuilt from live ids only.
+        pipe.zadd(self.log_key, {jti: expires_at})
+        pipe.zremrangebyscore(self.log_key, "-inf", now)
+        pipe.execute()
+        if self._filter is not None:
+            self._filter.add(jti)
+        return True
+
+    def sync(self):
+        """Rebuild the bloom filter from the live revoked ids."""
+        now = self.clock()
+        jtis = self.client.zrangebyscore(self.log_key, now, "+inf")
+        bloom = BloomFilter(capacity=max(self.capacity, 2 * len(jtis)))
+        for jti in jtis:
+            bloom.add(jti.decode())
+        self._filter = bloom
+        self._synced_at = now
+
+    def _candidates(self, jtis):
+        if not self.bloom:
+            return jtis
+        if self._synced_at is None or self.clock() - self._synced_at >= self.sync_interval:
+            self.sync()
+        return [jti for jti in jtis if jti in self._filter]
+
+    def revoked(self, jtis):
+        """Revoked ids among ``jtis``, in one pipelined round trip at most."""
+        candidates = self._candidates(list(jtis))
+        if not candidates:
+            return set()
+
+        pipe = self.client.pipeline(transaction=False)
+        for jti in candidates:
+            pipe.exists(self._key(jti))
+        return {jti for jti, exists in zip(candidates, pipe.execute()) if exists}
+
+    def is_revoked(self, jti):
+        return bool(self.revoked([jti]))
+
+
+revocations = RevocationList(
+    bloom=settings.TOKEN_REVOCATION_BLOOM,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+)
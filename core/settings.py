@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -23,6 +24,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django_redis",
+    "articles",
 ]
 
 MIDDLEWARE = [
@@ -65,6 +68,47 @@ DATABASES = {
     }
 }
 
+# Redis
+# Shared by the counter buffers and other write-behind subsystems.
+
+REDIS_HOST = os.environ.get("REDIS_HOST", "localhost")
+
+REDIS_PORT = int(os.environ.get("REDIS_PORT", 6379))
+
+REDIS_DB = int(os.environ.get("REDIS_DB", 0))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}",
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # orjson for plain dicts and lists, pickle for the rest, zstd
+            # for values of COMPRESS_MIN_LENGTH bytes or more.
+            "SERIALIZER": "core.cache_codecs.CompactSerializer",
+            "COMPRESSOR": "core.cache_codecs.ZstdCompressor",
+            "COMPRESS_MIN_LENGTH": 1024,
+        },
+    },
+    # The default cache behind a per-process LRU for keys starting with a
+    # POLICIES prefix, kept that many seconds. Writes through this alias
+    # are broadcast over pub/sub and dropped by every process.
+    "hot": {
+        "BACKEND": "core.cache.TwoTierCache",
+        "OPTIONS": {
+            "CACHE": "default",
+            "MAX_ENTRIES": 5000,
+            "POLICIES": {
+                "faqs": 300,
+                "topics": 300,
+                "authors:popular": 30,
+                "articles:top": 30,
+                "collection:version": 5,
+            },
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -83,6 +127,26 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# Argon2id is preferred, hashes of the other hashers or with other costs
+# are replaced on the next successful login. The memory cost is in KiB.
+# With hashing workers, core.passwords hashes in a process pool.
+
+PASSWORD_HASHERS = [
+    "core.passwords.TunedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get("PASSWORD_ARGON2_TIME_COST", 3))
+
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get("PASSWORD_ARGON2_MEMORY_COST", 65536))
+
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get("PASSWORD_ARGON2_PARALLELISM", 1))
+
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", 0))
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -105,3 +169,146 @@ STATIC_ROOT = BASE_DIR / "static"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Article counters
+# views_count/reads_count are buffered in Redis and flushed in bulk.
+# Set ARTICLE_COUNTERS_FLUSH_INTERVAL (seconds) to run the flusher in a
+# background thread; otherwise use `manage.py flush_article_counters`.
+
+ARTICLE_COUNTERS_FLUSH_INTERVAL = None
+
+ARTICLE_COUNTERS_BATCH_SIZE = 500
+
+# Reading history
+# When buffered, views are queued in Redis, repeat views within the window
+# are collapsed and rows are written in bulk by the counter flusher or
+# `manage.py flush_reading_history`. Tests rely on the synchronous path.
+
+READING_HISTORY_BUFFERED = False
+
+READING_HISTORY_WINDOW = 600
+
+# Notification fan-out
+# Notifications of new articles are delivered to followers in chunks by
+# `manage.py run_notification_fanout`, spending at most the duty cycle
+# share of its time in the database.
+
+NOTIFICATION_FANOUT_CHUNK_SIZE = 1000
+
+NOTIFICATION_FANOUT_DUTY_CYCLE = 0.5
+
+NOTIFICATION_FANOUT_LEASE = 60
+
+# Notification stream
+# Server-Sent Events and long-poll endpoints fed by Redis pub/sub, served
+# through core/asgi.py.
+
+NOTIFICATION_STREAM_HEARTBEAT = 15
+
+NOTIFICATION_LONG_POLL_TIMEOUT = 25
+
+# Token revocation
+# Revoked JWT ids are denied in Redis until they expire. With the bloom
+# filter every process keeps them in memory too, tokens that were never
+# revoked are then accepted without a Redis round trip and revocations
+# from other processes apply within the sync interval (seconds).
+
+TOKEN_REVOCATION_BLOOM = False
+
+TOKEN_REVOCATION_SYNC_INTERVAL = 5
+
+# Authentication
+# core.authentication.SnapshotJWTAuthentication authenticates with a user
+# snapshot instead of a user query. From token claims the snapshot stays
+# as issued until the access token expires, otherwise it is cached in
+# Redis for the TTL (seconds) and dropped when the user is saved.
+
+AUTH_USER_SNAPSHOT_FROM_TOKEN = False
+
+AUTH_USER_SNAPSHOT_TTL = 300
+
+# Claps
+# With a coalescing window (seconds) claps are counted in Redis and each
+# user's burst on an article is written once, by the counter flusher or
+# `manage.py flush_claps`. Flush before turning it off again.
+
+CLAPS_COALESCE_WINDOW = 0
+
+# Throttling
+# Requests per scope and period (s, min, hour, day), limited per user or
+# per client IP. Checked with GCRA in Redis behind a local token bucket,
+# see core.ratelimit. Views use @ratelimit(scope), DRF views
+# core.throttling.RedisRateThrottle with throttle_scope.
+
+THROTTLE_RATES = {
+    "signup": "5/hour",
+    "login": "10/min",
+    "password_forgot": "3/hour",
+    "report": "20/hour",
+    "clap": "120/min",
+}
+
+# Reverse proxies in front of the app, X-Forwarded-For is ignored without.
+THROTTLE_NUM_PROXIES = int(os.environ.get("THROTTLE_NUM_PROXIES", 0))
+
+# Email
+# Sending only stores the email in the outbox table, `manage.py
+# run_email_outbox` delivers it with EMAIL_OUTBOX_BACKEND over one
+# persistent connection, retrying failures after BACKOFF seconds, doubled
+# every attempt. The worker pauses the same way while the connection
+# cannot be opened. The file backend (EMAIL_FILE_PATH) can stand in for SMTP.
+
+EMAIL_BACKEND = "articles.outbox.OutboxEmailBackend"
+
+EMAIL_OUTBOX_BACKEND = os.environ.get("EMAIL_OUTBOX_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", 25))
+
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS") == "True"
+
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", BASE_DIR / "emails")
+
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "webmaster@localhost")
+
+EMAIL_OUTBOX_BATCH_SIZE = 100
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_BACKOFF = 30
+
+EMAIL_OUTBOX_MESSAGES_PER_CONNECTION = 500
+
+# One-time passwords
+# Codes live for OTP_TTL seconds, a new one can be requested after the
+# cooldown. OTP_MAX_ATTEMPTS wrong codes consume the secret and lock the
+# email out of new codes for OTP_LOCKOUT seconds.
+
+OTP_TTL = 300
+
+OTP_MAX_ATTEMPTS = 5
+
+OTP_LOCKOUT = 900
+
+OTP_RESEND_COOLDOWN = 60
+
+# Article detail cache
+# Published article representations live in the default cache for
+# ARTICLE_DETAIL_CACHE_TIMEOUT seconds, keyed by versions that model
+# signals bump. Counters are merged in on every read.
+
+ARTICLE_DETAIL_CACHE_TIMEOUT = 3600
+
+# Aggregate caches
+# Results of articles.aggregates are fresh for AGGREGATE_CACHE_TTL seconds
+# and served stale for AGGREGATE_CACHE_STALE more while one process
+# recomputes them, see core.computation.
+
+AGGREGATE_CACHE_TTL = 60
+
+AGGREGATE_CACHE_STALE = 300
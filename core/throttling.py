@@ -0,0 +1,26 @@
+from rest_framework.throttling import BaseThrottle
+
+from core.ratelimit import rate_limiter, request_ident
+
+
+class RedisRateThrottle(BaseThrottle):
+    """DRF throttle backed by ``core.ratelimit``.
+
+    The scope is the view's ``throttle_scope`` or the class ``scope``, the
+    rate comes from ``THROTTLE_RATES``. Requests are limited per user, or
+    per client IP when anonymous, like ``@ratelimit`` does.
+    """
+
+    scope = None
+    limiter = rate_limiter
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None) or self.scope
+        if scope is None:
+            return True
+
+        self._wait = self.limiter.hit(scope, request_ident(request))
+        return not self._wait
+
+    def wait(self):
+        return self._wait
@@ -1,8 +1,13 @@
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 from django.http import JsonResponse
 
+from articles import views as article_views
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path('health/', lambda _: JsonResponse({'detail': 'Healthy'}), name='health'),
+    path("api/articles/", include("articles.urls")),
+    path("api/users/notifications/stream/", article_views.notification_stream, name="notification-stream"),
+    path("api/users/notifications/poll/", article_views.notification_poll, name="notification-poll"),
 ]
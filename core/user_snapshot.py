@@ -0,0 +1,103 @@
+"""Compact user snapshots so authenticated requests skip the user query.
+
+A snapshot is a user instance with only the fields authentication and
+permission checks need, the others are deferred and all load together on
+the first access of any of them.
+It comes from signed token claims or from a per-user Redis cache that is
+dropped whenever the user is saved or deleted (``QuerySet.update`` does
+not send signals, such changes show up once the entry expires). Saving a
+snapshot only writes the fields it has loaded.
+"""
+import json
+import logging
+from functools import partial
+
+import redis
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FIELDS = ("id", "username", "is_active", "is_staff")
+
+# Short claim names keep the token small.
+CLAIMS = {"username": "usr", "is_active": "act", "is_staff": "stf"}
+
+
+def _refresh_deferred(user, *args, fields=None, **kwargs):
+    # Reading one deferred field refreshes just that field, a query per
+    # field. Load every deferred field in that query instead.
+    deferred = user.get_deferred_fields()
+    if fields is not None and set(fields) <= deferred:
+        fields = deferred
+    del user.refresh_from_db
+    return user.refresh_from_db(*args, fields=fields, **kwargs)
+
+
+def user_snapshot(values):
+    """User built from ``values`` of ``SNAPSHOT_FIELDS``, the other fields deferred."""
+    User = get_user_model()
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    user = User.from_db(router.db_for_read(User), names, [values[name] for name in names])
+    user.refresh_from_db = partial(_refresh_deferred, user)
+    return user
+
+
+def snapshot_claims(user):
+    """Claims to add to a token issued for ``user``."""
+    return {claim: getattr(user, field) for field, claim in CLAIMS.items()}
+
+
+def snapshot_from_claims(user_id, claims):
+    """Snapshot from token claims, ``None`` if the token predates them."""
+    if not all(claim in claims for claim in CLAIMS.values()):
+        return None
+    return user_snapshot({"id": user_id, **{field: claims[claim] for field, claim in CLAIMS.items()}})
+
+
+class UserSnapshotCache:
+    def __init__(self, ttl=300, client=None, prefix="user:snapshot"):
+        self.ttl = ttl
+        self._client = client
+        self.prefix = prefix
+
+    @property
+    def client(self):
+        return self._client or get_redis_client()
+
+    def _key(self, user_id):
+        return f"{self.prefix}:{user_id}"
+
+    def get(self, user_id):
+        """Cached snapshot of the user, loaded on a miss, ``None`` if there is no such user."""
+        cached = self.client.get(self._key(user_id))
+        if cached is not None:
+            return user_snapshot(json.loads(cached))
+
+        values = get_user_model()._default_manager.filter(pk=user_id).values(*SNAPSHOT_FIELDS).first()
+        if values is None:
+            return None
+        self.client.set(self._key(user_id), json.dumps(values, default=str), ex=self.ttl)
+        return user_snapshot(values)
+
+    def invalidate(self, user_id):
+        # Saving a user must not fail with Redis, a missed delete expires.
+        try:
+            self.client.delete(self._key(user_id))
+        except redis.RedisError:
+            logger.warning("Failed to drop the snapshot of user %s", user_id, exc_info=True)
+
+
+user_snapshots = UserSnapshotCache(ttl=settings.AUTH_USER_SNAPSHOT_TTL)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    # After commit, or a concurrent miss could cache the old row again.
+    pk = instance.pk
+    transaction.on_commit(lambda: user_snapshots.invalidate(pk))
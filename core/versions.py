@@ -0,0 +1,45 @@
+import time
+
+from django.core.cache import caches
+
+
+class CacheVersions:
+    """Version stamps in a Django cache, bumped whenever what they stand for changes.
+
+    Versions are nanosecond clock values: an evicted or expired version is
+    never reused, and a version is never older than the last change, so it
+    doubles as a Last-Modified date.
+    """
+
+    def __init__(self, alias="default", prefix="version", timeout=None):
+        self.alias = alias
+        self.prefix = prefix
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, name):
+        return f"{self.prefix}:{name}"
+
+    def get_many(self, *names):
+        """The versions of ``names``, in order, starting the missing ones."""
+        keys = [self._key(name) for name in names]
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                # Another process may win the add, its version is the one to use.
+                self.cache.add(key, time.time_ns(), self.timeout)
+                versions[key] = self.cache.get(key)
+        return [versions[key] for key in keys]
+
+    def get(self, name):
+        return self.get_many(name)[0]
+
+    def bump(self, *names):
+        version = time.time_ns()
+        self.cache.set_many({self._key(name): version for name in names}, self.timeout)
+
+
+collection_versions = CacheVersions("hot", prefix="collection:version")
@@ -0,0 +1,65 @@
+import pytest
+from types import SimpleNamespace
+
+
+@pytest.fixture
+def counter_buffer(fake_redis):
+    from articles.counters import CounterBuffer
+
+    return CounterBuffer('articles.Article', fields=('views_count', 'reads_count'), client=fake_redis)
+
+
+def test_incr_accumulates_pending_deltas(counter_buffer):
+    counter_buffer.incr(1, 'views_count')
+    counter_buffer.incr(1, 'views_count')
+    counter_buffer.incr(1, 'reads_count', 3)
+
+    assert counter_buffer.pending(1) == {'views_count': 2, 'reads_count': 3}
+    assert counter_buffer.pending(2) == {}
+
+
+def test_incr_rejects_unknown_field(counter_buffer):
+    with pytest.raises(ValueError):
+        counter_buffer.incr(1, 'claps_count')
+
+
+def test_pending_all_returns_every_touched_object(counter_buffer):
+    counter_buffer.incr(1, 'views_count')
+    counter_buffer.incr(2, 'reads_count', 3)
+
+    assert counter_buffer.pending_all() == {'1': {'views_count': 1}, '2': {'reads_count': 3}}
+
+
+def test_merge_returns_read_your_writes_counts(counter_buffer):
+    article = SimpleNamespace(pk=1, views_count=10, reads_count=4)
+    counter_buffer.incr(1, 'views_count')
+
+    counter_buffer.merge(article)
+
+    assert article.views_count == 11
+    assert article.reads_count == 4
+
+
+def test_flush_applies_one_batch_and_clears_pending(counter_buffer, mocker):
+    apply = mocker.patch.object(counter_buffer, '_apply')
+    for pk in (1, 2, 3):
+        counter_buffer.incr(pk, 'views_count')
+
+    assert counter_buffer.flush(batch_size=10) == 3
+
+    apply.assert_called_once_with({
+        '1': {'views_count': 1},
+        '2': {'views_count': 1},
+        '3': {'views_count': 1},
+    })
+    assert counter_buffer.pending(1) == {}
+
+
+def test_flush_restores_deltas_on_failure(counter_buffer, mocker):
+    mocker.patch.object(counter_buffer, '_apply', side_effect=RuntimeError)
+    counter_buffer.incr(1, 'reads_count', 2)
+
+    with pytest.raises(RuntimeError):
+        counter_buffer.flush()
+
+    assert counter_buffer.pending(1) == {'reads_count': 2}
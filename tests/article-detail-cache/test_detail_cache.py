@@ -0,0 +1,124 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from tests.stand_ins import StandInArticle, StandInTopic
+
+User = get_user_model()
+
+
+class FakeSerializer:
+    calls = 0
+
+    def __init__(self, article):
+        FakeSerializer.calls += 1
+        self.data = {
+            'id': article.pk,
+            'title': article.title,
+            'author': article.author.username,
+            'topics': [topic.name for topic in article.topics.all()],
+            'views_count': article.views_count,
+            'reads_count': article.reads_count,
+            'claps_count': article.claps_count,
+        }
+
+
+@pytest.fixture
+def detail_cache(stand_in_tables, fake_redis, settings, mocker):
+    from django.core.cache import caches
+
+    from articles.counters import CounterBuffer
+    from articles.detail_cache import ArticleDetailCache
+    from core.user_snapshot import UserSnapshotCache
+
+    mocker.patch('core.user_snapshot.user_snapshots', UserSnapshotCache(client=fake_redis))
+
+    settings.CACHES = {
+        **settings.CACHES,
+        'detail': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'article-detail'},
+    }
+    caches['detail'].clear()
+    FakeSerializer.calls = 0
+    counters = CounterBuffer('articles.StandInArticle', fields=('views_count', 'reads_count'), client=fake_redis)
+    return ArticleDetailCache(
+        'articles.StandInArticle', FakeSerializer, alias='detail', counters=counters,
+        client=fake_redis, metrics_interval=3600,
+    )
+
+
+@pytest.fixture
+def article(stand_in_tables):
+    author = User.objects.create(username='author')
+    article = StandInArticle.objects.create(author=author, title='Redis', views_count=7)
+    article.topics.add(StandInTopic.objects.create(name='Databases'))
+    return article
+
+
+def test_second_read_is_served_from_cache(detail_cache, article, django_assert_num_queries):
+    first = detail_cache.get(article.pk)
+
+    with django_assert_num_queries(1):
+        second = detail_cache.get(article.pk)
+
+    assert first == second == {
+        'id': article.pk, 'title': 'Redis', 'author': 'author', 'topics': ['Databases'],
+        'views_count': 7, 'reads_count': 0, 'claps_count': 0,
+    }
+    assert FakeSerializer.calls == 1
+
+
+def test_counters_are_live_without_invalidating(detail_cache, article):
+    detail_cache.get(article.pk)
+    StandInArticle.objects.filter(pk=article.pk).update(claps_count=3)
+    detail_cache.counters.incr(article.pk, 'views_count', 2)
+
+    data = detail_cache.get(article.pk)
+
+    assert (data['views_count'], data['claps_count']) == (9, 3)
+    assert FakeSerializer.calls == 1
+
+
+def test_bump_expires_the_article(detail_cache, article):
+    detail_cache.get(article.pk)
+    StandInArticle.objects.filter(pk=article.pk).update(title='Redis 7')
+
+    assert detail_cache.get(article.pk)['title'] == 'Redis'
+    detail_cache.bump(article.pk)
+    assert detail_cache.get(article.pk)['title'] == 'Redis 7'
+
+
+def test_topic_and_author_bumps(detail_cache, article):
+    detail_cache.get(article.pk)
+    StandInTopic.objects.update(name='Caching')
+    detail_cache.bump_topics()
+    assert detail_cache.get(article.pk)['topics'] == ['Caching']
+
+    User.objects.filter(pk=article.author_id).update(username='writer')
+    detail_cache.bump_author(article.author_id)
+    assert detail_cache.get(article.pk)['author'] == 'writer'
+    assert FakeSerializer.calls == 3
+
+
+def test_unpublished_article_is_not_served(detail_cache, article):
+    detail_cache.get(article.pk)
+    StandInArticle.objects.filter(pk=article.pk).update(status='draft')
+
+    assert detail_cache.get(article.pk) is None
+    assert detail_cache.get(article.pk + 1) is None
+
+
+def test_metrics_are_flushed_to_redis(detail_cache, article):
+    for _ in range(3):
+        detail_cache.get(article.pk)
+    assert detail_cache.stats()['hits'] == 0
+
+    detail_cache.flush_metrics()
+
+    assert detail_cache.stats() == {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3}
+
+
+def test_versions_expire_with_the_data(detail_cache, stand_in_tables, mocker):
+    add = mocker.spy(detail_cache.cache, 'add')
+
+    assert detail_cache.get(404) is None
+
+    assert {call.args[2] for call in add.call_args_list} == {detail_cache.timeout}
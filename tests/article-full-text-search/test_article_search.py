@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+
+
+@pytest.fixture
+def indexed_documents(db):
+    from articles.search import get_backend
+
+    with connection.cursor() as cursor:
+        get_backend(connection).index(cursor, [
+            (1, 'Django tips', 'Short summary', 'Body about querysets', 'python web'),
+            (2, 'Cooking pasta', 'Italian food', 'Boil water and mention django once', 'food'),
+            (3, 'Gardening', 'Plants', 'Soil and water', 'nature'),
+        ])
+
+
+@pytest.mark.django_db
+def test_search_matches_all_fields_and_ranks_title_first(indexed_documents):
+    from articles.search import search_article_ids
+
+    assert search_article_ids('django') == [1, 2]
+    assert search_article_ids('python') == [1]
+    assert sorted(search_article_ids('water')) == [2, 3]
+
+
+@pytest.mark.django_db
+def test_search_matches_prefix_and_requires_every_term(indexed_documents):
+    from articles.search import search_article_ids
+
+    assert search_article_ids('garden') == [3]
+    assert search_article_ids('django food') == [2]
+    assert search_article_ids('  ') == []
+
+
+@pytest.mark.django_db
+def test_reindex_replaces_document(indexed_documents):
+    from articles.search import get_backend, search_article_ids
+
+    with connection.cursor() as cursor:
+        get_backend(connection).index(cursor, [(3, 'Rust', '', '', '')])
+        get_backend(connection).remove(cursor, [1])
+
+    assert search_article_ids('gardening') == []
+    assert search_article_ids('rust') == [3]
+    assert search_article_ids('django') == [2]
+
+
+@pytest.fixture
+def indexed_articles(stand_in_tables):
+    from articles.search import get_backend
+    from tests.stand_ins import StandInArticle
+
+    articles = StandInArticle.objects.bulk_create(
+        StandInArticle(title='Django %s' % i) for i in range(1200)
+    )
+    pks = [article.pk for article in articles]
+    backend = get_backend(connection)
+    with connection.cursor() as cursor:
+        backend.index(cursor, [(pk, 'Django', '', 'python ' * (pk % 3), '') for pk in pks])
+    yield pks
+    with connection.cursor() as cursor:
+        backend.remove(cursor, pks)
+
+
+def test_search_articles_keeps_every_match(indexed_articles):
+    from articles.search import search_articles
+    from tests.stand_ins import StandInArticle
+
+    results = search_articles(StandInArticle.objects.all(), 'django')
+
+    assert results.count() == 1200
+    assert search_articles(StandInArticle.objects.all(), '  ').count() == 0
+
+
+def test_search_articles_orders_by_rank(indexed_articles):
+    from articles.search import search_articles
+    from tests.stand_ins import StandInArticle
+
+    queryset = StandInArticle.objects.filter(pk__in=indexed_articles[:30])
+    ranked = list(search_articles(queryset, 'python').values_list('pk', flat=True))
+
+    twice = sorted((pk for pk in indexed_articles[:30] if pk % 3 == 2), reverse=True)
+    once = sorted((pk for pk in indexed_articles[:30] if pk % 3 == 1), reverse=True)
+    assert ranked == twice + once
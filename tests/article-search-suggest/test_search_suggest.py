@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture
+def suggestions(db):
+    from articles.suggest import ARTICLE, TOPIC, _sqlite_backend, index_terms
+
+    _sqlite_backend._index = None
+    index_terms(TOPIC, [(1, 'Programming'), (2, 'Photography'), (3, 'Politics')])
+    index_terms(ARTICLE, [(10, 'Learning programming in Python'), (11, 'Street photography tips')])
+    yield
+    _sqlite_backend._index = None
+
+
+def test_trigram_index_tolerates_typos():
+    from articles.suggest import TrigramIndex
+
+    index = TrigramIndex()
+    index.add(('topic', 1), 'Programming')
+    index.add(('topic', 2), 'Gardening')
+
+    assert index.search('progamming') == [('topic', 1, 'Programming')]
+    assert index.search('xyz') == []
+
+    assert index.search('progamming', limit=0) == []
+
+    index.remove(('topic', 1))
+    assert index.search('progamming') == []
+
+
+@pytest.mark.django_db
+def test_suggest_returns_topics_and_titles(suggestions):
+    from articles.suggest import suggest
+
+    results = suggest('photografy')
+
+    assert results[0] == ('topic', 2, 'Photography')
+    assert ('article', 11, 'Street photography tips') in results
+    assert suggest('photografy', kinds=('article',)) == [('article', 11, 'Street photography tips')]
+
+
+@pytest.mark.django_db
+def test_suggest_endpoint(suggestions, client):
+    response = client.get('/api/articles/search/suggest/', {'q': 'progrmming', 'limit': 1})
+
+    assert response.status_code == 200
+    assert response.json() == {'results': [{'type': 'topic', 'id': 1, 'text': 'Programming'}]}
+    assert client.get('/api/articles/search/suggest/').json() == {'results': []}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('limit', ['0', '-1', 'x'])
+def test_suggest_endpoint_clamps_limit(suggestions, client, limit):
+    response = client.get('/api/articles/search/suggest/', {'q': 'progrmming', 'limit': limit})
+
+    assert response.status_code == 200
+    assert response.json()['results'][0]['text'] == 'Programming'
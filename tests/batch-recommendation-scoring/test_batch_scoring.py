@@ -0,0 +1,78 @@
+import pytest
+import numpy as np
+from scipy import sparse
+
+
+@pytest.fixture
+def matrices():
+    from articles.batch_scoring import TopicMatrices
+
+    # Users 1 and 2 over topics 0..2, articles 10, 20, 30.
+    affinity = sparse.csr_matrix(np.array([[2.0, 1.0, 0.0], [0.0, 0.0, 3.0]], dtype=np.float32))
+    exclusions = sparse.csr_matrix(np.array([[0, 0, 1], [1, 0, 0]], dtype=np.float32))
+    articles = sparse.csr_matrix(np.array([[1, 0, 0], [1, 1, 0], [0, 1, 1]], dtype=np.float32))
+    return TopicMatrices([1, 2], [10, 20, 30], affinity, exclusions, articles)
+
+
+def test_top_n_per_row_orders_and_truncates():
+    from articles.batch_scoring import top_n_per_row
+
+    scores = sparse.csr_matrix(np.array([[0.5, 3.0, 1.0, 0.0], [0.0, 0.0, 0.0, 0.0]]))
+
+    rows = top_n_per_row(scores, 2)
+
+    assert rows[0].tolist() == [1, 2]
+    assert rows[1].tolist() == []
+
+
+def test_score_chunk_masks_excluded_topics(matrices):
+    from articles.batch_scoring import score_chunk
+
+    # User 1 excludes topic 2, so article 30 is dropped despite topic 1.
+    # User 2 excludes topic 0, article 30 is the only one sharing topic 2.
+    assert score_chunk(matrices, 0, 2, 10) == {1: [20, 10], 2: [30]}
+
+
+def test_score_all_respects_memory_budget_and_stores(matrices, mocker):
+    from articles.batch_scoring import chunk_rows, score_all
+
+    engine = mocker.Mock()
+
+    assert chunk_rows(matrices, 1) == (1024 * 1024) // 12
+    assert score_all(matrices, n=1, memory_mb=1, engine=engine) == 2
+    engine.store_candidates.assert_called_once_with({1: [20], 2: [30]})
+
+
+def test_score_all_with_processes(matrices, mocker):
+    from articles.batch_scoring import score_all
+
+    engine = mocker.Mock()
+
+    assert score_all(matrices, n=1, processes=2, engine=engine) == 2
+
+    stored = {}
+    for call in engine.store_candidates.call_args_list:
+        stored.update(call.args[0])
+    assert stored == {1: [20], 2: [30]}
+
+
+def test_more_feedback_survives_a_batch_run(fake_redis):
+    from articles.batch_scoring import build_matrices, score_all
+    from articles.recommendations import RecommendationEngine
+
+    fake_redis.flushall()
+    engine = RecommendationEngine(client=fake_redis)
+    # User 1 read an article of topic 5 and marked topic 7 "more", the
+    # read is also in the database. User 2 only has "more" feedback.
+    engine.record(1, [5], 'read')
+    engine.record(1, [7], 'more')
+    engine.record(2, [7], 'more')
+    article_topics = {10: [5], 20: [7]}
+    weights = {(1, 5): 0.5}
+
+    matrices = build_matrices(article_topics, weights, engine=engine)
+    assert score_all(matrices, n=10, engine=engine) == 2
+
+    assert matrices.affinity.toarray().tolist() == [[0.5, 5.0], [0.0, 5.0]]
+    assert engine.candidate_ids(1) == [20, 10]
+    assert engine.candidate_ids(2) == [20]
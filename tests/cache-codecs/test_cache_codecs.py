@@ -0,0 +1,110 @@
+import os
+import pickle
+from collections import OrderedDict
+from datetime import datetime
+
+import pytest
+from django.utils.safestring import mark_safe
+
+
+@pytest.fixture
+def serializer():
+    from core.cache_codecs import CompactSerializer
+
+    return CompactSerializer({})
+
+
+@pytest.fixture
+def compressor():
+    from core.cache_codecs import ZstdCompressor
+
+    return ZstdCompressor({'COMPRESS_MIN_LENGTH': 64})
+
+
+ARTICLE = {
+    'id': 7,
+    'title': 'Redisda kesh',
+    'author': {'id': 1, 'username': 'ali'},
+    'topics': [{'id': 1, 'name': 'Databases'}],
+    'rating': 4.5,
+    'thumbnail': None,
+    'is_pinned': False,
+}
+
+
+def test_plain_dicts_and_lists_are_json(serializer):
+    for value in (ARTICLE, [1, 2, 3], []):
+        dumped = serializer.dumps(value)
+        assert dumped[:1] in (b'{', b'[')
+        assert serializer.loads(dumped) == value
+
+
+@pytest.mark.parametrize('value', [
+    (1, 2),
+    {'created_at': datetime(2024, 5, 1)},
+    {'ids': {1, 2}},
+    {1: 'non-string key'},
+    [mark_safe('<b>safe</b>')],
+    [float('nan')],
+    [2 ** 70],
+    'plain string',
+])
+def test_other_values_fall_back_to_pickle(serializer, value):
+    dumped = serializer.dumps(value)
+
+    assert dumped[:1] == b'\x80'
+    loaded = serializer.loads(dumped)
+    assert type(loaded) is type(value)
+    assert repr(loaded) == repr(value)
+
+
+def test_cyclic_values_fall_back_to_pickle(serializer):
+    value = [1]
+    value.append(value)
+
+    loaded = serializer.loads(serializer.dumps(value))
+
+    assert loaded[1] is loaded
+
+
+def test_ordered_dicts_come_back_as_dicts(serializer):
+    assert serializer.loads(serializer.dumps(OrderedDict(a=1))) == {'a': 1}
+
+
+def test_values_pickled_before_still_load(serializer):
+    assert serializer.loads(pickle.dumps(ARTICLE)) == ARTICLE
+
+
+def test_compresses_only_large_values(compressor):
+    from django_redis.exceptions import CompressorError
+
+    small = b'{"id": 1}'
+    large = b'{"content": "' + b'lorem ipsum ' * 100 + b'"}'
+
+    assert compressor.compress(small) == small
+    compressed = compressor.compress(large)
+    assert len(compressed) < len(large)
+    assert compressor.decompress(compressed) == large
+    with pytest.raises(CompressorError):
+        compressor.decompress(small)
+
+
+def test_incompressible_values_are_stored_as_is(compressor):
+    noise = os.urandom(4096)
+
+    assert compressor.compress(noise) == noise
+
+
+def test_django_redis_client_round_trip():
+    from django_redis.cache import RedisCache
+
+    cache = RedisCache('redis://localhost:6379/0', {'OPTIONS': {
+        'SERIALIZER': 'core.cache_codecs.CompactSerializer',
+        'COMPRESSOR': 'core.cache_codecs.ZstdCompressor',
+        'COMPRESS_MIN_LENGTH': 64,
+    }})
+    article = {**ARTICLE, 'content': 'lorem ipsum ' * 200}
+
+    for value in (article, ARTICLE, (1, 'tuple'), 42):
+        assert cache.client.decode(cache.client.encode(value)) == value
+    assert len(cache.client.encode(article)) < len(pickle.dumps(article))
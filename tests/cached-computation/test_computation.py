@@ -0,0 +1,171 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def cache(settings):
+    from django.core.cache import caches
+
+    settings.CACHES = {
+        **settings.CACHES,
+        'computation': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'computation'},
+    }
+    caches['computation'].clear()
+    return caches['computation']
+
+
+@pytest.fixture
+def now():
+    return [1000.0]
+
+
+@pytest.fixture
+def make(cache, fake_redis, now):
+    from core.computation import CachedComputation
+
+    def _make(compute, **options):
+        options = {'ttl': 60, 'stale': 300, 'beta': 0, 'alias': 'computation', 'wait': 0.5, **options}
+        return CachedComputation('authors:popular:{limit}', compute, client=fake_redis, clock=lambda: now[0], **options)
+
+    return _make
+
+
+def test_result_is_cached_per_arguments(make):
+    calls = []
+
+    def compute(limit=10):
+        calls.append(limit)
+        return list(range(limit))
+
+    popular = make(compute)
+
+    assert popular() == list(range(10))
+    assert popular(limit=10) == list(range(10))
+    assert popular(3) == [0, 1, 2]
+    assert calls == [10, 3]
+
+    popular.invalidate(3)
+    popular(3)
+    assert calls == [10, 3, 3]
+
+
+def test_expired_result_is_recomputed(make, now):
+    results = iter(['first', 'second'])
+    popular = make(lambda limit=10: next(results))
+
+    assert popular() == 'first'
+    now[0] += 61
+    assert popular() == 'second'
+
+
+def test_stale_result_is_served_while_another_process_refreshes(make, now, fake_redis):
+    results = iter(['first', 'second'])
+    popular = make(lambda limit=10: next(results))
+    popular()
+    now[0] += 61
+
+    fake_redis.lock('computation:lock:authors:popular:10').acquire(blocking=False)
+
+    assert popular() == 'first'
+
+
+def test_early_refresh_before_expiry(make, now, mocker):
+    results = iter(['first', 'second'])
+
+    def compute(limit=10):
+        now[0] += 5
+        return next(results)
+
+    popular = make(compute, beta=1)
+    popular()
+    now[0] += 50
+
+    mocker.patch('core.computation.random.random', return_value=0.5)
+    assert popular() == 'first'
+
+    # -log(0.01) * 5 seconds of compute time reaches past the expiry.
+    mocker.patch('core.computation.random.random', return_value=0.99)
+    assert popular() == 'second'
+
+
+def test_cold_miss_waits_for_the_lock_holder(make, cache, fake_redis):
+    popular = make(lambda limit=10: pytest.fail('computed while locked'))
+    fake_redis.lock('computation:lock:authors:popular:10').acquire(blocking=False)
+
+    timer = threading.Timer(0.1, lambda: cache.set('authors:popular:10', ('theirs', 1, 2000)))
+    timer.start()
+
+    assert popular() == 'theirs'
+
+
+def test_concurrent_misses_share_one_call(make):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute(limit=10):
+        calls.append(limit)
+        started.set()
+        release.wait(2)
+        return 'value'
+
+    popular = make(compute)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(popular())) for _ in range(5)]
+    threads[0].start()
+    started.wait(2)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['value'] * 5
+    assert calls == [10]
+
+
+def test_failed_computation_propagates_and_is_retried(make):
+    popular = make(lambda limit=10: 1 / 0)
+
+    with pytest.raises(ZeroDivisionError):
+        popular()
+    assert popular._calls == {}
+
+
+def test_result_computed_across_invalidate_is_not_cached(make):
+    results = iter(['old', 'new'])
+    popular = None
+
+    def compute(limit=10):
+        value = next(results)
+        if value == 'old':
+            # The data changed and was invalidated while computing.
+            popular.invalidate()
+        return value
+
+    popular = make(compute)
+
+    assert popular() == 'old'
+    assert popular() == 'new'
+    assert popular() == 'new'
+
+
+def test_follower_waits_at_most_wait_seconds(make):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute(limit=10):
+        calls.append(limit)
+        if len(calls) == 1:
+            started.set()
+            release.wait(2)
+        return len(calls)
+
+    popular = make(compute, wait=0.1)
+    leader = threading.Thread(target=popular)
+    leader.start()
+    started.wait(2)
+
+    assert popular() == 2
+    release.set()
+    leader.join()
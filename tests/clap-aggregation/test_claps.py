@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection, connections
+
+from tests.stand_ins import StandInArticle, StandInClap
+
+User = get_user_model()
+
+
+@pytest.fixture
+def store(stand_in_tables):
+    from articles.claps import ClapStore
+
+    return ClapStore('articles.StandInClap', 'articles.StandInArticle', limit=5)
+
+
+@pytest.fixture
+def article(stand_in_tables):
+    return StandInArticle.objects.create()
+
+
+@pytest.fixture
+def users(stand_in_tables):
+    return [User.objects.create(username=f'user{index}') for index in range(4)]
+
+
+def test_clap_creates_then_increments(store, article, users):
+    assert store.add(users[0].pk, article.pk) == (1, 1)
+    assert store.add(users[0].pk, article.pk) == (2, 1)
+    assert store.add(users[1].pk, article.pk) == (1, 1)
+
+    article.refresh_from_db()
+    assert article.claps_count == 3
+    assert StandInClap.objects.get(user=users[0]).created_at is not None
+
+
+def test_clap_stops_at_limit(store, article, users):
+    for _ in range(5):
+        store.add(users[0].pk, article.pk)
+
+    assert store.add(users[0].pk, article.pk) == (5, 0)
+
+    article.refresh_from_db()
+    assert article.claps_count == 5
+    assert StandInClap.objects.get().count == 5
+
+
+def test_remove_subtracts_from_total(store, article, users):
+    store.add(users[0].pk, article.pk)
+    store.add(users[0].pk, article.pk)
+    store.add(users[1].pk, article.pk)
+
+    assert store.remove(users[0].pk, article.pk) == 2
+    assert store.remove(users[0].pk, article.pk) is None
+
+    article.refresh_from_db()
+    assert article.claps_count == 1
+
+
+def test_recount_repairs_totals(store, article, users):
+    store.add(users[0].pk, article.pk)
+    StandInArticle.objects.update(claps_count=40)
+
+    assert store.recount() == 1
+
+    article.refresh_from_db()
+    assert article.claps_count == 1
+
+
+def test_concurrent_claps_keep_counts_and_total_consistent(store, article, users):
+    errors = []
+
+    def add(user_id):
+        while True:
+            try:
+                return store.add(user_id, article.pk)
+            except OperationalError as exc:
+                # The shared-cache in-memory SQLite test database fails
+                # instead of waiting for a lock, PostgreSQL waits.
+                if connection.vendor != 'sqlite' or 'locked' not in str(exc):
+                    raise
+
+    def clap(user_id):
+        try:
+            for _ in range(10):
+                add(user_id)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=clap, args=(user.pk,)) for user in users for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    article.refresh_from_db()
+    assert list(StandInClap.objects.values_list('count', flat=True)) == [5] * len(users)
+    assert article.claps_count == 5 * len(users)
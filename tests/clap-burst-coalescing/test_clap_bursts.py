@@ -0,0 +1,163 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from tests.stand_ins import StandInArticle, StandInClap
+
+User = get_user_model()
+
+
+@pytest.fixture
+def store(stand_in_tables):
+    from articles.claps import ClapStore
+
+    return ClapStore('articles.StandInClap', 'articles.StandInArticle', limit=5)
+
+
+@pytest.fixture
+def bursts(store, fake_redis):
+    from articles.claps import ClapBursts
+
+    return ClapBursts(store, window=2, client=fake_redis)
+
+
+@pytest.fixture
+def article(stand_in_tables):
+    return StandInArticle.objects.create()
+
+
+@pytest.fixture
+def user(stand_in_tables):
+    return User.objects.create(username='ali')
+
+
+def test_burst_is_written_once_after_window(bursts, article, user, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert bursts.add(user.pk, article.pk, 3, now=100) == (3, 3)
+    with django_assert_num_queries(0):
+        assert bursts.add(user.pk, article.pk, 1, now=100.5) == (4, 1)
+        assert bursts.add(user.pk, article.pk, 4, now=101) == (5, 1)
+        assert bursts.add(user.pk, article.pk, 1, now=101) == (5, 0)
+
+    assert bursts.flush(now=101) == 0
+    assert not StandInClap.objects.exists()
+
+    assert bursts.flush(now=102) == 1
+    article.refresh_from_db()
+    assert StandInClap.objects.get().count == 5
+    assert article.claps_count == 5
+
+
+def test_limit_counts_stored_claps(bursts, store, article, user):
+    store.add(user.pk, article.pk, 3)
+
+    assert bursts.add(user.pk, article.pk, 10, now=100) == (5, 2)
+    bursts.flush(now=200)
+
+    article.refresh_from_db()
+    assert StandInClap.objects.get().count == 5
+    assert article.claps_count == 5
+
+
+def test_remove_drops_pending_and_stored_claps(bursts, article, user):
+    bursts.add(user.pk, article.pk, 2, now=100)
+    bursts.flush(now=200)
+    bursts.add(user.pk, article.pk, 1, now=300)
+
+    assert bursts.remove(user.pk, article.pk) == 3
+    assert bursts.remove(user.pk, article.pk) is None
+
+    assert bursts.flush(now=400) == 0
+    article.refresh_from_db()
+    assert not StandInClap.objects.exists()
+    assert article.claps_count == 0
+
+
+def test_failed_write_keeps_claps_pending(bursts, store, article, user, mocker):
+    bursts.add(user.pk, article.pk, 2, now=100)
+    mocker.patch.object(store, 'apply', side_effect=RuntimeError)
+
+    with pytest.raises(RuntimeError):
+        bursts.flush(now=200)
+    mocker.stopall()
+
+    assert bursts.flush(now=200) == 1
+    assert StandInClap.objects.get().count == 2
+
+
+def test_store_applies_claps_up_to_limit(store, article, user):
+    assert store.add(user.pk, article.pk, 3) == (3, 3)
+    assert store.add(user.pk, article.pk, 3) == (5, 2)
+    assert store.add(user.pk, article.pk, 3) == (5, 0)
+
+    article.refresh_from_db()
+    assert article.claps_count == 5
+
+
+def test_apply_adds_only_what_the_rows_take(store, article, user):
+    other = User.objects.create(username='vali')
+    store.add(user.pk, article.pk, 3)
+
+    store.apply([(str(user.pk), str(article.pk), 4), (str(other.pk), str(article.pk), 9)])
+
+    article.refresh_from_db()
+    assert dict(StandInClap.objects.values_list('user_id', 'count')) == {user.pk: 5, other.pk: 5}
+    assert article.claps_count == 10
+
+
+def test_store_add_takes_constant_queries(store, article, user, django_assert_max_num_queries):
+    store.add(user.pk, article.pk)
+
+    with django_assert_max_num_queries(6):
+        assert store.add(user.pk, article.pk, 50) == (5, 4)
+
+
+@pytest.fixture
+def clap_client(store, user, fake_redis, settings, mocker, api_client):
+    from articles.recommendations import RecommendationEngine
+    from core.authentication import SnapshotRefreshToken
+    from core.revocation import RevocationList
+    from core.user_snapshot import UserSnapshotCache
+
+    fake_redis.flushall()
+    settings.CLAPS_COALESCE_WINDOW = 0
+    settings.THROTTLE_RATES = {}
+    mocker.patch('articles.views.ClapView.article_model', 'articles.StandInArticle')
+    mocker.patch('articles.services.claps', store)
+    mocker.patch('articles.services.recommendations', RecommendationEngine(client=fake_redis))
+    mocker.patch('core.authentication.revocations', RevocationList(client=fake_redis))
+    mocker.patch('core.authentication.user_snapshots', UserSnapshotCache(client=fake_redis))
+    return api_client(token=str(SnapshotRefreshToken.for_user(user).access_token))
+
+
+@pytest.mark.parametrize('count', [0, 51, 'x', None])
+def test_clap_endpoint_validates_count(clap_client, article, count):
+    response = clap_client.post(f'/api/articles/{article.pk}/clap/', {'count': count}, format='json')
+
+    assert response.status_code == 400
+    assert response.data['count'] == ["Qarsaklar soni 1 dan 50 gacha bo'lishi kerak."]
+
+
+def test_clap_endpoint_caps_count(clap_client, article):
+    url = f'/api/articles/{article.pk}/clap/'
+
+    assert clap_client.post(url, format='json').data == {'count': 1}
+    response = clap_client.post(url, {'count': 50}, format='json')
+
+    assert response.status_code == 201
+    assert response.data == {'count': 5}
+
+
+def test_clap_endpoint_undo(clap_client, article):
+    url = f'/api/articles/{article.pk}/clap/'
+
+    assert clap_client.delete(url).status_code == 404
+    clap_client.post(url, {'count': 3}, format='json')
+    assert clap_client.delete(url).status_code == 204
+    assert not StandInClap.objects.exists()
+
+
+def test_clap_endpoint_needs_a_token(clap_client, api_client, article):
+    url = f'/api/articles/{article.pk}/clap/'
+
+    assert api_client().post(url).status_code == 401
+    assert clap_client.post('/api/articles/404/clap/').status_code == 404
@@ -0,0 +1,181 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.http import JsonResponse
+from django.test import RequestFactory
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    from django.core.cache import caches
+
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'conditional-get'},
+    }
+    caches['default'].clear()
+
+
+@pytest.fixture
+def state():
+    return {'etag': 'W/"1"', 'last_modified': datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)}
+
+
+@pytest.fixture
+def view(state):
+    from core.conditional import conditional
+
+    calls = []
+
+    @conditional(lambda request: (state['etag'], state['last_modified']))
+    def view(request):
+        calls.append(request)
+        return JsonResponse({'ok': True})
+
+    view.calls = calls
+    return view
+
+
+def test_first_response_carries_validators(view):
+    response = view(RequestFactory().get('/'))
+
+    assert response.status_code == 200
+    assert response['ETag'] == 'W/"1"'
+    assert response['Last-Modified'] == 'Wed, 01 May 2024 12:00:00 GMT'
+
+
+def test_matching_etag_skips_the_view(view):
+    response = view(RequestFactory().get('/', HTTP_IF_NONE_MATCH='W/"1"'))
+
+    assert response.status_code == 304
+    assert response['ETag'] == 'W/"1"'
+    assert view.calls == []
+
+
+def test_not_modified_hook_runs_only_on_304(state):
+    from core.conditional import conditional
+
+    skipped = []
+
+    @conditional(lambda request: (state['etag'], None), on_not_modified=lambda request: skipped.append(request))
+    def view(request):
+        return JsonResponse({'ok': True})
+
+    view(RequestFactory().get('/'))
+    view(RequestFactory().post('/', HTTP_IF_NONE_MATCH='W/"1"'))
+    assert skipped == []
+
+    request = RequestFactory().get('/', HTTP_IF_NONE_MATCH='W/"1"')
+    assert view(request).status_code == 304
+    assert skipped == [request]
+
+
+def test_if_modified_since(view, state):
+    request = RequestFactory().get('/', HTTP_IF_MODIFIED_SINCE='Wed, 01 May 2024 12:00:00 GMT')
+    assert view(request).status_code == 304
+
+    state['last_modified'] = datetime(2024, 5, 1, 12, 0, 1, tzinfo=timezone.utc)
+    assert view(request).status_code == 200
+
+
+def test_changed_state_renders_again(view, state):
+    state['etag'] = 'W/"2"'
+
+    response = view(RequestFactory().get('/', HTTP_IF_NONE_MATCH='W/"1"'))
+
+    assert response.status_code == 200
+    assert response['ETag'] == 'W/"2"'
+
+
+def test_unsafe_methods_bypass_validation(view):
+    response = view(RequestFactory().post('/', HTTP_IF_NONE_MATCH='W/"1"'))
+
+    assert response.status_code == 200
+    assert not response.has_header('ETag')
+
+
+def test_versions_are_stable_until_bumped(locmem_cache):
+    from core.versions import CacheVersions
+
+    versions = CacheVersions()
+    first = versions.get('faqs')
+    assert versions.get('faqs') == first
+
+    versions.bump('faqs', 'topics')
+
+    faqs, topics = versions.get_many('faqs', 'topics')
+    assert faqs == topics > first
+
+
+class DetailSerializer:
+    def __init__(self, article):
+        self.data = {'id': article.pk, 'title': article.title}
+
+
+@pytest.fixture
+def detail_views(stand_in_tables, locmem_cache, fake_redis, mocker):
+    from articles import conditional, views
+    from articles.counters import CounterBuffer
+    from articles.detail_cache import ArticleDetailCache
+
+    fake_redis.flushall()
+    counters = CounterBuffer('articles.StandInArticle', fields=('views_count', 'reads_count'), client=fake_redis)
+    detail_cache = ArticleDetailCache(
+        'articles.StandInArticle', DetailSerializer, counters=counters, client=fake_redis, metrics_interval=3600,
+    )
+    mocker.patch.object(views, 'article_detail_cache', detail_cache)
+    mocker.patch.object(conditional, 'article_detail_cache', detail_cache)
+    views.counted = mocker.patch.object(views, 'count_article_view')
+    return views
+
+
+@pytest.fixture
+def published(stand_in_tables):
+    from tests.stand_ins import StandInArticle
+
+    return StandInArticle.objects.create(title='Redis')
+
+
+def test_article_detail_revalidates_without_loading(detail_views, published, mocker):
+    load = mocker.spy(detail_views.article_detail_cache, '_load')
+    url = f'/api/articles/{published.pk}/'
+
+    response = detail_views.article_detail(RequestFactory().get(url), pk=published.pk)
+    assert response.status_code == 200
+
+    request = RequestFactory().get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert detail_views.article_detail(request, pk=published.pk).status_code == 304
+    assert load.call_count == 1
+    # A revalidated read is still a view, with the article's own status.
+    assert [call.args[0].status for call in detail_views.counted.call_args_list] == ['publish', 'publish']
+
+    detail_views.article_detail_cache.bump(published.pk)
+    assert detail_views.article_detail(request, pk=published.pk).status_code == 200
+
+
+@pytest.mark.parametrize('headers', [
+    {'HTTP_IF_NONE_MATCH': '*'},
+    {'HTTP_IF_MODIFIED_SINCE': 'Wed, 01 May 2024 12:00:00 GMT'},
+])
+def test_missing_or_draft_article_is_never_not_modified(detail_views, headers):
+    from tests.stand_ins import StandInArticle
+
+    draft = StandInArticle.objects.create(title='Draft', status='draft')
+
+    for pk in (404, draft.pk):
+        response = detail_views.article_detail(RequestFactory().get(f'/api/articles/{pk}/', **headers), pk=pk)
+        assert response.status_code == 404
+    assert not detail_views.counted.called
+
+
+def test_article_detail_only_allows_get(detail_views, published):
+    response = detail_views.article_detail(RequestFactory().post(f'/api/articles/{published.pk}/'), pk=published.pk)
+
+    assert response.status_code == 405
+    assert not detail_views.counted.called
+
+
+@pytest.mark.parametrize('params', [{'get_top_articles': 5}, {'is_recommend': 'true'}])
+def test_article_list_leaves_dynamic_orders_unvalidated(params):
+    from articles.conditional import article_list_state
+
+    assert article_list_state(RequestFactory().get('/api/articles/', params)) == (None, None)
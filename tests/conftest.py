@@ -1,5 +1,6 @@
 import pytest
 import fakeredis
+from django.db import connection
 from pytest_factoryboy import register
 from tests.factories.user_factory import UserFactory
 
@@ -40,3 +41,16 @@ def tokens():
 @pytest.fixture
 def fake_redis():
     return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def stand_in_tables(transactional_db):
+    from tests.stand_ins import STAND_INS
+
+    with connection.schema_editor() as editor:
+        for model in STAND_INS:
+            editor.create_model(model)
+    yield
+    with connection.schema_editor() as editor:
+        for model in reversed(STAND_INS):
+            editor.delete_model(model)
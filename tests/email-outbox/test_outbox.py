@@ -0,0 +1,199 @@
+import smtplib
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
+from django.utils import timezone
+
+from articles.models import OutboxEmail
+
+LOCMEM = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+@pytest.fixture
+def enqueue(db):
+    def _enqueue(count=1, **kwargs):
+        connection = get_connection('articles.outbox.OutboxEmailBackend')
+        for index in range(count):
+            send_mail(f'Kod {index}', '1234', 'medium@example.com', [f'user{index}@example.com'],
+                      connection=connection, **kwargs)
+
+    return _enqueue
+
+
+@pytest.fixture
+def worker():
+    from articles.outbox import OutboxWorker
+
+    return OutboxWorker(batch_size=2, max_attempts=3, backoff=30, backend=LOCMEM)
+
+
+def test_sending_only_enqueues(enqueue):
+    enqueue(html_message='<b>1234</b>')
+
+    email = OutboxEmail.objects.get()
+    assert (email.to, email.subject, email.body, email.html_body) == (['user0@example.com'], 'Kod 0', '1234', '<b>1234</b>')
+    assert email.status == OutboxEmail.Status.PENDING
+    assert mail.outbox == []
+
+
+def test_worker_delivers_in_batches_over_one_connection(enqueue, worker, mocker):
+    enqueue(5, html_message='<b>1234</b>')
+    get_connection_ = mocker.spy(worker, '_connection')
+    claim = mocker.spy(worker, 'claim')
+
+    assert worker.run_pending() == 5
+
+    assert sorted(message.to[0] for message in mail.outbox) == [f'user{index}@example.com' for index in range(5)]
+    assert mail.outbox[0].alternatives == [('<b>1234</b>', 'text/html')]
+    assert claim.call_count == 4
+    assert get_connection_.call_count == 5
+    assert set(OutboxEmail.objects.values_list('status', flat=True)) == {OutboxEmail.Status.SENT}
+
+
+def test_claimed_emails_are_not_claimed_again(enqueue, worker):
+    enqueue(3)
+
+    first, second = worker.claim(), worker.claim()
+
+    assert len(first) == 2 and len(second) == 1
+    assert not {email.pk for email in first} & {email.pk for email in second}
+
+
+def test_failures_back_off_then_give_up(enqueue, worker, mocker):
+    enqueue()
+    send = mocker.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=smtplib.SMTPRecipientsRefused({}))
+
+    assert worker.run_pending() == 0
+    email = OutboxEmail.objects.get()
+    assert (email.status, email.attempts) == (OutboxEmail.Status.PENDING, 1)
+    assert email.next_attempt_at > timezone.now() + timedelta(seconds=25)
+
+    for attempt in (2, 3):
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        worker.run_pending()
+
+    email.refresh_from_db()
+    assert (email.status, email.attempts, send.call_count) == (OutboxEmail.Status.FAILED, 3, 3)
+    assert email.last_error.startswith('SMTPRecipientsRefused')
+
+
+def test_lost_connection_retries_rest_of_batch(enqueue, worker, mocker):
+    enqueue(2)
+    mocker.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                 side_effect=[1, smtplib.SMTPServerDisconnected()])
+    close = mocker.spy(worker, 'close')
+
+    assert worker.run_pending() == 1
+
+    assert close.called
+    statuses = list(OutboxEmail.objects.order_by('pk').values_list('status', 'attempts'))
+    assert statuses == [(OutboxEmail.Status.SENT, 1), (OutboxEmail.Status.PENDING, 1)]
+
+
+def test_file_backend_stands_in_for_smtp(enqueue, tmp_path, settings):
+    from articles.outbox import OutboxWorker
+
+    settings.EMAIL_FILE_PATH = tmp_path
+    enqueue(3)
+
+    sent = OutboxWorker(backend='django.core.mail.backends.filebased.EmailBackend').run_pending()
+
+    assert sent == 3
+    assert [path.read_text().count('Subject: Kod') for path in tmp_path.iterdir()] == [3]
+
+
+def test_html_only_message_keeps_html_body(db):
+    from articles.outbox import OutboxEmailBackend
+
+    message = EmailMultiAlternatives('Salom', '<p>Salom</p>', 'medium@example.com', ['ali@example.com'])
+    message.content_subtype = 'html'
+
+    assert OutboxEmailBackend().send_messages([message]) == 1
+    assert OutboxEmail.objects.get().html_body == '<p>Salom</p>'
+
+
+def test_untried_emails_are_released_without_an_attempt(enqueue, mocker):
+    from articles.outbox import OutboxWorker
+
+    enqueue(3)
+    mocker.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                 side_effect=[1, smtplib.SMTPServerDisconnected()])
+    worker = OutboxWorker(batch_size=3, max_attempts=3, backoff=30, backend=LOCMEM)
+
+    assert worker.deliver(worker.claim()) == 1
+
+    rows = list(OutboxEmail.objects.order_by('pk').values_list('status', 'attempts', 'leased_until'))
+    assert rows[1][:2] == (OutboxEmail.Status.PENDING, 1)
+    assert rows[2] == (OutboxEmail.Status.PENDING, 0, None)
+    assert [email.pk for email in worker.claim()] == [OutboxEmail.objects.order_by('pk').last().pk]
+
+
+def test_attachments_headers_and_reply_to_are_kept(db, worker):
+    from articles.outbox import OutboxEmailBackend
+
+    message = EmailMultiAlternatives('Hisobot', 'Ilova', 'medium@example.com', ['ali@example.com'],
+                                     reply_to=['yordam@example.com'], headers={'X-Report': '7'})
+    message.attach('hisobot.csv', 'id,soni\n1,2\n', 'text/csv')
+    message.attach('logo.png', b'\x89PNG\x00', 'image/png')
+    OutboxEmailBackend().send_messages([message])
+
+    assert worker.run_pending() == 1
+
+    sent = mail.outbox[0]
+    assert sent.reply_to == ['yordam@example.com']
+    assert sent.extra_headers == {'X-Report': '7'}
+    assert sent.attachments == [('hisobot.csv', 'id,soni\n1,2\n', 'text/csv'), ('logo.png', b'\x89PNG\x00', 'image/png')]
+
+
+def test_messages_that_cannot_be_stored_are_refused(db):
+    from email.mime.text import MIMEText
+
+    from articles.outbox import OutboxEmailBackend
+
+    message = EmailMultiAlternatives('Salom', 'Salom', 'medium@example.com', ['ali@example.com'])
+    message.attach(MIMEText('Salom'))
+
+    with pytest.raises(ValueError):
+        OutboxEmailBackend().send_messages([message])
+    assert not OutboxEmail.objects.exists()
+
+
+def test_lease_is_renewed_during_a_batch(enqueue, mocker):
+    from articles.outbox import OutboxWorker
+
+    enqueue(3)
+    worker = OutboxWorker(batch_size=3, lease=0, backend=LOCMEM)
+    renew = mocker.spy(worker, '_renew')
+    emails = worker.claim()
+    claimed_until = emails[0].leased_until
+
+    assert worker.deliver(emails) == 3
+
+    assert [len(call.args[0]) for call in renew.call_args_list] == [3, 2, 1]
+    assert emails[-1].leased_until > claimed_until
+
+
+def test_unreachable_server_pauses_the_worker_without_attempts(enqueue, worker, mocker):
+    enqueue(3)
+    open_ = mocker.patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=ConnectionRefusedError())
+    claim = mocker.spy(worker, 'claim')
+
+    assert worker.run_pending() == 0
+    assert worker.run_pending() == 0
+
+    assert (claim.call_count, open_.call_count) == (1, 1)
+    rows = set(OutboxEmail.objects.values_list('status', 'attempts', 'leased_until'))
+    assert rows == {(OutboxEmail.Status.PENDING, 0, None)}
+    assert worker.paused_until > timezone.now() + timedelta(seconds=25)
+
+    worker.paused_until = timezone.now()
+    assert worker.run_pending() == 0
+    assert worker.paused_until > timezone.now() + timedelta(seconds=55)
+
+    open_.side_effect = None
+    worker.paused_until = timezone.now()
+    assert worker.run_pending() == 3
+    assert not worker.paused()
@@ -0,0 +1,80 @@
+import pytest
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from django.utils import timezone
+
+User = get_user_model()
+
+
+@pytest.fixture
+def users(db):
+    now = timezone.now()
+    # Pairs share date_joined so the id tie-breaker is exercised.
+    return User.objects.bulk_create([
+        User(username=f'user{index}', date_joined=now - timedelta(microseconds=index // 2))
+        for index in range(25)
+    ])
+
+
+def _paginator(page_size=10):
+    from core.pagination import KeysetPaginator
+
+    return KeysetPaginator(User.objects.all(), ordering=('-date_joined', 'id'), page_size=page_size)
+
+
+def test_pages_cover_every_row_once_in_order(users):
+    paginator = _paginator()
+    expected = list(User.objects.order_by('-date_joined', 'id').values_list('id', flat=True))
+
+    seen, cursor, pages = [], None, []
+    while True:
+        page = paginator.page(cursor)
+        pages.append(page)
+        seen += [user.id for user in page]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert pages[0].previous_cursor is None
+
+
+def test_previous_cursor_returns_previous_page(users):
+    paginator = _paginator()
+    first = paginator.page()
+    second = paginator.page(first.next_cursor)
+
+    back = paginator.page(second.previous_cursor)
+
+    assert [user.id for user in back] == [user.id for user in first]
+    assert back.previous_cursor is None
+    assert back.next_cursor is not None
+
+
+def test_invalid_cursor(users):
+    from core.pagination import InvalidCursor
+
+    with pytest.raises(InvalidCursor):
+        _paginator().page('not-a-cursor')
+
+
+def test_links_keep_query_parameters(users):
+    from core.pagination import wants_cursor_pagination
+
+    request = RequestFactory().get('/api/articles/', {'pagination': 'cursor', 'topic_id': 1})
+    next_url, previous_url = _paginator().paginate_request(request).links(request)
+
+    assert wants_cursor_pagination(request)
+    assert not wants_cursor_pagination(RequestFactory().get('/api/articles/'))
+    assert next_url.startswith('http://testserver/api/articles/?')
+    assert 'topic_id=1' in next_url and 'cursor=' in next_url
+    assert previous_url is None
+
+
+def test_estimated_count_falls_back_to_count(users):
+    from core.pagination import estimated_count
+
+    assert estimated_count(User.objects.all()) == 25
+    assert estimated_count(User.objects.filter(username='user1')) == 1
@@ -0,0 +1,73 @@
+import pytest
+from datetime import timedelta
+from types import SimpleNamespace
+from django.utils import timezone
+
+
+@pytest.fixture
+def job(db):
+    from articles.notifications import schedule_publish_notifications
+
+    author = SimpleNamespace(username='author')
+    article = SimpleNamespace(pk=7, author=author, author_id=3, title='Hello')
+    return schedule_publish_notifications(article)
+
+
+def test_schedule_only_creates_pending_job(job):
+    from articles.models import NotificationFanout
+
+    assert job.status == NotificationFanout.Status.PENDING
+    assert (job.author_id, job.article_id, job.last_follow_id) == (3, 7, 0)
+    assert 'Hello' in job.message
+
+
+def test_job_is_claimed_once_until_lease_expires(job):
+    from articles.models import NotificationFanout
+    from articles.notifications import FanoutWorker
+
+    worker = FanoutWorker(lease=60)
+
+    assert worker.claim(job.pk).leased_until is not None
+    assert worker.claim(job.pk) is None
+
+    NotificationFanout.objects.filter(pk=job.pk).update(leased_until=timezone.now() - timedelta(seconds=1))
+    assert worker.claim(job.pk) is not None
+
+
+def test_claim_returns_the_stored_progress(job):
+    from articles.models import NotificationFanout
+    from articles.notifications import FanoutWorker
+
+    NotificationFanout.objects.filter(pk=job.pk).update(last_follow_id=500, sent_count=500)
+
+    claimed = FanoutWorker(lease=60).claim(job.pk)
+
+    assert (claimed.last_follow_id, claimed.sent_count) == (500, 500)
+
+
+def test_progress_is_not_saved_after_the_lease_is_lost(job):
+    from articles.models import NotificationFanout
+    from articles.notifications import FanoutWorker
+
+    worker = FanoutWorker(lease=60)
+    slow = worker.claim(job.pk)
+    NotificationFanout.objects.filter(pk=job.pk).update(leased_until=timezone.now() - timedelta(seconds=1))
+    fast = worker.claim(job.pk)
+
+    worker._advance(fast, last_follow_id=10, sent_count=10)
+    with pytest.raises(RuntimeError):
+        worker._advance(slow, last_follow_id=5, sent_count=5)
+
+    job.refresh_from_db()
+    assert (job.last_follow_id, job.sent_count) == (10, 10)
+    assert job.leased_until == fast.leased_until
+
+
+def test_throttle_keeps_duty_cycle():
+    from articles.notifications import FanoutWorker
+
+    pauses = []
+    FanoutWorker(duty_cycle=0.25, sleep=pauses.append)._throttle(0.1)
+    FanoutWorker(duty_cycle=1.0, sleep=pauses.append)._throttle(0.1)
+
+    assert pauses == [pytest.approx(0.3)]
@@ -0,0 +1,198 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, AsyncRequestFactory
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_client(server):
+    return fakeredis.FakeRedis(server=server)
+
+
+@pytest.fixture(autouse=True)
+def async_redis(server, mocker):
+    mocker.patch(
+        'articles.views.get_async_redis_client',
+        side_effect=lambda: fakeredis.aioredis.FakeRedis(server=server),
+    )
+
+
+def make_request(path, user_id=1, **params):
+    request = AsyncRequestFactory().get(path, params)
+    request.user = type('User', (), {'is_authenticated': user_id is not None, 'pk': user_id})()
+    return request
+
+
+def publish(client, user_id, notification_id, message='Salom'):
+    from articles.notifications import publish_notifications
+
+    notification = type('Notification', (), {'user_id': user_id, 'pk': notification_id, 'message': message})()
+    publish_notifications([notification], client=client)
+
+
+def test_stream_sends_published_notifications(redis_client):
+    from articles.views import notification_stream
+
+    async def read_events():
+        response = await notification_stream(make_request('/stream/'))
+        events = aiter(response.streaming_content)
+        try:
+            assert (await anext(events)).startswith(b'retry:')
+            publish(redis_client, 2, 6)
+            publish(redis_client, 1, 7)
+            return await anext(events)
+        finally:
+            await events.aclose()
+
+    event = async_to_sync(read_events)()
+
+    assert event.startswith(b'id: 7\nevent: notification\n')
+    assert json.loads(event.split(b'data: ')[1]) == {'id': 7, 'message': 'Salom'}
+    assert redis_client.pubsub_numsub('notifications:user:1') == [(b'notifications:user:1', 0)]
+
+
+def test_stream_sends_heartbeats(settings):
+    from articles.views import notification_stream
+
+    settings.NOTIFICATION_STREAM_HEARTBEAT = 0.01
+
+    async def read_events():
+        response = await notification_stream(make_request('/stream/'))
+        events = aiter(response.streaming_content)
+        try:
+            await anext(events)
+            return await anext(events)
+        finally:
+            await events.aclose()
+
+    assert async_to_sync(read_events)() == b': keep-alive\n\n'
+
+
+@pytest.mark.parametrize('path', ['/api/users/notifications/stream/', '/api/users/notifications/poll/'])
+def test_anonymous_user_is_rejected(path):
+    async def get():
+        return await AsyncClient().get(path)
+
+    response = async_to_sync(get)()
+
+    assert response.status_code == 401
+
+
+def test_poll_returns_notification_published_while_waiting(redis_client):
+    from articles.views import notification_poll
+
+    async def poll():
+        task = asyncio.ensure_future(notification_poll(make_request('/poll/', timeout=5)))
+        while not redis_client.pubsub_numsub('notifications:user:1')[0][1]:
+            await asyncio.sleep(0.01)
+        publish(redis_client, 1, 3)
+        return await task
+
+    response = async_to_sync(poll)()
+
+    assert json.loads(response.content) == {'results': [{'id': 3, 'message': 'Salom'}]}
+
+
+def test_poll_times_out_empty(settings):
+    from articles.views import notification_poll
+
+    settings.NOTIFICATION_LONG_POLL_TIMEOUT = 0.05
+
+    response = async_to_sync(notification_poll)(make_request('/poll/', timeout=60))
+
+    assert json.loads(response.content) == {'results': []}
+
+
+@pytest.mark.parametrize('timeout', ['nan', 'inf', '-inf', '-5', 'x'])
+def test_poll_clamps_invalid_timeouts(settings, mocker, timeout):
+    from articles import views
+
+    settings.NOTIFICATION_LONG_POLL_TIMEOUT = 0.05
+    next_message = mocker.patch('articles.views._next_message', side_effect=views._next_message)
+
+    response = async_to_sync(views.notification_poll)(make_request('/poll/', timeout=timeout))
+
+    assert json.loads(response.content) == {'results': []}
+    assert 0 <= next_message.call_args_list[0].args[1] <= 0.05
+
+
+def test_poll_returns_missed_notifications_right_away(mocker):
+    from articles.views import notification_poll
+
+    unread = mocker.patch('articles.views._unread_since', return_value=[{'id': 5, 'message': 'Salom'}])
+
+    response = async_to_sync(notification_poll)(make_request('/poll/', since=4, timeout=5))
+
+    assert json.loads(response.content) == {'results': [{'id': 5, 'message': 'Salom'}]}
+    unread.assert_called_once_with(1, 4)
+
+
+@pytest.fixture
+def bearer(db, fake_redis, mocker):
+    from django.contrib.auth import get_user_model
+
+    from core.authentication import SnapshotRefreshToken
+    from core.revocation import RevocationList
+    from core.user_snapshot import UserSnapshotCache
+
+    fake_redis.flushall()
+    mocker.patch('core.authentication.revocations', RevocationList(client=fake_redis))
+    mocker.patch('core.authentication.user_snapshots', UserSnapshotCache(client=fake_redis))
+    user = get_user_model().objects.create(username='ali')
+    return user, f'Bearer {SnapshotRefreshToken.for_user(user).access_token}'
+
+
+def jwt_request(path, authorization, **params):
+    from django.contrib.auth.models import AnonymousUser
+
+    request = AsyncRequestFactory().get(path, params, headers={'Authorization': authorization})
+    request.user = AnonymousUser()
+    return request
+
+
+def test_poll_authenticates_bearer_token(bearer, settings, mocker):
+    from articles.views import notification_poll
+
+    settings.NOTIFICATION_LONG_POLL_TIMEOUT = 0.01
+    user, authorization = bearer
+    unread = mocker.patch('articles.views._unread_since', return_value=[{'id': 5, 'message': 'Salom'}])
+
+    response = async_to_sync(notification_poll)(jwt_request('/poll/', authorization, since=4))
+
+    assert response.status_code == 200
+    unread.assert_called_once_with(user.pk, 4)
+
+
+def test_stream_authenticates_bearer_token(bearer, redis_client):
+    from articles.views import notification_stream
+
+    user, authorization = bearer
+
+    async def read_events():
+        response = await notification_stream(jwt_request('/stream/', authorization))
+        events = aiter(response.streaming_content)
+        try:
+            await anext(events)
+            publish(redis_client, user.pk, 8)
+            return await anext(events)
+        finally:
+            await events.aclose()
+
+    assert async_to_sync(read_events)().startswith(b'id: 8\n')
+
+
+@pytest.mark.parametrize('authorization', ['Bearer invalid', 'Bearer ', ''])
+def test_invalid_bearer_token_is_rejected(bearer, authorization):
+    from articles.views import notification_poll
+
+    response = async_to_sync(notification_poll)(jwt_request('/poll/', authorization))
+
+    assert response.status_code == 401
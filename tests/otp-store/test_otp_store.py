@@ -0,0 +1,118 @@
+import pytest
+
+EMAIL = 'ali@example.com'
+
+
+@pytest.fixture
+def store(fake_redis):
+    from core.otp import OTPStore
+
+    return OTPStore(ttl=300, max_attempts=3, lockout=900, cooldown=60, client=fake_redis)
+
+
+def test_state_is_one_hash_per_secret(store, fake_redis):
+    code, secret = store.generate(EMAIL)
+
+    assert len(code) == 6 and code.isdigit()
+    state = fake_redis.hgetall(f'otp:{secret}')
+    assert state[b'email'] == EMAIL.encode()
+    assert code.encode() not in state.values()
+    assert fake_redis.ttl(f'otp:{secret}') == 300
+    assert fake_redis.get(f'otp:email:{EMAIL}') == secret.encode()
+
+
+def test_verify_consumes_secret(store, fake_redis):
+    code, secret = store.generate(EMAIL)
+
+    assert store.verify(secret, code) == EMAIL
+
+    from core.otp import InvalidOTP
+
+    with pytest.raises(InvalidOTP):
+        store.verify(secret, code)
+    assert fake_redis.keys('otp:*') == []
+
+
+def test_verify_is_a_read_and_one_script_call(store, mocker):
+    from core.otp import InvalidOTP
+
+    code, secret = store.generate(EMAIL)
+    with pytest.raises(InvalidOTP):
+        # Loads the script into Redis.
+        store.verify(secret, 'x')
+    execute = mocker.spy(store.client, 'execute_command')
+
+    store.verify(secret, code)
+
+    assert [call.args[0] for call in execute.call_args_list] == ['HGET', 'EVALSHA']
+
+
+def test_scripts_only_touch_declared_keys(store, fake_redis, mocker):
+    from core.otp import InvalidOTP
+
+    evalsha = mocker.spy(fake_redis, 'evalsha')
+    code, secret = store.generate(EMAIL)
+    fake_redis.expire(f'otp:email:{EMAIL}', 200)
+    _, replaced = store.generate(EMAIL)
+    with pytest.raises(InvalidOTP):
+        store.verify(replaced, 'x')
+    store.invalidate(EMAIL)
+
+    declared = [set(call.args[2:2 + call.args[1]]) for call in evalsha.call_args_list]
+    assert f'otp:{secret}' in declared[1]
+    assert {f'otp:{replaced}', f'otp:email:{EMAIL}', f'otp:locked:{EMAIL}'} <= declared[2]
+    assert {f'otp:email:{EMAIL}', f'otp:{replaced}'} <= declared[3]
+
+
+def test_generate_retries_when_the_index_changed(store, fake_redis, mocker):
+    _, old_secret = store.generate(EMAIL)
+    fake_redis.expire(f'otp:email:{EMAIL}', 200)
+    mocker.patch.object(store, '_live_secret', side_effect=['stale', old_secret])
+
+    _, secret = store.generate(EMAIL)
+
+    assert not fake_redis.exists(f'otp:{old_secret}')
+    assert fake_redis.get(f'otp:email:{EMAIL}') == secret.encode()
+
+
+def test_wrong_code_counts_attempts_then_locks_out(store, fake_redis):
+    from core.otp import InvalidOTP, OTPLocked
+
+    code, secret = store.generate(EMAIL)
+
+    with pytest.raises(InvalidOTP) as first:
+        store.verify(secret, '000000' if code != '000000' else '111111')
+    assert first.value.attempts_left == 2
+    with pytest.raises(InvalidOTP):
+        store.verify(secret, 'x')
+    with pytest.raises(OTPLocked):
+        store.verify(secret, 'x')
+
+    with pytest.raises(InvalidOTP):
+        store.verify(secret, code)
+    with pytest.raises(OTPLocked):
+        store.generate(EMAIL)
+    assert fake_redis.ttl(f'otp:locked:{EMAIL}') == 900
+
+
+def test_new_code_replaces_old_after_cooldown(store, fake_redis):
+    from core.otp import InvalidOTP, OTPThrottled
+
+    old_code, old_secret = store.generate(EMAIL)
+    with pytest.raises(OTPThrottled):
+        store.generate(EMAIL)
+
+    fake_redis.expire(f'otp:email:{EMAIL}', 200)
+    code, secret = store.generate(EMAIL)
+
+    with pytest.raises(InvalidOTP):
+        store.verify(old_secret, old_code)
+    assert store.verify(secret, code) == EMAIL
+
+
+def test_invalidate(store, fake_redis):
+    _, secret = store.generate(EMAIL)
+
+    assert store.invalidate(EMAIL)
+    assert not store.invalidate(EMAIL)
+    assert fake_redis.keys('otp:*') == []
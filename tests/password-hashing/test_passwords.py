@@ -0,0 +1,72 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import MD5PasswordHasher, PBKDF2PasswordHasher
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def cheap_argon2(settings):
+    settings.PASSWORD_ARGON2_TIME_COST = 1
+    settings.PASSWORD_ARGON2_MEMORY_COST = 64
+    settings.PASSWORD_ARGON2_PARALLELISM = 1
+    settings.PASSWORD_HASHERS = [
+        'core.passwords.TunedArgon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create(username='ali', password=MD5PasswordHasher().encode('parol', 'salt'))
+
+
+def test_login_migrates_hash_to_argon2(user):
+    from core.passwords import check_password
+
+    assert not check_password(user, 'xato')
+    assert user.password.startswith('md5$')
+
+    assert check_password(user, 'parol')
+    user.refresh_from_db()
+    assert user.password.startswith('argon2$argon2id$')
+    assert user.check_password('parol')
+
+
+def test_changed_cost_is_rehashed(user, settings):
+    from core.passwords import check_password, needs_rehash, set_password
+
+    set_password(user, 'parol')
+    assert not needs_rehash(user.password)
+
+    settings.PASSWORD_ARGON2_TIME_COST = 2
+    assert needs_rehash(user.password)
+    check_password(user, 'parol')
+    assert 't=2' in user.password
+
+
+def test_async_check_password(user):
+    from core.passwords import acheck_password
+
+    assert not async_to_sync(acheck_password)(user, 'xato')
+    assert async_to_sync(acheck_password)(user, 'parol')
+    user.refresh_from_db()
+    assert user.password.startswith('argon2$')
+
+
+def test_hashing_runs_in_process_pool(user, settings):
+    from core import passwords
+
+    settings.PASSWORD_HASHING_WORKERS = 1
+    # Workers load the project settings, use a hash they know.
+    user.password = PBKDF2PasswordHasher().encode('parol', 'salt', iterations=1)
+    try:
+        assert passwords.get_executor() is not None
+        assert not passwords.check_password(user, 'xato')
+        assert async_to_sync(passwords.acheck_password)(user, 'parol')
+    finally:
+        passwords.shutdown_executor()
+
+    assert user.password.startswith('argon2$')
@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+@pytest.fixture
+def leaderboard(fake_redis):
+    from articles.leaderboards import Leaderboard
+
+    return Leaderboard('leaderboard:test', client=fake_redis)
+
+
+def test_incr_and_top(leaderboard):
+    leaderboard.incr(1, 5)
+    leaderboard.incr(2, 7)
+    leaderboard.incr(1)
+
+    assert leaderboard.top(10) == [(2, 7), (1, 6)]
+    assert leaderboard.top(1, offset=1) == [(1, 6)]
+
+
+def test_rebuild_replaces_scores(leaderboard):
+    leaderboard.incr(1, 5)
+
+    leaderboard.rebuild({2: 3, 3: 0})
+
+    assert leaderboard.top(10) == [(2, 3)]
+
+    leaderboard.rebuild({})
+    assert leaderboard.top(10) == []
+
+
+def test_diff_reports_drift(leaderboard):
+    leaderboard.rebuild({1: 5, 2: 3})
+
+    assert leaderboard.diff({1: 5, 2: 3}) == {}
+    assert leaderboard.diff({1: 6, 3: 1}) == {1: (5, 6), 2: (3, 0), 3: (0, 1)}
+
+
+@pytest.mark.django_db
+def test_popular_authors_skips_inactive_users(leaderboard, mocker):
+    mocker.patch('articles.leaderboards.author_reads', leaderboard)
+    from articles.leaderboards import popular_authors
+
+    active = User.objects.create(username='active')
+    inactive = User.objects.create(username='inactive', is_active=False)
+    other = User.objects.create(username='other')
+    leaderboard.rebuild({active.id: 10, inactive.id: 20, other.id: 5})
+
+    authors = popular_authors(limit=2)
+
+    assert [author.id for author in authors] == [active.id, other.id]
+    assert authors[0].reads_count == 10
+
+
+@pytest.fixture
+def leaderboards(fake_redis, mocker):
+    from articles import leaderboards
+    from articles.counters import CounterBuffer
+    from articles.leaderboards import Leaderboard
+
+    mocker.patch.object(leaderboards, 'author_reads', Leaderboard('leaderboard:authors', client=fake_redis))
+    mocker.patch.object(leaderboards, 'article_views', Leaderboard('leaderboard:articles', client=fake_redis))
+    mocker.patch.object(leaderboards, 'article_counters', CounterBuffer(
+        'articles.Article', fields=('views_count', 'reads_count'), client=fake_redis,
+    ))
+    return leaderboards
+
+
+def test_unpublishing_takes_out_counted_reads_and_views(leaderboards):
+    article = SimpleNamespace(pk=7, author_id=1)
+    leaderboards.author_reads.incr(1, 15)
+    leaderboards.article_views.incr(7, 40)
+    leaderboards.article_counters.incr(7, 'reads_count', 2)
+
+    leaderboards.publication_changed(article, False, reads_count=10, views_count=38)
+
+    assert leaderboards.author_reads.scores() == {1: 3}
+    assert leaderboards.article_views.scores() == {}
+
+    leaderboards.publication_changed(article, True, reads_count=10, views_count=38)
+
+    assert leaderboards.author_reads.scores() == {1: 15}
+    assert leaderboards.article_views.scores() == {7: 38}
+
+
+@pytest.mark.parametrize('counts, status, expected', [
+    (None, 'publish', (True, 4, 9)),
+    ((4, 9), 'draft', (False, 4, 9)),
+    ((4, 9), 'publish', None),
+    (None, 'draft', None),
+])
+def test_publication_changes_adjust_leaderboards(mocker, counts, status, expected):
+    from articles import signals
+
+    changed = mocker.patch('articles.signals.leaderboards.publication_changed')
+    mocker.patch('articles.signals.transaction.on_commit', side_effect=lambda func: func())
+    article = SimpleNamespace(pk=7, status=status, reads_count=4, views_count=9, _published_counts=counts)
+
+    signals.adjust_article_leaderboards(None, article)
+
+    if expected is None:
+        changed.assert_not_called()
+    else:
+        changed.assert_called_once_with(article, *expected)
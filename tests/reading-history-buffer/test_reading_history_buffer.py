@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.fixture
+def history_buffer(fake_redis):
+    from articles.reading_history import ReadingHistoryBuffer
+
+    return ReadingHistoryBuffer('users.ReadingHistory', window=60, client=fake_redis)
+
+
+def test_repeat_views_are_collapsed(history_buffer, fake_redis):
+    history_buffer.record(1, 10, buffered=True)
+    history_buffer.record(1, 10, buffered=True)
+    history_buffer.record(1, 11, buffered=True)
+
+    assert fake_redis.lrange(history_buffer.queue_key, 0, -1) == [b'1:10', b'1:11']
+
+
+def test_sync_path_creates_row(history_buffer, mocker):
+    model = mocker.patch.object(type(history_buffer), 'model', new_callable=mocker.PropertyMock)
+
+    history_buffer.record(1, 10, buffered=False)
+
+    model.return_value._default_manager.create.assert_called_once_with(user_id=1, article_id=10)
+
+
+def test_flush_bulk_creates_with_ignore_conflicts(history_buffer, mocker):
+    model = mocker.patch.object(type(history_buffer), 'model', new_callable=mocker.PropertyMock)
+    history_buffer.record(1, 10, buffered=True)
+    history_buffer.record(2, 10, buffered=True)
+
+    assert history_buffer.flush() == 2
+
+    bulk_create = model.return_value._default_manager.bulk_create
+    bulk_create.assert_called_once()
+    assert bulk_create.call_args.kwargs == {'ignore_conflicts': True}
+    assert history_buffer.flush() == 0
@@ -0,0 +1,158 @@
+import pytest
+import redis
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def make_limiter(fake_redis, clock):
+    from core.ratelimit import RateLimiter
+
+    def _make(local_size=0, client=fake_redis):
+        return RateLimiter(rates={'login': '3/min', 'clap': '10/s'}, client=client, local_size=local_size, clock=clock)
+
+    return _make
+
+
+def test_parse_rate():
+    from core.ratelimit import parse_rate
+
+    assert parse_rate('5/min') == (5, 60)
+    assert parse_rate('100/hour') == (100, 3600)
+    assert parse_rate(None) is None
+
+
+def test_burst_then_waits_for_emission_interval(make_limiter, clock):
+    limiter = make_limiter()
+
+    assert [limiter.hit('login', 'ip:1') for _ in range(3)] == [0, 0, 0]
+    assert limiter.hit('login', 'ip:1') == pytest.approx(20)
+
+    clock.now += 20
+    assert limiter.hit('login', 'ip:1') == 0
+    assert limiter.hit('login', 'ip:1') == pytest.approx(20)
+
+
+def test_limits_are_per_scope_and_ident(make_limiter):
+    limiter = make_limiter()
+    for _ in range(3):
+        limiter.hit('login', 'ip:1')
+
+    assert limiter.hit('login', 'ip:2') == 0
+    assert limiter.hit('clap', 'ip:1') == 0
+    assert limiter.hit('unknown', 'ip:1') == 0
+
+
+def test_limit_is_shared_between_processes(make_limiter):
+    first, second = make_limiter(local_size=100), make_limiter(local_size=100)
+
+    for limiter in (first, second, first):
+        assert limiter.hit('login', 'ip:1') == 0
+
+    assert second.hit('login', 'ip:1') > 0
+
+
+def test_local_bucket_rejects_without_redis(make_limiter, mocker):
+    limiter = make_limiter(local_size=100)
+    for _ in range(3):
+        limiter.hit('login', 'ip:1')
+    script = mocker.spy(limiter, '_gcra')
+
+    assert limiter.hit('login', 'ip:1') == pytest.approx(20)
+    script.assert_not_called()
+
+
+def test_redis_failure_fails_open(make_limiter, mocker):
+    client = mocker.Mock()
+    client.register_script.return_value.side_effect = redis.ConnectionError
+
+    assert make_limiter(client=client).hit('login', 'ip:1') == 0
+
+
+def test_decorator_returns_429_with_retry_after(make_limiter):
+    from core.ratelimit import ratelimit
+
+    view = ratelimit('login', limiter=make_limiter())(lambda request: HttpResponse())
+    request = RequestFactory().post('/login/', REMOTE_ADDR='10.0.0.1')
+    request.user = AnonymousUser()
+
+    statuses = [view(request).status_code for _ in range(3)]
+    response = view(request)
+
+    assert statuses == [200, 200, 200]
+    assert response.status_code == 429
+    assert response['Retry-After'] == '20'
+
+
+def test_request_ident_honours_proxies(settings, mocker):
+    from core.ratelimit import request_ident
+
+    request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2')
+    request.user = AnonymousUser()
+
+    settings.THROTTLE_NUM_PROXIES = 0
+    assert request_ident(request) == 'ip:10.0.0.1'
+    settings.THROTTLE_NUM_PROXIES = 1
+    assert request_ident(request) == 'ip:2.2.2.2'
+
+    request.user = mocker.Mock(is_authenticated=True, pk=7)
+    assert request_ident(request) == 'user:7'
+
+
+@pytest.fixture
+def throttled_view(make_limiter, mocker):
+    from rest_framework.response import Response
+    from rest_framework.views import APIView
+
+    from core.throttling import RedisRateThrottle
+
+    mocker.patch.object(RedisRateThrottle, 'limiter', make_limiter())
+
+    class LoginView(APIView):
+        authentication_classes = []
+        permission_classes = []
+        throttle_classes = [RedisRateThrottle]
+        throttle_scope = 'login'
+
+        def post(self, request):
+            return Response({'ok': True})
+
+    return LoginView.as_view()
+
+
+def test_drf_throttle_limits_scope(throttled_view, clock):
+    from rest_framework.test import APIRequestFactory
+
+    factory = APIRequestFactory()
+    responses = [throttled_view(factory.post('/login/', REMOTE_ADDR='10.0.0.1')) for _ in range(4)]
+
+    assert [response.status_code for response in responses] == [200, 200, 200, 429]
+    assert responses[-1]['Retry-After'] == '20'
+    assert throttled_view(factory.post('/login/', REMOTE_ADDR='10.0.0.2')).status_code == 200
+
+    clock.now += 20
+    assert throttled_view(factory.post('/login/', REMOTE_ADDR='10.0.0.1')).status_code == 200
+
+
+def test_drf_throttle_skips_views_without_scope(make_limiter, mocker):
+    from core.throttling import RedisRateThrottle
+
+    limiter = mocker.Mock()
+    mocker.patch.object(RedisRateThrottle, 'limiter', limiter)
+
+    assert RedisRateThrottle().allow_request(mocker.Mock(), object())
+    limiter.hit.assert_not_called()
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import models
+
+
+# Stand-ins for models this tree does not have yet, unmanaged so test
+# database setup skips them. The stand_in_tables fixture creates them.
+class StandInTopic(models.Model):
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        app_label = 'articles'
+        managed = False
+
+
+class StandInArticle(models.Model):
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True)
+    title = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=10, default='publish')
+    topics = models.ManyToManyField(StandInTopic)
+    views_count = models.PositiveIntegerField(default=0)
+    reads_count = models.PositiveIntegerField(default=0)
+    claps_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        app_label = 'articles'
+        managed = False
+
+
+class StandInClap(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    article = models.ForeignKey(StandInArticle, on_delete=models.CASCADE)
+    count = models.PositiveSmallIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = 'articles'
+        managed = False
+        unique_together = ('user', 'article')
+
+
+STAND_INS = [StandInTopic, StandInArticle, StandInClap]
@@ -0,0 +1,95 @@
+import pytest
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def make_revocations(fake_redis, clock):
+    from core.revocation import RevocationList
+
+    def _make(bloom=False):
+        return RevocationList(bloom=bloom, sync_interval=5, client=fake_redis, clock=clock)
+
+    return _make
+
+
+@pytest.mark.parametrize('bloom', [False, True])
+def test_revoked_token_is_denied_until_it_expires(make_revocations, fake_redis, clock, bloom):
+    revocations = make_revocations(bloom)
+
+    assert revocations.revoke('a', clock.now + 60)
+
+    assert revocations.is_revoked('a')
+    assert not revocations.is_revoked('b')
+    assert fake_redis.ttl('revoked:jti:a') == 60
+
+
+def test_expired_token_is_not_stored(make_revocations, fake_redis, clock):
+    assert not make_revocations().revoke('a', clock.now - 1)
+    assert not fake_redis.exists('revoked:jti:a')
+
+
+def test_revoked_is_one_round_trip(make_revocations, clock, mocker):
+    revocations = make_revocations()
+    revocations.revoke('a', clock.now + 60)
+    pipeline = mocker.spy(revocations.client, 'pipeline')
+
+    assert revocations.revoked(['a', 'b', 'c']) == {'a'}
+    pipeline.assert_called_once()
+
+
+def test_bloom_skips_redis_for_tokens_never_revoked(make_revocations, clock, mocker):
+    revocations = make_revocations(bloom=True)
+    revocations.revoke('a', clock.now + 60)
+    revocations.sync()
+    pipeline = mocker.spy(revocations.client, 'pipeline')
+    range_by_score = mocker.spy(revocations.client, 'zrangebyscore')
+
+    for _ in range(100):
+        assert not revocations.is_revoked('b')
+
+    pipeline.assert_not_called()
+    range_by_score.assert_not_called()
+
+
+def test_bloom_picks_up_other_processes_after_sync_interval(make_revocations, clock):
+    worker, other = make_revocations(bloom=True), make_revocations(bloom=True)
+    assert not worker.is_revoked('a')
+
+    other.revoke('a', clock.now + 60)
+    clock.now += 5
+
+    assert worker.is_revoked('a')
+
+
+def test_sync_drops_expired_ids(make_revocations, clock):
+    revocations = make_revocations(bloom=True)
+    revocations.revoke('a', clock.now + 10)
+    clock.now += 11
+
+    revocations.sync()
+
+    assert 'a' not in revocations._filter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    from core.revocation import BloomFilter
+
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for index in range(1000):
+        bloom.add(f'jti-{index}')
+
+    assert all(f'jti-{index}' in bloom for index in range(1000))
+    false_positives = sum(f'other-{index}' in bloom for index in range(10_000))
+    assert false_positives < 300
@@ -0,0 +1,54 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+NOW = 1_700_000_000
+
+
+@pytest.fixture
+def windowed(fake_redis):
+    from articles.leaderboards import WindowedLeaderboard
+
+    return WindowedLeaderboard('leaderboard:test', client=fake_redis)
+
+
+def test_window_only_counts_recent_buckets(windowed):
+    windowed.incr(1, 5, now=NOW)
+    windowed.incr(2, 3, now=NOW - 2 * 86400)
+
+    assert windowed.top('24h', 10, now=NOW) == [(1, 5)]
+    assert [member for member, _ in windowed.top('7d', 10, now=NOW)] == [1, 2]
+
+
+def test_older_views_decay(windowed):
+    windowed.incr(1, 10, now=NOW - 6 * 86400)
+    windowed.incr(2, 6, now=NOW)
+
+    # 10 views six days ago weigh 10 * 0.5 ** 2 in the 7d window.
+    assert windowed.top('7d', 10, now=NOW) == [(2, 6), (1, 2)]
+
+
+def test_merged_window_is_cached(windowed, fake_redis):
+    windowed.incr(1, now=NOW)
+    windowed.top('24h', 10, now=NOW)
+    windowed.incr(2, 5, now=NOW)
+
+    assert windowed.top('24h', 10, now=NOW) == [(1, 1)]
+
+
+@pytest.mark.django_db
+def test_top_articles_filters_queryset_and_keeps_rank(fake_redis, mocker):
+    from articles.leaderboards import Leaderboard, top_articles
+
+    leaderboard = Leaderboard('leaderboard:test', client=fake_redis)
+    mocker.patch('articles.leaderboards.article_views', leaderboard)
+    users = [User.objects.create(username=f'user{index}') for index in range(3)]
+    leaderboard.rebuild({users[0].id: 1, users[1].id: 9, users[2].id: 5})
+
+    queryset = User.objects.exclude(pk=users[2].pk)
+
+    assert list(top_articles(queryset, 5)) == [users[1], users[0]]
+    assert list(top_articles(queryset, 1)) == [users[1]]
+    with pytest.raises(ValueError):
+        top_articles(queryset, 1, window='1y')
@@ -0,0 +1,58 @@
+import pytest
+
+
+@pytest.fixture
+def engine(fake_redis):
+    from articles.recommendations import RecommendationEngine
+
+    return RecommendationEngine(client=fake_redis)
+
+
+def test_events_build_affinity(engine):
+    engine.record(1, [10, 11], 'read')
+    engine.record(1, [10], 'clap', amount=4)
+    engine.record(1, [12], 'more')
+
+    affinity, excluded = engine.affinity(1)
+
+    assert affinity == {10: 4.5, 11: 0.5, 12: 5.0}
+    assert excluded == set()
+
+
+def test_less_excludes_topics_until_more(engine):
+    engine.record(1, [10], 'read')
+    engine.exclude(1, [10, 11])
+
+    assert engine.affinity(1) == ({}, {10, 11})
+
+    engine.record(1, [11], 'more')
+    assert engine.affinity(1) == ({11: 5.0}, {10})
+
+
+def test_candidates_are_cached_and_refreshed_when_stale(engine, mocker):
+    compute = mocker.patch.object(engine, 'compute_candidates', return_value=[3, 1, 2])
+    engine.record(1, [10], 'read')
+
+    assert engine.candidate_ids(1) == [3, 1, 2]
+    assert engine.candidate_ids(1) == [3, 1, 2]
+    assert compute.call_count == 1
+
+    compute.return_value = [1]
+    assert engine.refresh_stale() == 1
+    assert engine.candidate_ids(1) == [1]
+    assert engine.refresh_stale() == 0
+
+
+@pytest.mark.django_db
+def test_recommended_articles_keeps_queryset_for_cold_users(engine, mocker):
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    users = [User.objects.create(username=f'user{index}') for index in range(3)]
+    queryset = User.objects.all()
+
+    assert engine.recommended_articles(queryset, 1) is queryset
+
+    mocker.patch.object(engine, 'compute_candidates', return_value=[users[2].pk, users[0].pk])
+    engine.record(1, [10], 'read')
+    assert list(engine.recommended_articles(queryset, 1)) == [users[2], users[0]]
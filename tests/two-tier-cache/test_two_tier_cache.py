@@ -0,0 +1,150 @@
+import time
+
+import fakeredis
+import pytest
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def backing(settings):
+    from django.core.cache import caches
+
+    settings.CACHES = {
+        **settings.CACHES,
+        'two-tier-backing': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'two-tier'},
+    }
+    caches['two-tier-backing'].clear()
+    return caches['two-tier-backing']
+
+
+@pytest.fixture
+def make_cache(backing, server):
+    from core.cache import LocalTier, TwoTierCache
+
+    def _make_cache():
+        cache = TwoTierCache(None, {'OPTIONS': {
+            'CACHE': 'two-tier-backing',
+            'MAX_ENTRIES': 10,
+            'POLICIES': {'faqs': 60, 'faqs:draft': 0},
+        }})
+        # A tier of its own, as if in another process.
+        cache._tier = LocalTier(cache.channel, cache.max_entries, client=fakeredis.FakeRedis(server=server))
+        return cache
+
+    return _make_cache
+
+
+@pytest.fixture
+def cache(make_cache):
+    cache = make_cache()
+    cache.get('faqs')
+    wait_for(cache.tier.subscribed.is_set)
+    return cache
+
+
+def test_hot_key_is_served_from_memory(cache, backing, mocker):
+    backing.set('faqs', ['q1'])
+    assert cache.get('faqs') == ['q1']
+
+    get = mocker.spy(backing, 'get')
+    assert cache.get('faqs') == ['q1']
+    assert cache.get_many(['faqs']) == {'faqs': ['q1']}
+    get.assert_not_called()
+
+
+def test_keys_without_policy_always_go_to_the_wrapped_cache(cache, backing):
+    backing.set('faqs:draft:1', 'draft')
+    backing.set('other', 1)
+
+    assert cache.get('faqs:draft:1') == 'draft'
+    assert cache.get('other') == 1
+    assert len(cache.local) == 0
+
+
+def test_write_invalidates_every_process(cache, make_cache):
+    other = make_cache()
+    other.get('faqs')
+    wait_for(other.tier.subscribed.is_set)
+
+    cache.set('faqs', ['q1'])
+    assert other.get('faqs') == ['q1']
+
+    cache.set('faqs', ['q1', 'q2'])
+
+    assert cache.get('faqs') == ['q1', 'q2']
+    wait_for(lambda: other.get('faqs') == ['q1', 'q2'])
+
+
+def test_delete_and_clear_drop_local_copies(cache, backing):
+    backing.set('faqs', ['q1'])
+    cache.get('faqs')
+
+    cache.delete('faqs')
+    assert cache.get('faqs') is None
+
+    backing.set('faqs', ['q1'])
+    cache.get('faqs')
+    cache.clear()
+    assert len(cache.local) == 0
+
+
+def test_value_read_during_invalidation_is_not_kept(cache, backing, mocker):
+    backing.set('faqs', ['old'])
+    original = backing.get
+
+    def racing_get(*args, **kwargs):
+        value = original(*args, **kwargs)
+        cache.tier.invalidate(['unrelated'])
+        return value
+
+    mocker.patch.object(backing, 'get', side_effect=racing_get)
+
+    assert cache.get('faqs') == ['old']
+    assert len(cache.local) == 0
+
+
+def test_backends_share_one_tier_per_process_and_channel(mocker):
+    from core import cache as module
+    from core.cache import TwoTierCache
+
+    mocker.patch.dict(module._tiers, clear=True)
+
+    def backend(channel):
+        return TwoTierCache(None, {'OPTIONS': {'CHANNEL': channel}})
+
+    first = backend('invalidate')
+    assert backend('invalidate').tier is first.tier
+    assert backend('other').tier is not first.tier
+
+    parent = first.tier
+    mocker.patch('core.cache.os.getpid', return_value=-1)
+    assert first.tier is not parent
+    assert len(module._tiers) == 1
+
+
+def test_local_lru_is_bounded_and_expires():
+    from core.cache import LocalLRU, _missing
+
+    now = [0.0]
+    lru = LocalLRU(2, clock=lambda: now[0])
+    lru.set('a', 1, 10)
+    lru.set('b', 2, 10)
+    lru.get('a')
+    lru.set('c', 3, 10)
+
+    assert lru.get('b') is _missing
+    assert lru.get('a') == 1
+
+    now[0] = 10
+    assert lru.get('c') is _missing
@@ -0,0 +1,76 @@
+import pytest
+
+
+@pytest.fixture
+def counter(fake_redis, mocker):
+    from articles.notifications import UnreadCounter
+
+    notification = mocker.Mock()
+    notification.objects.filter.return_value.count.return_value = 4
+    mocker.patch('articles.notifications.apps.get_model', return_value=notification)
+    return UnreadCounter(client=fake_redis)
+
+
+def test_missing_count_is_loaded_once(counter):
+    from articles.notifications import apps
+
+    assert counter.get(1) == 4
+    assert counter.get(1) == 4
+    apps.get_model.return_value.objects.filter.assert_called_once_with(user_id=1, read_at__isnull=True)
+
+
+def test_incr_only_touches_loaded_counters(counter, fake_redis):
+    counter.get(1)
+
+    counter.incr([1, 2])
+
+    assert counter.get(1) == 5
+    assert fake_redis.get(counter._key(2)) is None
+
+
+def test_decrement_never_goes_below_zero(counter):
+    counter.get(1)
+
+    counter.incr([1], -10)
+
+    assert counter.get(1) == 0
+
+
+def test_reset(counter):
+    counter.get(1)
+
+    counter.reset(1)
+
+    assert counter.get(1) == 0
+
+
+def test_concurrent_seed_keeps_the_stored_count(counter, fake_redis):
+    from articles.notifications import apps
+
+    def count():
+        # Another read seeded the key and a notification arrived meanwhile.
+        fake_redis.set(counter._key(1), 5)
+        return 4
+
+    apps.get_model.return_value.objects.filter.return_value.count.side_effect = count
+
+    assert counter.get(1) == 5
+    assert int(fake_redis.get(counter._key(1))) == 5
+
+
+def test_seeded_count_expires(counter, fake_redis):
+    counter.get(1)
+
+    assert 0 < fake_redis.ttl(counter._key(1)) <= counter.ttl
+
+
+def test_mark_all_read_keeps_notifications_created_meanwhile(counter, mocker):
+    from articles import notifications
+
+    mocker.patch.object(notifications, 'unread_notifications', counter)
+    counter.get(1)
+    counter.incr([1])
+    notifications.apps.get_model.return_value.objects.filter.return_value.update.return_value = 4
+
+    assert notifications.mark_all_read(1) == 4
+    assert counter.get(1) == 1
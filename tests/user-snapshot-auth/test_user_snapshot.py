@@ -0,0 +1,157 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+@pytest.fixture
+def snapshots(fake_redis, mocker):
+    from core.user_snapshot import UserSnapshotCache
+
+    # Fake clients share one server, ids are reused between tests.
+    fake_redis.flushall()
+    cache = UserSnapshotCache(client=fake_redis)
+    mocker.patch('core.user_snapshot.user_snapshots', cache)
+    return cache
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create(username='ali', first_name='Ali', is_staff=True)
+
+
+def test_cached_snapshot_needs_no_query(snapshots, user, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        snapshots.get(user.pk)
+
+    with django_assert_num_queries(0):
+        snapshot = snapshots.get(user.pk)
+        assert (snapshot.pk, snapshot.username, snapshot.is_active, snapshot.is_staff) == (user.pk, 'ali', True, True)
+        assert snapshot.is_authenticated
+        assert snapshot == user
+
+
+def test_missing_user(snapshots, db):
+    assert snapshots.get(404) is None
+
+
+def test_saving_user_drops_cached_snapshot(snapshots, user, django_capture_on_commit_callbacks):
+    snapshots.get(user.pk)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+
+    assert not snapshots.get(user.pk).is_active
+
+
+def test_other_fields_load_on_access(snapshots, user, django_assert_num_queries):
+    snapshot = snapshots.get(user.pk)
+
+    with django_assert_num_queries(1):
+        assert snapshot.first_name == 'Ali'
+        assert snapshot.get_username() == 'ali'
+        assert (snapshot.email, snapshot.last_name, snapshot.is_superuser) == ('', '', False)
+        assert snapshot.date_joined == user.date_joined
+        assert snapshot.get_deferred_fields() == set()
+
+
+def test_snapshot_pickles(snapshots, user):
+    import pickle
+
+    snapshot = pickle.loads(pickle.dumps(snapshots.get(user.pk)))
+
+    assert snapshot.first_name == 'Ali'
+    assert snapshot.get_deferred_fields() == set()
+
+
+def test_save_only_writes_loaded_fields(snapshots, user):
+    user.set_password('maxfiy')
+    user.save()
+    snapshot = snapshots.get(user.pk)
+
+    snapshot.first_name = 'Vali'
+    snapshot.username = 'vali'
+    snapshot.save()
+
+    user.refresh_from_db()
+    assert (user.first_name, user.username) == ('Vali', 'vali')
+    assert user.check_password('maxfiy')
+
+
+def test_snapshot_works_in_relations(snapshots, user):
+    from django.contrib.admin.models import ADDITION, LogEntry
+
+    snapshot = snapshots.get(user.pk)
+    LogEntry.objects.create(user=snapshot, action_flag=ADDITION, object_repr='maqola')
+
+    assert isinstance(snapshot, User)
+    assert LogEntry.objects.filter(user=snapshot).count() == 1
+
+
+def test_snapshot_from_claims(snapshots, user, django_assert_num_queries):
+    from core.user_snapshot import snapshot_claims, snapshot_from_claims
+
+    with django_assert_num_queries(0):
+        snapshot = snapshot_from_claims(user.pk, {'user_id': user.pk, **snapshot_claims(user)})
+
+    assert (snapshot.pk, snapshot.username, snapshot.is_staff) == (user.pk, 'ali', True)
+    assert snapshot_from_claims(user.pk, {'user_id': user.pk}) is None
+
+
+@pytest.fixture
+def authenticate(snapshots, fake_redis, mocker):
+    from rest_framework.test import APIRequestFactory
+
+    from core.authentication import SnapshotJWTAuthentication
+    from core.revocation import RevocationList
+
+    mocker.patch('core.authentication.revocations', RevocationList(client=fake_redis))
+    mocker.patch('core.authentication.user_snapshots', snapshots)
+
+    def _authenticate(token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return SnapshotJWTAuthentication().authenticate(request)
+
+    return _authenticate
+
+
+def access_token(user):
+    from core.authentication import SnapshotRefreshToken
+
+    return SnapshotRefreshToken.for_user(user).access_token
+
+
+@pytest.mark.parametrize('from_token, queries', [(True, 0), (False, 1)])
+def test_authentication_returns_snapshot(authenticate, user, settings, django_assert_num_queries,
+                                         from_token, queries):
+    settings.AUTH_USER_SNAPSHOT_FROM_TOKEN = from_token
+    token = access_token(user)
+
+    with django_assert_num_queries(queries):
+        authenticated, validated = authenticate(token)
+
+    assert isinstance(authenticated, User)
+    assert (authenticated.pk, authenticated.username, authenticated.is_staff) == (user.pk, 'ali', True)
+    assert validated['usr'] == 'ali'
+
+
+def test_authentication_rejects_revoked_tokens(authenticate, user):
+    from rest_framework_simplejwt.exceptions import InvalidToken
+
+    from core import authentication
+
+    token = access_token(user)
+    authentication.revocations.revoke(token['jti'], token['exp'])
+
+    with pytest.raises(InvalidToken):
+        authenticate(token)
+
+
+def test_authentication_rejects_inactive_users(authenticate, db):
+    from rest_framework.exceptions import AuthenticationFailed
+
+    inactive = User.objects.create(username='vali', is_active=False)
+
+    with pytest.raises(AuthenticationFailed):
+        authenticate(access_token(inactive))